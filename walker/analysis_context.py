@@ -0,0 +1,125 @@
+from call_graph import CallGraph
+from class_index import ClassIndex
+from const_eval import ConstantEvaluator
+from constant_propagation import ConstantPropagation
+from expr_hash import ExpressionHasher
+from if_chains import IfChainIndex
+from loop_summary import LoopSummary, WriteSummary
+from scope_tree import ScopeTree
+from switch_index import SwitchIndex
+from symbol_index import SymbolIndex
+from token_index import CallTokenIndex, file_tokens
+
+
+class AnalysisContext:
+    """
+    Per-file analysis state shared by every rule.
+
+    Indexes are built lazily on first access and then reused, so a file
+    pays for each index at most once no matter how many rules consume it.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self._symbols = None
+        self._tokens = None
+        self._call_tokens = None
+        self._call_graph = None
+        self._writes = None
+        self._constants = None
+        self._expressions = None
+        self._scopes = None
+        self._if_chains = None
+        self._switches = None
+        self._classes = None
+        self._loops = {}
+        self._propagations = {}
+
+    @property
+    def symbols(self):
+        if self._symbols is None:
+            self._symbols = SymbolIndex(self.nodes)
+        return self._symbols
+
+    @property
+    def tokens(self):
+        """
+        The main file's token stream, read from libclang once.
+        """
+        if self._tokens is None:
+            self._tokens = file_tokens(self.nodes)
+        return self._tokens
+
+    @property
+    def call_tokens(self):
+        if self._call_tokens is None:
+            self._call_tokens = CallTokenIndex(self.nodes, self.tokens)
+        return self._call_tokens
+
+    @property
+    def call_graph(self):
+        if self._call_graph is None:
+            self._call_graph = CallGraph(self.nodes, self.symbols)
+        return self._call_graph
+
+    @property
+    def writes(self):
+        if self._writes is None:
+            self._writes = WriteSummary(self.nodes, self.symbols)
+        return self._writes
+
+    @property
+    def constants(self):
+        if self._constants is None:
+            self._constants = ConstantEvaluator(self.symbols)
+        return self._constants
+
+    @property
+    def expressions(self):
+        if self._expressions is None:
+            self._expressions = ExpressionHasher(self)
+        return self._expressions
+
+    @property
+    def scopes(self):
+        if self._scopes is None:
+            self._scopes = ScopeTree(self.nodes)
+        return self._scopes
+
+    @property
+    def if_chains(self):
+        if self._if_chains is None:
+            self._if_chains = IfChainIndex(self.nodes)
+        return self._if_chains
+
+    @property
+    def switches(self):
+        if self._switches is None:
+            self._switches = SwitchIndex(self)
+        return self._switches
+
+    @property
+    def classes(self):
+        if self._classes is None:
+            self._classes = ClassIndex(self)
+        return self._classes
+
+    def loop(self, node):
+        """
+        LoopSummary for a loop node, built once and shared by the loop rules.
+        """
+        summary = self._loops.get(id(node))
+        if summary is None:
+            summary = LoopSummary(node, self)
+            self._loops[id(node)] = summary
+        return summary
+
+    def propagation(self, func_node):
+        """
+        ConstantPropagation for a function, solved once on first request.
+        """
+        result = self._propagations.get(id(func_node))
+        if result is None:
+            result = ConstantPropagation(func_node, self.symbols, self.constants)
+            self._propagations[id(func_node)] = result
+        return result
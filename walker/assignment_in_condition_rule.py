@@ -1,6 +1,6 @@
 from base_rule import BaseRule
 from clang.cindex import CursorKind
-from expr_renderer import find_condition_node
+from expr_renderer import find_condition_node, operator_spelling
 
 
 class AssignmentInConditionRule(BaseRule):
@@ -8,6 +8,8 @@ class AssignmentInConditionRule(BaseRule):
     Warns when an if-condition appears to use assignment (=) instead of comparison.
     """
 
+    body_tokens = {"if"}
+
     def matches(self, node):
         return node.get("kind") == CursorKind.IF_STMT
 
@@ -16,16 +18,17 @@ class AssignmentInConditionRule(BaseRule):
         if condition is None:
             return None
 
-        cursor = condition.get("cursor")
-        if cursor is None:
-            return None
-
-        tokens = [t.spelling for t in cursor.get_tokens()]
-        if not tokens:
-            return None
-
-        has_assignment = "=" in tokens
-        has_comparison = any(tok in tokens for tok in ("==", "!=", ">=", "<="))
+        operators = set()
+        stack = [condition]
+        while stack:
+            cur = stack.pop()
+            op = operator_spelling(cur)
+            if op is not None:
+                operators.add(op)
+            stack.extend(cur.get("children", []))
+
+        has_assignment = "=" in operators
+        has_comparison = any(op in operators for op in ("==", "!=", ">=", "<="))
         if not has_assignment or has_comparison:
             return None
 
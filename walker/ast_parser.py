@@ -56,13 +56,23 @@ def _translation_unit_failure_hint(filename):
     )
 
 
-def parse_cpp_file(filename, extra_args=None):
-    if not os.path.exists(filename):
-        raise ParseCppError(f"Input file does not exist: {filename}")
-    if not os.path.isfile(filename):
-        raise ParseCppError(f"Input path is not a file: {filename}")
+# One Index and SDK lookup per process, so a worker that parses many
+# files stays warm.
+_INDEX = None
+_SDK_ARGS = None
+
+
+def _shared_index():
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = cindex.Index.create()
+    return _INDEX
 
-    index = cindex.Index.create()
+
+def _sdk_args():
+    global _SDK_ARGS
+    if _SDK_ARGS is not None:
+        return _SDK_ARGS
     sdk_args = []
     try:
         sdk_path = subprocess.check_output(
@@ -79,15 +89,63 @@ def parse_cpp_file(filename, extra_args=None):
             ]
     except Exception:
         sdk_args = []
+    _SDK_ARGS = sdk_args
+    return _SDK_ARGS
+
+
+# Environment that changes which headers an include resolves to.
+INCLUDE_ENV = ("CPATH", "CPLUS_INCLUDE_PATH", "C_INCLUDE_PATH")
+
+
+def parser_args(extra_args=None):
+    """
+    Arguments parse_cpp_file passes to libclang.
+    """
+    return ["-x", "c++", "-std=gnu++17"] + _sdk_args() + (extra_args or [])
+
+
+def parser_settings(extra_args=None):
+    """
+    JSON-ready description of everything outside a file that changes how
+    it parses: the arguments, the include-path environment and the
+    libclang library. Caches of parse results key on it.
+    """
+    return {
+        "args": parser_args(extra_args),
+        "env": [os.environ.get(name, "") for name in INCLUDE_ENV],
+        "libclang": cindex.conf.get_filename(),
+    }
+
+
+def parse_cpp_file(filename, extra_args=None, detailed=False, outline=False, pch_cache=None):
+    """
+    Parse a C++ file with libclang. `detailed` asks for the detailed
+    processing record (MACRO_DEFINITION, MACRO_INSTANTIATION and
+    INCLUSION_DIRECTIVE cursors); it costs parse and traversal time, so it
+    is only requested when a rule needs macro information. `outline` skips
+    every function body and tolerates an incomplete file, for a
+    declaration-only outline (walk the result with walk_ast(outline=True)).
+    With a `pch_cache` (PchCache), the file's leading `#include <...>`
+    block is loaded from a precompiled header instead of being reparsed.
+    """
+    if not os.path.exists(filename):
+        raise ParseCppError(f"Input file does not exist: {filename}")
+    if not os.path.isfile(filename):
+        raise ParseCppError(f"Input path is not a file: {filename}")
 
-    default_args = [
-        "-x", "c++",
-        "-std=gnu++17",
-    ] + sdk_args
-    args = default_args + (extra_args or [])
-    options = cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+    index = _shared_index()
+    args = parser_args(extra_args)
+    options = cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD if detailed else 0
+    if outline:
+        options |= cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | cindex.TranslationUnit.PARSE_INCOMPLETE
 
     try:
+        pch = pch_cache.lookup(index, filename, args) if pch_cache is not None else None
+        if pch is not None:
+            translation_unit = index.parse(filename, args=args + ["-include-pch", pch], options=options)
+            if not pch_cache.rejected(translation_unit):
+                return translation_unit
+            pch_cache.discard(pch)
         return index.parse(filename, args=args, options=options)
     except cindex.TranslationUnitLoadError as exc:
         raise ParseCppError(_translation_unit_failure_hint(filename)) from exc
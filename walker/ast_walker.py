@@ -1,51 +1,640 @@
 import os
+import re
 
+from clang import cindex
+from clang.cindex import CursorKind
 
-def walk_ast(cursor, nodes, *, debug=False, parent=None, target_file=None, _realpath_cache=None):
+
+# Declarations whose USR is resolved once here so rules never repeat the FFI call.
+_USR_DECL_KINDS = {
+    CursorKind.VAR_DECL,
+    CursorKind.PARM_DECL,
+    CursorKind.FIELD_DECL,
+    CursorKind.FUNCTION_DECL,
+    CursorKind.CXX_METHOD,
+    CursorKind.CONSTRUCTOR,
+    CursorKind.DESTRUCTOR,
+    CursorKind.FUNCTION_TEMPLATE,
+    CursorKind.CLASS_DECL,
+    CursorKind.STRUCT_DECL,
+    CursorKind.ENUM_DECL,
+    CursorKind.ENUM_CONSTANT_DECL,
+}
+
+# References whose target USR is resolved once (cursor.referenced.get_usr()).
+_USR_REF_KINDS = {
+    CursorKind.DECL_REF_EXPR,
+    CursorKind.MEMBER_REF_EXPR,
+    CursorKind.MEMBER_REF,
+    CursorKind.CALL_EXPR,
+}
+
+
+# Implicit-cast and parenthesis wrappers collapsed by the semantic view.
+WRAPPER_KINDS = {CursorKind.UNEXPOSED_EXPR, CursorKind.PAREN_EXPR}
+
+_OPERATOR_KINDS = {
+    CursorKind.BINARY_OPERATOR,
+    CursorKind.COMPOUND_ASSIGNMENT_OPERATOR,
+    CursorKind.UNARY_OPERATOR,
+}
+_OPERATOR_CALL_KIND = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
+
+# Names of libclang's BinaryOperator kinds (bindings for clang 19 and later).
+_BINARY_OPCODES = {
+    "PtrMemD": ".*",
+    "PtrMemI": "->*",
+    "Mul": "*",
+    "Div": "/",
+    "Rem": "%",
+    "Add": "+",
+    "Sub": "-",
+    "Shl": "<<",
+    "Shr": ">>",
+    "Cmp": "<=>",
+    "LT": "<",
+    "GT": ">",
+    "LE": "<=",
+    "GE": ">=",
+    "EQ": "==",
+    "NE": "!=",
+    "And": "&",
+    "Xor": "^",
+    "Or": "|",
+    "LAnd": "&&",
+    "LOr": "||",
+    "Assign": "=",
+    "MulAssign": "*=",
+    "DivAssign": "/=",
+    "RemAssign": "%=",
+    "AddAssign": "+=",
+    "SubAssign": "-=",
+    "ShlAssign": "<<=",
+    "ShrAssign": ">>=",
+    "AndAssign": "&=",
+    "XorAssign": "^=",
+    "OrAssign": "|=",
+    "Comma": ",",
+}
+
+_OPERATOR_SPELLINGS = set(_BINARY_OPCODES.values()) | {"!", "~", "++", "--"}
+
+_OPERATOR_CHARS = set("+-*/%^&|~!=<>,[]()")
+
+# Initializer lists with at least this many elements, all literals, are kept
+# as one summary node (generated lookup tables); see `_literal_summary`.
+LITERAL_TABLE_THRESHOLD = 256
+
+_LITERAL_KINDS = {
+    CursorKind.INTEGER_LITERAL,
+    CursorKind.FLOATING_LITERAL,
+    CursorKind.STRING_LITERAL,
+    CursorKind.CHARACTER_LITERAL,
+    CursorKind.CXX_BOOL_LITERAL_EXPR,
+}
+_NULLPTR_KIND = getattr(CursorKind, "CXX_NULL_PTR_LITERAL_EXPR", None)
+if _NULLPTR_KIND is not None:
+    _LITERAL_KINDS.add(_NULLPTR_KIND)
+
+# Single-operand wrappers allowed around a table element: casts, (x), -x.
+_LITERAL_WRAPPER_KINDS = {CursorKind.UNEXPOSED_EXPR, CursorKind.PAREN_EXPR, CursorKind.UNARY_OPERATOR}
+
+# Literal spellings of a table written out in the main file, removed kind by
+# kind to count the elements. Quoted literals go first (they may contain
+# anything), then comments, then the rest.
+_TABLE_QUOTED = [
+    (b'"', CursorKind.STRING_LITERAL, re.compile(rb'(?:u8|u|U|L)?"[^"\\\n]*(?:\\.[^"\\\n]*)*"')),
+    # Not after a digit: 1'000 is a digit separator.
+    (b"'", CursorKind.CHARACTER_LITERAL, re.compile(rb"(?<![\w'])(?:u8|u|U|L)?'(?:[^'\\\n]|\\.)+'")),
+]
+_TABLE_LITERALS = [
+    (
+        CursorKind.FLOATING_LITERAL,
+        re.compile(rb"(?:\d[\d']*\.[\d']*|\.\d[\d']*|\d[\d']*(?=[eE]))(?:[eE][-+]?\d+)?[fFlL]?"),
+    ),
+    (CursorKind.INTEGER_LITERAL, re.compile(rb"(?:0[xX][\da-fA-F']+|0[bB][01']+|\d[\d']*)[uUlLzZ]*")),
+    (CursorKind.CXX_BOOL_LITERAL_EXPR, re.compile(rb"\b(?:true|false)\b")),
+]
+if _NULLPTR_KIND is not None:
+    _TABLE_LITERALS.append((_NULLPTR_KIND, re.compile(rb"\bnullptr\b")))
+_TABLE_COMMENTS = re.compile(rb"//[^\n]*|/\*.*?\*/", re.S)
+# Signs are left behind by negative numbers.
+_TABLE_PUNCTUATION = re.compile(rb"[\s{},+-]*")
+
+# Declarations whose COMPOUND_STMT child is a function body `walk_ast` may prune.
+_BODY_OWNER_KINDS = {
+    CursorKind.FUNCTION_DECL,
+    CursorKind.CXX_METHOD,
+    CursorKind.CONSTRUCTOR,
+    CursorKind.DESTRUCTOR,
+    CursorKind.CONVERSION_FUNCTION,
+    CursorKind.FUNCTION_TEMPLATE,
+}
+_MEMBER_FUNCTION_KINDS = {
+    CursorKind.CXX_METHOD,
+    CursorKind.CONSTRUCTOR,
+    CursorKind.DESTRUCTOR,
+    CursorKind.CONVERSION_FUNCTION,
+}
+_CLASS_PARENT_KINDS = {
+    CursorKind.CLASS_DECL,
+    CursorKind.STRUCT_DECL,
+    CursorKind.UNION_DECL,
+    CursorKind.CLASS_TEMPLATE,
+    CursorKind.CLASS_TEMPLATE_PARTIAL_SPECIALIZATION,
+}
+_TEMPLATE_PARENT_KINDS = {CursorKind.CLASS_TEMPLATE, CursorKind.CLASS_TEMPLATE_PARTIAL_SPECIALIZATION}
+
+# C++ tokens by maximal munch, close enough to tell `<` from `<<` or `->`.
+_BODY_TOKEN = re.compile(
+    rb"[A-Za-z_]\w*|\d(?:[eEpP][-+]|[\w.'])*|->\*?|<=>|<<=|>>=|\.\.\.|::|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\|"
+    rb"|[-+*/%&|^]=|\.\*|\S"
+)
+_MACRO_DEFINITION = re.compile(rb"^[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)", re.M)
+
+# Bit clang sets in the raw encoding of a location inside a macro expansion
+# (CXSourceLocation.int_data), so marking a node costs no libclang call.
+_MACRO_LOCATION_BIT = 1 << 31
+
+# What follows a function declarator in outline mode: `;` ends a prototype
+# (also `= 0`, `= default`, `= delete`), `{`, a constructor's `:` or `try`
+# starts the skipped body.
+_BODY_START = re.compile(rb";|\{|(?<!:):(?!:)|\btry\b")
+
+
+def _gap_tokens(cursor, start, end):
+    extent = cindex.SourceRange.from_locations(start, end)
+    return [
+        tok.spelling
+        for tok in cursor.translation_unit.get_tokens(extent=extent)
+        if start.offset <= tok.extent.start.offset < end.offset
+    ]
+
+
+class _FileText:
+    """
+    Bytes of the main file, read once. The text between two operand
+    extents is usually just the operator, which is then recognized without
+    tokenizing; anything else (comments, macros) returns None.
+    """
+
+    def __init__(self, path):
+        try:
+            with open(path, "rb") as f:
+                self.data = f.read()
+        except OSError:
+            self.data = b""
+
+    def text(self, start, end):
+        """
+        Source text between two offsets with whitespace collapsed, or None.
+        """
+        try:
+            text = self.data[start:end].decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return " ".join(text.split()) or None
+
+    def literal_table(self, start, end):
+        """
+        (count, element kind or None if mixed) if the text between two
+        offsets is a braced list of literals only, else None. Uses a few
+        whole-text regex passes, so a huge table never reaches libclang.
+        """
+        text = self.data[start:end]
+        counts = {}
+        for quote, kind, pattern in _TABLE_QUOTED:
+            if quote in text:
+                text, counts[kind] = pattern.subn(b" ", text)
+        if b"/" in text:
+            text = _TABLE_COMMENTS.sub(b" ", text)
+        for kind, pattern in _TABLE_LITERALS:
+            text, counts[kind] = pattern.subn(b" ", text)
+        counts = {kind: found for kind, found in counts.items() if found}
+        if not _TABLE_PUNCTUATION.fullmatch(text):
+            return None
+        return sum(counts.values()), next(iter(counts)) if len(counts) == 1 else None
+
+    def body_after(self, offset):
+        """
+        Offset of the body that follows a function declarator ending at
+        `offset`, or None for a prototype.
+        """
+        match = _BODY_START.search(self.data, offset)
+        if match is None or match.group() == b";":
+            return None
+        return match.start()
+
+    def between(self, start, end):
+        text = self.data[start.offset : end.offset].strip()
+        try:
+            text = text.decode("ascii")
+        except UnicodeDecodeError:
+            return None
+        return [text] if text in _OPERATOR_SPELLINGS else None
+
+
+class _BodyFilter:
     """
-    Recursively walks a Clang AST cursor and collects all nodes
-    into a flat list for the rule engine.
+    Decides from the source text whether a function body in the main file
+    can contain anything the enabled rules read (see BaseRule.body_tokens).
 
-    Each node also keeps its children for rules that need structure.
+    A body is needed if it spells one of `tokens`, holds a preprocessor
+    directive, or uses a macro defined in the main file or a non-system
+    header (its expansion is not in the text). A member function body
+    counts as containing `this` and a template body as containing
+    `template`, since members and dependent names need neither spelled out.
+    """
+
+    def __init__(self, translation_unit, file_text, tokens):
+        self.file_text = file_text
+        self.tokens = {token.encode("utf-8") for token in tokens}
+        self._translation_unit = translation_unit
+        self._macros = None
+
+    def _macro_names(self):
+        if self._macros is None:
+            names = set(_MACRO_DEFINITION.findall(self.file_text.data))
+            tu = self._translation_unit
+            seen = set()
+            try:
+                for inclusion in tu.get_includes():
+                    header = inclusion.include
+                    if header.name in seen:
+                        continue
+                    seen.add(header.name)
+                    if cindex.SourceLocation.from_position(tu, header, 1, 1).is_in_system_header:
+                        continue
+                    with open(header.name, "rb") as f:
+                        names.update(_MACRO_DEFINITION.findall(f.read()))
+            except (OSError, AttributeError):
+                pass
+            self._macros = names
+        return self._macros
+
+    def needed(self, body, owner):
+        extent = body.extent
+        text = self.file_text.data[extent.start.offset : extent.end.offset]
+        if b"#" in text:
+            return True
+        spelled = set(_BODY_TOKEN.findall(text))
+        kind = owner["kind"]
+        semantic_parent = None
+        if kind in _MEMBER_FUNCTION_KINDS or kind == CursorKind.FUNCTION_TEMPLATE:
+            semantic_parent = owner["cursor"].semantic_parent
+        if kind in _MEMBER_FUNCTION_KINDS or (
+            semantic_parent is not None and semantic_parent.kind in _CLASS_PARENT_KINDS
+        ):
+            spelled.add(b"this")
+        if kind == CursorKind.FUNCTION_TEMPLATE or (
+            semantic_parent is not None and semantic_parent.kind in _TEMPLATE_PARENT_KINDS
+        ):
+            spelled.add(b"template")
+        if spelled & self.tokens:
+            return True
+        return bool(spelled & self._macro_names())
+
+
+def _literal_summary(cursor, children):
+    """
+    Summary of an initializer list whose elements are all literals (maybe
+    negated, cast or parenthesized, or nested lists of such): {"count",
+    "element_kind" (None if mixed), "extent" (start, end offsets), "lines"}.
+    None as soon as another element is seen.
+    """
+    count = 0
+    kinds = set()
+    stack = list(children)
+    while stack:
+        element = stack.pop()
+        kind = element.kind
+        if kind in _LITERAL_KINDS:
+            count += 1
+            kinds.add(kind)
+            continue
+        if kind == CursorKind.INIT_LIST_EXPR:
+            stack.extend(element.get_children())
+            continue
+        if kind not in _LITERAL_WRAPPER_KINDS:
+            return None
+        operands = list(element.get_children())
+        if len(operands) != 1:
+            return None
+        stack.append(operands[0])
+
+    extent = cursor.extent
+    return {
+        "count": count,
+        "element_kind": next(iter(kinds)) if len(kinds) == 1 else None,
+        "extent": (extent.start.offset, extent.end.offset),
+        "lines": (extent.start.line, extent.end.line),
+    }
+
+
+def _text_literal_summary(cursor, file_text):
+    """
+    `_literal_summary` for a list written out in the main file, read from
+    its text before its children are ever listed.
+    """
+    extent = cursor.extent
+    start, end = extent.start.offset, extent.end.offset
+    # Each element takes at least two bytes ("1,"); skip small lists quickly.
+    if end - start < 2 * LITERAL_TABLE_THRESHOLD:
+        return None
+    table = file_text.literal_table(start, end)
+    if table is None or table[0] < LITERAL_TABLE_THRESHOLD:
+        return None
+    return {
+        "count": table[0],
+        "element_kind": table[1],
+        "extent": (start, end),
+        "lines": (extent.start.line, extent.end.line),
+    }
+
+
+class _SkippedBody:
+    """
+    Stack entry for a body the parser skipped (outline mode), visited
+    after the function's other children so it stays the last child.
+    """
+
+    def __init__(self, line):
+        self.line = line
+
+
+def _operator_gap(cursor, file_text, start, end):
+    spelled = file_text.between(start, end) if file_text is not None else None
+    return spelled if spelled is not None else _gap_tokens(cursor, start, end)
+
+
+def _operator_written(cursor, file_text):
+    """
+    True if a binary operator whose extent starts in a macro expansion
+    (`LIMIT < x`) has its operator written in the file between its
+    operands. A comma there separates macro arguments instead.
+    """
+    operands = list(cursor.get_children())
+    if len(operands) != 2:
+        return False
+    spelled = file_text.between(operands[0].extent.end, operands[1].extent.start)
+    return spelled is not None and spelled[0] != ","
+
+
+def resolve_operator(cursor, kind, children, file_text=None, in_macro=False):
+    """
+    Opcode of an operator node, e.g. "<=" or "++", or None.
+
+    Built-in binary operators use libclang's binary-operator kind where the
+    bindings expose it, and otherwise the single token between the operand
+    extents; unary operators use the tokens outside the operand. Overloaded
+    operator calls take it from the callee name ("operator<<").
+    `file_text`, when given, holds the text of the file `cursor` is in.
+    Inside a macro expansion (`in_macro`) operand extents all point at the
+    macro invocation, so only the bindings' opcode is used there.
+    """
+    if kind in _OPERATOR_KINDS:
+        try:
+            if kind != CursorKind.UNARY_OPERATOR:
+                opcode = getattr(cursor, "binary_operator", None)
+                if opcode is not None and opcode.name in _BINARY_OPCODES:
+                    return _BINARY_OPCODES[opcode.name]
+                if in_macro or len(children) != 2:
+                    return None
+                spelled = _operator_gap(cursor, file_text, children[0].extent.end, children[1].extent.start)
+                return spelled[0] if len(spelled) == 1 else None
+            if in_macro or len(children) != 1:
+                return None
+            operand = children[0].extent
+            own = cursor.extent
+            if own.start.offset < operand.start.offset:
+                spelled = _operator_gap(cursor, file_text, own.start, operand.start)
+            else:
+                spelled = _operator_gap(cursor, file_text, operand.end, own.end)
+            return spelled[0] if spelled else None
+        except Exception:
+            return None
+
+    if kind == CursorKind.CALL_EXPR or (_OPERATOR_CALL_KIND is not None and kind == _OPERATOR_CALL_KIND):
+        name = cursor.spelling or ""
+        if name.startswith("operator"):
+            symbol = name[len("operator") :].strip()
+            if symbol and all(ch in _OPERATOR_CHARS for ch in symbol):
+                return symbol
+    return None
+
+
+def _resolve_usrs(cursor, kind):
+    usr = None
+    ref_usr = None
+    try:
+        if kind in _USR_DECL_KINDS:
+            usr = cursor.get_usr() or None
+        elif kind in _USR_REF_KINDS:
+            referenced = cursor.referenced
+            if referenced is not None:
+                ref_usr = referenced.get_usr() or None
+    except Exception:
+        pass
+    return usr, ref_usr
+
+
+def walk_ast(
+    cursor,
+    nodes,
+    *,
+    debug=False,
+    parent=None,
+    target_file=None,
+    body_tokens=None,
+    outline=False,
+    _realpath_cache=None,
+):
+    """
+    Walks a Clang AST cursor and collects all nodes
+    into a flat list for the rule engine, in pre-order.
+
+    Nodes keep their children, USRs ("usr", "ref_usr"), opcode
+    ("operator") and macro marks ("macro", "macro_text"). Large literal
+    tables, and function bodies none of `body_tokens` appear in, become
+    childless summary nodes; `outline` walks declarations only. The
+    collapsed semantic view is linked in afterwards (`_link_semantic`).
+    Returns the node for `cursor`, or None if it is outside `target_file`.
     """
 
     if _realpath_cache is None:
         _realpath_cache = {}
 
-    cursor_file = cursor.location.file.name if cursor.location.file else None
-    if target_file and cursor_file:
-        cached = _realpath_cache.get(cursor_file)
-        if cached is None:
-            cached = os.path.realpath(cursor_file)
-            _realpath_cache[cursor_file] = cached
-        if cached != target_file:
-            return None
+    # Operators in the main file are read from its text where possible.
+    main_file = cursor.spelling if cursor.kind == CursorKind.TRANSLATION_UNIT else None
+    main_text = None
+    bodies = None
+
+    first = len(nodes)
+    root = None
+    stack = [(cursor, parent)]
+    while stack:
+        current, parent_node = stack.pop()
+        if current.__class__ is _SkippedBody:
+            body = _skipped_body_node(parent_node, current.line)
+            nodes.append(body)
+            parent_node["children"].append(body)
+            continue
+        location = current.location
+        location_file = location.file
+        cursor_file = location_file.name if location_file else None
+        if target_file and cursor_file:
+            cached = _realpath_cache.get(cursor_file)
+            if cached is None:
+                cached = os.path.realpath(cursor_file)
+                _realpath_cache[cursor_file] = cached
+            if cached != target_file:
+                continue
+
+        kind = current.kind
+        usr, ref_usr = _resolve_usrs(current, kind)
+        in_macro = bool(location.int_data & _MACRO_LOCATION_BIT)
+        file_text = None
+        if (kind in _OPERATOR_KINDS or kind == CursorKind.INIT_LIST_EXPR or in_macro) and (
+            main_file and cursor_file == main_file
+        ):
+            if main_text is None:
+                main_text = _FileText(main_file)
+            file_text = main_text
+        if in_macro and file_text is not None and kind != CursorKind.UNARY_OPERATOR and kind in _OPERATOR_KINDS:
+            in_macro = not _operator_written(current, file_text)
+        literals = None
+        if kind == CursorKind.INIT_LIST_EXPR and file_text is not None and not in_macro:
+            literals = _text_literal_summary(current, file_text)
+        pruned = False
+        if (
+            body_tokens is not None
+            and kind == CursorKind.COMPOUND_STMT
+            and parent_node is not None
+            and parent_node["kind"] in _BODY_OWNER_KINDS
+            and main_file
+            and cursor_file == main_file
+            and not in_macro
+        ):
+            if bodies is None:
+                if main_text is None:
+                    main_text = _FileText(main_file)
+                bodies = _BodyFilter(current.translation_unit, main_text, body_tokens)
+            pruned = not bodies.needed(current, parent_node)
+        children = list(current.get_children()) if literals is None and not pruned else []
+        if outline:
+            children = [child for child in children if child.kind.is_declaration()]
+        if kind == CursorKind.INIT_LIST_EXPR and literals is None and len(children) >= LITERAL_TABLE_THRESHOLD:
+            literals = _literal_summary(current, children)
+            if literals is not None:
+                children = []
+        macro_text = None
+        if in_macro and file_text is not None and not (parent_node is not None and parent_node.get("macro")):
+            extent = current.extent
+            macro_text = file_text.text(extent.start.offset, extent.end.offset)
+
+        node = {
+            "kind": kind,
+            "name": current.spelling,
+            "line": location.line,
+            "children": [],
+            "cursor": current,
+            "parent": parent_node,
+            "file": cursor_file,
+            "usr": usr,
+            "ref_usr": ref_usr,
+            "operator": resolve_operator(current, kind, children, file_text, in_macro),
+            "macro": in_macro,
+            "macro_text": macro_text,
+            "literals": literals,
+            "pruned": pruned,
+        }
+
+        nodes.append(node)
+        if root is None:
+            root = node
+        else:
+            parent_node["children"].append(node)
+
+        if debug:
+            print("VISITING:", current.kind)
 
-    node = {
-        "kind": cursor.kind,
-        "name": cursor.spelling,
-        "line": cursor.location.line,
+        if outline and kind in _BODY_OWNER_KINDS and main_file and cursor_file == main_file:
+            if main_text is None:
+                main_text = _FileText(main_file)
+            body_line = _skipped_body_line(current, main_text, in_macro)
+            if body_line is not None:
+                stack.append((_SkippedBody(body_line), node))
+
+        for child in reversed(children):
+            stack.append((child, node))
+
+    _link_semantic(nodes, first)
+    return root
+
+
+def _skipped_body_line(cursor, file_text, in_macro):
+    """
+    Line of the body the parser skipped for a function cursor, or None if
+    the declaration is a prototype. Declarations written by a macro count
+    as having a body, since their text is not the macro's.
+    """
+    location = cursor.location
+    if in_macro:
+        return location.line
+    start = file_text.body_after(cursor.extent.end.offset)
+    if start is None:
+        return None
+    return location.line + file_text.data.count(b"\n", location.offset, start)
+
+
+def _skipped_body_node(function_node, line):
+    return {
+        "kind": CursorKind.COMPOUND_STMT,
+        "name": "",
+        "line": line,
         "children": [],
-        "cursor": cursor,
-        "parent": parent,
-        "file": cursor_file,
+        "cursor": None,
+        "parent": function_node,
+        "file": function_node["file"],
+        "usr": None,
+        "ref_usr": None,
+        "operator": None,
+        "macro": function_node["macro"],
+        "macro_text": None,
+        "literals": None,
+        "pruned": True,
     }
 
-    nodes.append(node)
-
-    if debug:
-        print("VISITING:", cursor.kind)
 
-    for child in cursor.get_children():
-        child_node = walk_ast(
-            child,
-            nodes,
-            debug=debug,
-            parent=node,
-            target_file=target_file,
-            _realpath_cache=_realpath_cache,
-        )
-        if child_node is not None:
-            node["children"].append(child_node)
+def _link_semantic(nodes, first):
+    """
+    Adds the wrapper-collapsed view to nodes[first:]: "semantic" skips
+    single-child UNEXPOSED_EXPR/PAREN_EXPR chains (implicit casts and
+    parentheses), "semantic_children" holds each child's semantic node and
+    "semantic_parent" is the nearest ancestor that is not such a wrapper.
+    A collapsed wrapper hands its "macro_text" to the node it stands for.
+    The raw "children"/"parent" links are unchanged.
+    """
+    # Reverse pre-order visits children before their parents.
+    for i in range(len(nodes) - 1, first - 1, -1):
+        node = nodes[i]
+        children = node["children"]
+        if node["kind"] in WRAPPER_KINDS and len(children) == 1:
+            target = children[0]["semantic"]
+            node["semantic"] = target
+            if node.get("macro_text") and not target.get("macro_text"):
+                target["macro_text"] = node["macro_text"]
+        else:
+            node["semantic"] = node
+        if any(child["semantic"] is not child for child in children):
+            node["semantic_children"] = [child["semantic"] for child in children]
+        else:
+            # No child is a wrapper: share the raw list.
+            node["semantic_children"] = children
 
-    return node
+    for i in range(first, len(nodes)):
+        node = nodes[i]
+        parent = node["parent"]
+        if parent is not None and parent.get("semantic", parent) is not parent:
+            parent = parent.get("semantic_parent")
+        node["semantic_parent"] = parent
@@ -1,4 +1,21 @@
 class BaseRule:
+    # Set by rules that read MACRO_DEFINITION/MACRO_INSTANTIATION or
+    # INCLUSION_DIRECTIVE nodes; the file is then parsed with the detailed
+    # processing record. Macro-expanded nodes are marked ("macro") either way.
+    needs_macros = False
+    # Source tokens (keywords, names, punctuators) a function body must
+    # spell for this rule to read any of its nodes, e.g. {"for", "while",
+    # "do"} for a loop rule; None means every body is read. When all
+    # enabled rules declare them, walk_ast prunes bodies spelling none.
+    body_tokens = None
+
+    def prepare(self, context):
+        """
+        Optional hook called once per file before any node is matched.
+        `context` exposes the shared per-file indexes (AnalysisContext).
+        """
+        self.context = context
+
     def matches(self, node):
         raise NotImplementedError("matches() must be implemented")
 
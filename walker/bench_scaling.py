@@ -0,0 +1,513 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ast_parser import parse_cpp_file
+from ast_walker import walk_ast
+from rule_engine import RuleEngine
+
+
+CASES = {}
+
+
+def _case(name, sizes, rules):
+    """
+    Register a generator that returns C++ source for a given size.
+    `rules` is a zero-argument callable returning the rules to run.
+    """
+
+    def register(generator):
+        CASES[name] = {
+            "generator": generator,
+            "sizes": sizes,
+            "rules": rules,
+            "doc": (generator.__doc__ or "").strip(),
+        }
+        return generator
+
+    return register
+
+
+def _uninitialized_rules():
+    from uninitialized_local_rule import UninitializedLocalRule
+
+    return [UninitializedLocalRule()]
+
+
+@_case("uninitialized", [100, 200, 400, 800], _uninitialized_rules)
+def _gen_uninitialized(size):
+    """One function with `size` uninitialized locals and ~10 statements per local."""
+    lines = ["int main() {"]
+    for i in range(size):
+        lines.append(f"    int v{i};")
+    for i in range(size):
+        lines.append(f"    if (v{i - 1 if i else 0} > {i}) {{")
+        lines.append(f"        v{i} = {i};")
+        lines.append("    } else {")
+        lines.append(f"        v{i} = -{i};")
+        lines.append("    }")
+        lines.append(f"    for (int k{i} = 0; k{i} < 3; k{i}++) {{")
+        lines.append(f"        v{i} += k{i};")
+        lines.append("    }")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _unused_function_rules():
+    from unused_function_rule import UnusedFunctionRule
+
+    return [UnusedFunctionRule()]
+
+
+@_case("unused_functions", [500, 1000, 2000], _unused_function_rules)
+def _gen_unused_functions(size):
+    """`size` small functions, each calling the next; every tenth is never called."""
+    lines = []
+    for i in range(size):
+        callee = f"f{i + 1}(x - 1)" if i + 1 < size and (i + 1) % 10 else "x"
+        lines.append(f"int f{i}(int x) {{")
+        lines.append(f"    if (x > {i}) {{")
+        lines.append(f"        return {callee} + {i};")
+        lines.append("    }")
+        lines.append(f"    return x * {i};")
+        lines.append("}")
+    lines.append("int main() {")
+    lines.append("    return f0(3);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _loop_rules():
+    from constant_condition_rule import ConstantConditionRule
+    from empty_loop_body_rule import EmptyLoopBodyRule
+    from for_loop_rule import ForLoopRule
+    from loop_update_rule import LoopUpdateRule
+
+    return [LoopUpdateRule(), EmptyLoopBodyRule(), ForLoopRule(), ConstantConditionRule()]
+
+
+@_case("loops", [50, 100, 200, 400], _loop_rules)
+def _gen_loops(size):
+    """`size` while-loops, each wrapping a for-loop over a 20-statement body."""
+    lines = ["int main() {", "    int total = 0;"]
+    for i in range(size):
+        lines.append(f"    int w{i} = 0;")
+        lines.append(f"    while (w{i} < {i + 3}) {{")
+        lines.append(f"        for (int k = 0; k < {i + 2}; k++) {{")
+        for j in range(20):
+            lines.append(f"            total += k * {j} + w{i};")
+        lines.append("        }")
+        lines.append(f"        w{i}++;")
+        lines.append("    }")
+    lines.append("    return total;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _io_rules():
+    from io_rules import IOStreamRule
+
+    return [IOStreamRule()]
+
+
+@_case("iostream", [1250, 2500, 5000, 10000], _io_rules)
+def _gen_iostream(size):
+    """`size` cout statements spread over an if/else and a four-case switch."""
+    lines = ["#include <iostream>", "using namespace std;", "int main(int argc, char **argv) {"]
+    per_branch = max(1, size // 6)
+
+    def outputs(indent, start):
+        for i in range(start, start + per_branch):
+            lines.append(f'{indent}cout << "value " << {i} << " of " << argc << endl;')
+
+    lines.append("    if (argc > 1) {")
+    outputs("        ", 0)
+    lines.append("    } else {")
+    outputs("        ", per_branch)
+    lines.append("    }")
+    lines.append("    switch (argc) {")
+    for case in range(4):
+        lines.append(f"    case {case}:")
+        outputs("        ", (case + 2) * per_branch)
+        lines.append("        break;")
+    lines.append("    }")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _contradictory_rules():
+    from contradictory_condition_rule import ContradictoryConditionRule
+
+    return [ContradictoryConditionRule()]
+
+
+@_case("guards", [50, 100, 200, 400], _contradictory_rules)
+def _gen_guards(size):
+    """20 if-statements, each guarded by a `size`-term &&/|| condition."""
+    lines = ["int main(int argc, char **argv) {", "    int x = argc;", "    int y = argc * 2;", "    int hits = 0;"]
+    for i in range(20):
+        terms = []
+        for j in range(size):
+            if j % 3 == 0:
+                terms.append(f"x != {j}")
+            elif j % 3 == 1:
+                terms.append(f"({j} < y || y == -{j})")
+            else:
+                terms.append(f"!(x == {j + 1000})")
+        if i % 2:
+            terms.append(f"x < {size}")
+            terms.append(f"x > {size + 10}")
+        lines.append(f"    if ({' && '.join(terms)}) {{")
+        lines.append("        hits++;")
+        lines.append("    }")
+    lines.append("    return hits;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _division_rules():
+    from division_by_zero_rule import DivisionByZeroRule
+
+    return [DivisionByZeroRule()]
+
+
+@_case("divisions", [100, 200, 400, 800], _division_rules)
+def _gen_divisions(size):
+    """One function with `size` locals, each divided by after a branch or loop."""
+    lines = ["int main(int argc, char **argv) {", "    int total = argc;"]
+    for i in range(size):
+        lines.append(f"    int d{i} = {i % 3};")
+        if i % 2:
+            lines.append(f"    if (argc > {i}) {{ d{i} = {i}; }}")
+        else:
+            lines.append(f"    for (int k = 0; k < argc; k++) {{ d{i} += k; }}")
+        lines.append(f"    total += argc / d{i};")
+    lines.append("    return total;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _shadow_rules():
+    from shadowed_variable_rule import ShadowedVariableRule
+
+    return [ShadowedVariableRule()]
+
+
+@_case("scopes", [25, 50, 100, 200], _shadow_rules)
+def _gen_scopes(size):
+    """Blocks nested `size` deep, each declaring 20 locals and re-declaring one."""
+    lines = ["int main(int argc, char **argv) {", "    int v0 = argc;"]
+    for depth in range(size):
+        indent = "    " * (depth + 1)
+        lines.append(f"{indent}{{")
+        for j in range(20):
+            lines.append(f"{indent}    int d{depth}_{j} = {j};")
+        lines.append(f"{indent}    int v0 = d{depth}_0;")
+    for depth in reversed(range(size)):
+        lines.append("    " * (depth + 1) + "}")
+    lines.append("    return v0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _render_rules():
+    from control_flow_rules import ControlFlowRule
+    from for_loop_rule import ForLoopRule
+    from io_rules import IOStreamRule
+    from while_loop_rule import WhileLoopRule
+
+    return [ControlFlowRule(), WhileLoopRule(), ForLoopRule(), IOStreamRule()]
+
+
+@_case("conditions", [250, 500, 1000, 2000], _render_rules)
+def _gen_conditions(size):
+    """An if, a while and a for, each on a `size`-term condition, around 20 cout statements."""
+    terms = []
+    for j in range(size):
+        if j % 2:
+            terms.append(f"({j} < y || y == -{j})")
+        else:
+            terms.append(f"x != {j}")
+    condition = " && ".join(terms)
+    lines = ["#include <iostream>", "using namespace std;", "int main(int argc, char **argv) {"]
+    lines.append("    int x = argc;")
+    lines.append("    int y = argc * 2;")
+    lines.append(f"    if ({condition}) {{")
+    for i in range(10):
+        lines.append(f'        cout << "hit " << {i} << endl;')
+    lines.append("    }")
+    lines.append(f"    while ({condition}) {{")
+    for i in range(10):
+        lines.append(f'        cout << "loop " << {i} << endl;')
+    lines.append("        x++;")
+    lines.append("    }")
+    lines.append(f"    for (int k = 0; {condition}; k++) {{")
+    lines.append("        y--;")
+    lines.append("    }")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _chain_rules():
+    from duplicate_branch_condition_rule import DuplicateBranchConditionRule
+    from io_rules import IOStreamRule
+    from missing_return_rule import MissingReturnRule
+    from unreachable_elseif_rule import UnreachableElseIfRule
+
+    return [DuplicateBranchConditionRule(), UnreachableElseIfRule(), MissingReturnRule(), IOStreamRule()]
+
+
+@_case("chains", [125, 250, 500, 1000], _chain_rules)
+def _gen_chains(size):
+    """One if/else-if chain with `size` branches, each printing and returning."""
+    lines = ["#include <iostream>", "using namespace std;", "int pick(int x) {"]
+    for i in range(size):
+        keyword = "if" if i == 0 else "} else if"
+        lines.append(f"    {keyword} (x == {i}) {{")
+        lines.append(f'        cout << "branch " << {i} << endl;')
+        lines.append(f"        return {i};")
+    lines.append("    } else {")
+    lines.append("        return -1;")
+    lines.append("    }")
+    lines.append("}")
+    lines.append("int main(int argc, char **argv) {")
+    lines.append("    return pick(argc);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+
+def _switch_rules():
+    from switch_safety_rule import SwitchSafetyRule
+
+    return [SwitchSafetyRule()]
+
+
+@_case("switches", [500, 1000, 2000, 4000], _switch_rules)
+def _gen_switches(size):
+    """A generated state machine: an enum of `size` states and a switch with one case per state but the last."""
+    lines = ["enum State {"]
+    for i in range(size):
+        lines.append(f"    S{i},")
+    lines.append("};")
+    lines.append("int step(State s, int x) {")
+    lines.append("    switch (s) {")
+    for i in range(size - 1):
+        lines.append(f"    case S{i}:")
+        if i % 3 == 0:
+            lines.append("        x += 1;")
+            lines.append("        [[fallthrough]];")
+        elif i % 3 == 1:
+            lines.append(f"        if (x > {i}) return x;")
+            lines.append("        break;")
+        else:
+            lines.append(f"        return {i};")
+    lines.append("    }")
+    lines.append("    return x;")
+    lines.append("}")
+    lines.append("int main() {")
+    lines.append("    return step(S0, 0);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _class_rules():
+    from class_field_rules import ClassFieldRule
+
+    return [ClassFieldRule()]
+
+
+@_case("classes", [100, 200, 400, 800], _class_rules)
+def _gen_classes(size):
+    """One class with `size` fields, a constructor initializing all of them and `size` more initializing two each."""
+    lines = ["template <int N> struct Tag {};", "class Wide {", "public:"]
+    for i in range(size):
+        initializer = " = 0" if i % 2 else ""
+        lines.append(f"    int f{i}{initializer};")
+    lines.append("    Wide() : " + ", ".join(f"f{i}(0)" for i in range(size)) + " {}")
+    for i in range(size):
+        lines.append(f"    Wide(int a, Tag<{i}>) : f{i}(a) {{")
+        lines.append(f"        f{(i + 1) % size} = a + 1;")
+        lines.append("    }")
+    lines.append("    int sum() const {")
+    lines.append("        return " + " + ".join(f"f{i}" for i in range(0, size, 3)) + ";")
+    lines.append("    }")
+    lines.append("};")
+    lines.append("int main() {")
+    lines.append("    Wide w(1, Tag<0>());")
+    lines.append("    return w.sum();")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _macro_rules():
+    from constant_condition_rule import ConstantConditionRule
+    from control_flow_rules import ControlFlowRule
+    from do_while_rule import DoWhileRule
+
+    return [ConstantConditionRule(), ControlFlowRule(), DoWhileRule()]
+
+
+@_case("macros", [100, 200, 400, 800], _macro_rules)
+def _gen_macros(size):
+    """`size` helper macros, each used once: checks, swaps and arithmetic expanded from macros."""
+    lines = []
+    for i in range(size):
+        lines.append(f"#define CHECK_{i}(c) if (!(c)) return -{i}")
+        lines.append(f"#define SWAP_{i}(a, b) do {{ int t_ = (a); (a) = (b); (b) = t_; }} while (0)")
+        lines.append(f"#define SCALE_{i}(x) ((x) * {i} + LIMIT)")
+    lines.insert(0, "#define LIMIT 10")
+    lines.append("int run(int x, int y) {")
+    for i in range(size):
+        lines.append(f"    CHECK_{i}(x > {i});")
+        lines.append(f"    SWAP_{i}(x, y);")
+        lines.append(f"    y += SCALE_{i}(x);")
+    lines.append("    return x + y;")
+    lines.append("}")
+    lines.append("int main(int argc, char **argv) {")
+    lines.append("    return run(argc, 1);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _table_rules():
+    from engine_factory import build_engine
+
+    return build_engine().rules
+
+
+@_case("tables", [25000, 50000, 100000, 200000], _table_rules)
+def _gen_tables(size):
+    """Generated lookup tables holding `size` literals in total, read by a small function (all rules)."""
+    rows = max(1, size // 1000)
+    lines = ["#include <iostream>", "using namespace std;"]
+    lines.append(f"static const int table[] = {{")
+    for r in range(rows // 2):
+        lines.append("    " + ", ".join(str((r * 1000 + i) * 7919 % 100003 - 50000) for i in range(1000)) + ",")
+    lines.append("};")
+    lines.append(f"static const double weights[][4] = {{")
+    for r in range((rows - rows // 2) * 250):
+        lines.append(f"    {{{r}.5, -{r}.25, 1e-3, {r % 7}}},")
+    lines.append("};")
+    lines.append('static const char *names[] = {"alpha", "beta", "gamma", nullptr};')
+    lines.append("int lookup(int i) {")
+    lines.append("    int total = table[i] + (int)weights[i][0];")
+    lines.append('    cout << names[i % 3] << " " << total << endl;')
+    lines.append("    return total;")
+    lines.append("}")
+    lines.append("int main(int argc, char **argv) {")
+    lines.append("    return lookup(argc);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def _io_group_rules():
+    from engine_factory import build_engine
+
+    return build_engine(["io"]).rules
+
+
+@_case("pruning", [100, 200, 400, 800], _io_group_rules)
+def _gen_pruning(size):
+    """`size` arithmetic helpers, one in ten printing its result (io group only)."""
+    lines = ["#include <iostream>", "using namespace std;"]
+    for i in range(size):
+        lines.append(f"int helper{i}(int a, int b) {{")
+        lines.append("    int total = 0;")
+        for j in range(8):
+            lines.append(f"    total += (a * {j + 1} + b) * (a - {j}) / (b + {j + 1}) + (total >> {j % 3});")
+        if i % 10 == 0:
+            lines.append(f'    cout << "helper{i}: " << total << endl;')
+        lines.append("    return total;")
+        lines.append("}")
+    lines.append("int main(int argc, char **argv) {")
+    lines.append("    return helper0(argc, 1);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000.0
+
+
+def run_case(name, size, memory=False, detailed=False):
+    case = CASES[name]
+    source = case["generator"](size)
+
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, f"bench_{name}_{size}.cpp")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+        start = time.perf_counter()
+        translation_unit = parse_cpp_file(path, detailed=detailed)
+        parse_ms = _ms(start)
+
+        engine = RuleEngine(case["rules"]())
+        start = time.perf_counter()
+        nodes = []
+        walk_ast(
+            translation_unit.cursor,
+            nodes,
+            target_file=os.path.realpath(path),
+            body_tokens=engine.body_tokens,
+        )
+        traversal_ms = _ms(start)
+
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        engine.run(nodes)
+        interpretation_ms = _ms(start)
+        peak_kb = None
+        if memory:
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024.0
+            tracemalloc.stop()
+
+    return {
+        "size": size,
+        "bytes": len(source),
+        "nodes": len(nodes),
+        "parse": parse_ms,
+        "traversal": traversal_ms,
+        "interpretation": interpretation_ms,
+        "peak_kb": peak_kb,
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    memory = "--memory" in args
+    # Parse with the detailed processing record, as when a rule needs macros.
+    detailed = "--detailed" in args
+    args = [a for a in args if a not in {"--memory", "--detailed"}]
+    if not args or args[0] not in CASES:
+        print("Usage: python3 bench_scaling.py <case> [size ...] [--memory] [--detailed]")
+        for name, case in sorted(CASES.items()):
+            print(f"  {name}: {case['doc']}")
+        sys.exit(1)
+
+    name = args[0]
+    sizes = [int(a) for a in args[1:]] or CASES[name]["sizes"]
+
+    base = None
+    for size in sizes:
+        row = run_case(name, size, memory=memory, detailed=detailed)
+        per_node = row["interpretation"] / max(1, row["nodes"]) * 1000.0
+        if base is None:
+            base = row
+        growth = row["interpretation"] / max(base["interpretation"], 1e-9)
+        peak = f", peak: {row['peak_kb']:.0f} KB" if row["peak_kb"] is not None else ""
+        print(
+            f"[{name}] size={size} nodes={row['nodes']} parse: {row['parse']:.1f} ms, "
+            f"traversal: {row['traversal']:.1f} ms, interpretation: {row['interpretation']:.1f} ms "
+            f"({per_node:.2f} us/node, x{growth:.2f} vs size={base['size']}){peak}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from collections import deque
+
+from clang.cindex import CursorKind, conf
+
+from symbol_index import FUNCTION_KINDS
+
+
+# Called implicitly or through dispatch the graph cannot see.
+_IMPLICIT_ENTRY_KINDS = {CursorKind.CXX_METHOD, CursorKind.CONSTRUCTOR, CursorKind.DESTRUCTOR}
+
+
+class CallGraph:
+    """
+    USR-keyed graph of which functions reference which.
+
+    An edge caller -> callee is recorded for every reference to a function
+    inside another function's body: direct calls, method calls, functions
+    whose address is taken, and calls made from lambdas (attributed to the
+    enclosing function). References at file scope, such as a global
+    initializer or a table of function pointers, make the callee an entry
+    point, as do `main` and member functions. `reachable` is filled by one
+    breadth-first search from the entry points.
+    """
+
+    def __init__(self, nodes, symbols):
+        self.symbols = symbols
+        self.functions = set()
+        self.edges = {}
+        self.callers = {}
+        self.entries = set()
+        # Names with at least one resolved reference.
+        self.called_names = set()
+        self.has_main = False
+        self.mains = set()
+        self._templates = {}
+        self._build(nodes)
+        self.reachable = self._search()
+
+    def _build(self, nodes):
+        for node in nodes:
+            kind = node.get("kind")
+            usr = node.get("usr")
+            if kind in FUNCTION_KINDS and usr:
+                self.functions.add(usr)
+                if node.get("name") == "main" and kind == CursorKind.FUNCTION_DECL:
+                    self.has_main = True
+                    self.mains.add(usr)
+                    self.entries.add(usr)
+                elif kind in _IMPLICIT_ENTRY_KINDS:
+                    self.entries.add(usr)
+                continue
+
+            callee = node.get("ref_usr")
+            if not callee:
+                continue
+            symbol = self.symbols.get(callee)
+            if symbol is None:
+                continue
+            if symbol.kind is None:
+                # Template specializations are only declared implicitly.
+                callee = self._template_usr(node, callee)
+            elif symbol.kind not in FUNCTION_KINDS:
+                continue
+            if callee is None:
+                continue
+            caller = self.symbols.enclosing_function(node)
+            caller_usr = caller.get("usr") if caller is not None else None
+            self.called_names.add(symbol.name or node.get("name"))
+            if caller_usr is None:
+                self.entries.add(callee)
+                continue
+            self.edges.setdefault(caller_usr, set()).add(callee)
+            self.callers.setdefault(callee, set()).add(caller_usr)
+
+    def _template_usr(self, node, usr):
+        if usr in self._templates:
+            return self._templates[usr]
+        result = None
+        cursor = node.get("cursor")
+        try:
+            referenced = cursor.referenced if cursor is not None else None
+            if referenced is not None and referenced.kind in FUNCTION_KINDS:
+                # The Python bindings register this call but expose no property.
+                template = conf.lib.clang_getSpecializedCursorTemplate(referenced)
+                result = (template.get_usr() if template is not None else None) or usr
+        except Exception:
+            result = None
+        self._templates[usr] = result
+        return result
+
+    def _search(self):
+        seen = set(self.entries)
+        queue = deque(self.entries)
+        while queue:
+            usr = queue.popleft()
+            for callee in self.edges.get(usr, ()):
+                if callee not in seen:
+                    seen.add(callee)
+                    queue.append(callee)
+        return seen
+
+    def is_reachable(self, usr):
+        return usr in self.reachable
+
+    def has_callers(self, usr):
+        """
+        True if another function (or file-scope code) references `usr`.
+        """
+        if usr in self.entries and usr not in self.mains:
+            return True
+        return any(caller != usr for caller in self.callers.get(usr, ()))
+
+    def to_dict(self):
+        """
+        JSON-ready form: {"nodes": [...], "edges": [[caller, callee], ...]}.
+        """
+        out_nodes = []
+        for usr in sorted(set(self.functions) | set(self.callers)):
+            symbol = self.symbols.get(usr)
+            out_nodes.append({
+                "usr": usr,
+                "name": symbol.name if symbol is not None else None,
+                "line": symbol.line if symbol is not None else None,
+                "defined": symbol is not None and symbol.definition is not None,
+                "entry": usr in self.entries,
+                "reachable": usr in self.reachable,
+            })
+        edges = [[caller, callee] for caller in sorted(self.edges) for callee in sorted(self.edges[caller])]
+        return {"nodes": out_nodes, "edges": edges}
@@ -0,0 +1,420 @@
+from clang import cindex
+from clang.cindex import CursorKind
+
+from expr_renderer import find_condition_node
+
+
+_THROW_KIND = getattr(CursorKind, "CXX_THROW_EXPR", None)
+_FOR_RANGE_KIND = getattr(CursorKind, "CXX_FOR_RANGE_STMT", None)
+_TRY_KIND = getattr(CursorKind, "CXX_TRY_STMT", None)
+_LABEL_KIND = getattr(CursorKind, "LABEL_STMT", None)
+
+
+class BasicBlock:
+    """
+    A straight-line run of statement-level nodes.
+
+    `items` holds the nodes evaluated in the block, in execution order
+    (declarations, expression statements, branch conditions, returns).
+    A block ending in a two-way branch records it in `branch` as
+    (condition, true_successor, false_successor).
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.items = []
+        self.succs = []
+        self.preds = []
+        self.branch = None
+
+
+class ControlFlowGraph:
+    def __init__(self, blocks, entry, exit_block):
+        self.blocks = blocks
+        self.entry = entry
+        self.exit = exit_block
+
+    def reverse_postorder(self):
+        seen = set()
+        order = []
+        stack = [(self.entry, iter(self.entry.succs))]
+        seen.add(self.entry.index)
+        while stack:
+            block, succs = stack[-1]
+            advanced = False
+            for succ in succs:
+                if succ.index not in seen:
+                    seen.add(succ.index)
+                    stack.append((succ, iter(succ.succs)))
+                    advanced = True
+                    break
+            if not advanced:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+
+def for_loop_parts(node):
+    """
+    Split a FOR_STMT into (init, condition, increment, body).
+
+    libclang omits missing header parts from the children list, so when
+    fewer than three header children exist the header semicolons are
+    located from the header tokens only (never the body).
+    """
+    cached = node.get("for_parts")
+    if cached is not None:
+        return cached
+
+    children = node.get("children", [])
+    parts = (None, None, None, None)
+    if children:
+        body = children[-1]
+        header = children[:-1]
+        if len(header) == 3:
+            parts = (header[0], header[1], header[2], body)
+        elif not header:
+            parts = (None, None, None, body)
+        else:
+            parts = _split_for_header(node, header, body)
+
+    node["for_parts"] = parts
+    return parts
+
+
+def _split_for_header(node, header, body):
+    cursor = node.get("cursor")
+    body_cursor = body.get("cursor")
+    if cursor is None or body_cursor is None:
+        return (None, header[0], None, body)
+
+    extent = cindex.SourceRange.from_locations(cursor.extent.start, body_cursor.extent.start)
+    depth = 0
+    semicolons = []
+    for tok in cursor.translation_unit.get_tokens(extent=extent):
+        spelling = tok.spelling
+        if spelling == "(":
+            depth += 1
+        elif spelling == ")":
+            depth -= 1
+            if depth == 0:
+                break
+        elif spelling == ";" and depth == 1:
+            semicolons.append(tok.extent.start.offset)
+
+    if len(semicolons) < 2:
+        return (None, header[0], None, body)
+
+    init = cond = inc = None
+    for child in header:
+        child_cursor = child.get("cursor")
+        offset = child_cursor.extent.start.offset if child_cursor is not None else None
+        if offset is None:
+            continue
+        if offset < semicolons[0]:
+            init = child
+        elif offset < semicolons[1]:
+            cond = child
+        else:
+            inc = child
+    return (init, cond, inc, body)
+
+
+class _CFGBuilder:
+    def __init__(self):
+        self.blocks = []
+        self.entry = self._new_block()
+        self.exit = self._new_block()
+        # Stack of (break_target, continue_target); switches have no continue target.
+        self.jump_targets = []
+        # Stack of [dispatch_block, has_default] for enclosing switches.
+        self.switches = []
+        self.labels = {}
+        self.gotos = []
+
+    def _new_block(self):
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def _edge(self, src, dst):
+        src.succs.append(dst)
+        dst.preds.append(src)
+
+    def _break_target(self):
+        if not self.jump_targets:
+            return self.exit
+        return self.jump_targets[-1][0]
+
+    def _continue_target(self):
+        for _break, cont in reversed(self.jump_targets):
+            if cont is not None:
+                return cont
+        return self.exit
+
+    def build(self, body):
+        end = self._stmt(body, self.entry)
+        self._edge(end, self.exit)
+        for block, name in self.gotos:
+            self._edge(block, self.labels.get(name, self.exit))
+        return ControlFlowGraph(self.blocks, self.entry, self.exit)
+
+    def _stmt(self, node, cur):
+        kind = node.get("kind")
+        children = node.get("children", [])
+
+        if kind == CursorKind.COMPOUND_STMT:
+            for child in children:
+                cur = self._stmt(child, cur)
+            return cur
+
+        if kind == CursorKind.NULL_STMT:
+            return cur
+
+        if kind == CursorKind.DECL_STMT:
+            for child in children:
+                if child.get("kind") == CursorKind.VAR_DECL:
+                    cur.items.append(child)
+            return cur
+
+        if kind == CursorKind.IF_STMT:
+            return self._if(node, cur)
+
+        if kind == CursorKind.WHILE_STMT:
+            return self._while(node, cur)
+
+        if kind == CursorKind.DO_STMT:
+            return self._do(node, cur)
+
+        if kind == CursorKind.FOR_STMT:
+            return self._for(node, cur)
+
+        if _FOR_RANGE_KIND is not None and kind == _FOR_RANGE_KIND:
+            return self._range_for(node, cur)
+
+        if kind == CursorKind.SWITCH_STMT:
+            return self._switch(node, cur)
+
+        if kind in {CursorKind.CASE_STMT, CursorKind.DEFAULT_STMT}:
+            return self._case(node, cur)
+
+        if kind == CursorKind.BREAK_STMT:
+            self._edge(cur, self._break_target())
+            return self._new_block()
+
+        if kind == CursorKind.CONTINUE_STMT:
+            self._edge(cur, self._continue_target())
+            return self._new_block()
+
+        if kind == CursorKind.RETURN_STMT or (_THROW_KIND is not None and kind == _THROW_KIND):
+            cur.items.append(node)
+            self._edge(cur, self.exit)
+            return self._new_block()
+
+        if kind == CursorKind.GOTO_STMT:
+            name = children[0].get("name") if children else None
+            self.gotos.append((cur, name))
+            return self._new_block()
+
+        if _LABEL_KIND is not None and kind == _LABEL_KIND:
+            block = self._new_block()
+            self._edge(cur, block)
+            self.labels[node.get("name")] = block
+            for child in children:
+                block = self._stmt(child, block)
+            return block
+
+        if _TRY_KIND is not None and kind == _TRY_KIND:
+            return self._try(node, cur)
+
+        cur.items.append(node)
+        return cur
+
+    def _split_condition(self, node):
+        children = list(node.get("children", []))
+        cond = find_condition_node(node)
+        if cond not in children:
+            return [], cond, children
+        idx = children.index(cond)
+        return children[:idx], cond, children[idx + 1 :]
+
+    def _if(self, node, cur):
+        before, cond, rest = self._split_condition(node)
+        for child in before:
+            cur = self._stmt(child, cur)
+        if cond is not None:
+            cur.items.append(cond)
+
+        join = self._new_block()
+        then_node = rest[0] if len(rest) > 0 else None
+        else_node = rest[1] if len(rest) > 1 else None
+
+        then_block = self._new_block()
+        self._edge(cur, then_block)
+        then_start = then_block
+        if then_node is not None:
+            then_block = self._stmt(then_node, then_block)
+        self._edge(then_block, join)
+
+        if else_node is not None:
+            else_block = self._new_block()
+            self._edge(cur, else_block)
+            else_start = else_block
+            else_block = self._stmt(else_node, else_block)
+            self._edge(else_block, join)
+        else:
+            self._edge(cur, join)
+            else_start = join
+        if cond is not None:
+            cur.branch = (cond, then_start, else_start)
+        return join
+
+    def _loop_body(self, body, entry, break_target, continue_target):
+        self.jump_targets.append((break_target, continue_target))
+        end = self._stmt(body, entry) if body is not None else entry
+        self.jump_targets.pop()
+        return end
+
+    def _while(self, node, cur):
+        before, cond, rest = self._split_condition(node)
+        head = self._new_block()
+        self._edge(cur, head)
+        for child in before:
+            head = self._stmt(child, head)
+        if cond is not None:
+            head.items.append(cond)
+
+        after = self._new_block()
+        body_block = self._new_block()
+        self._edge(head, body_block)
+        self._edge(head, after)
+        if cond is not None:
+            head.branch = (cond, body_block, after)
+        end = self._loop_body(rest[-1] if rest else None, body_block, after, head)
+        self._edge(end, head)
+        return after
+
+    def _do(self, node, cur):
+        children = node.get("children", [])
+        body = children[0] if children else None
+        cond = children[1] if len(children) > 1 else None
+
+        body_block = self._new_block()
+        self._edge(cur, body_block)
+        cond_block = self._new_block()
+        after = self._new_block()
+        end = self._loop_body(body, body_block, after, cond_block)
+        self._edge(end, cond_block)
+        if cond is not None:
+            cond_block.items.append(cond)
+            cond_block.branch = (cond, body_block, after)
+        self._edge(cond_block, body_block)
+        self._edge(cond_block, after)
+        return after
+
+    def _for(self, node, cur):
+        init, cond, inc, body = for_loop_parts(node)
+        if init is not None:
+            cur = self._stmt(init, cur)
+
+        head = self._new_block()
+        self._edge(cur, head)
+        after = self._new_block()
+        if cond is not None:
+            head.items.append(cond)
+            self._edge(head, after)
+
+        body_block = self._new_block()
+        self._edge(head, body_block)
+        if cond is not None:
+            head.branch = (cond, body_block, after)
+        inc_block = self._new_block()
+        end = self._loop_body(body, body_block, after, inc_block)
+        self._edge(end, inc_block)
+        if inc is not None:
+            inc_block.items.append(inc)
+        self._edge(inc_block, head)
+        return after
+
+    def _range_for(self, node, cur):
+        children = node.get("children", [])
+        body = children[-1] if children else None
+        for child in children[:-1]:
+            # The loop variable is bound on every iteration; only the range is evaluated here.
+            if child.get("kind") != CursorKind.VAR_DECL:
+                cur.items.append(child)
+
+        head = self._new_block()
+        self._edge(cur, head)
+        after = self._new_block()
+        self._edge(head, after)
+        body_block = self._new_block()
+        self._edge(head, body_block)
+        end = self._loop_body(body, body_block, after, head)
+        self._edge(end, head)
+        return after
+
+    def _switch(self, node, cur):
+        before, cond, rest = self._split_condition(node)
+        for child in before:
+            cur = self._stmt(child, cur)
+        if cond is not None:
+            cur.items.append(cond)
+
+        after = self._new_block()
+        state = [cur, False]
+        self.switches.append(state)
+        self.jump_targets.append((after, None))
+        # Code before the first label is unreachable, so the body starts detached.
+        end = self._new_block()
+        for child in rest:
+            end = self._stmt(child, end)
+        self.jump_targets.pop()
+        self.switches.pop()
+
+        self._edge(end, after)
+        if not state[1]:
+            self._edge(cur, after)
+        return after
+
+    def _case(self, node, cur):
+        block = self._new_block()
+        self._edge(cur, block)
+        if self.switches:
+            state = self.switches[-1]
+            self._edge(state[0], block)
+            if node.get("kind") == CursorKind.DEFAULT_STMT:
+                state[1] = True
+
+        children = node.get("children", [])
+        if children:
+            # CASE_STMT children are (value, statement); DEFAULT_STMT has only the statement.
+            block = self._stmt(children[-1], block)
+        return block
+
+    def _try(self, node, cur):
+        children = node.get("children", [])
+        try_block = self._new_block()
+        self._edge(cur, try_block)
+        after = self._new_block()
+
+        body = children[0] if children else None
+        end = self._stmt(body, try_block) if body is not None else try_block
+        self._edge(end, after)
+
+        for handler in children[1:]:
+            handler_block = self._new_block()
+            self._edge(try_block, handler_block)
+            handler_children = handler.get("children", [])
+            if handler_children:
+                handler_block = self._stmt(handler_children[-1], handler_block)
+            self._edge(handler_block, after)
+        return after
+
+
+def build_cfg(body_node):
+    """
+    Build a control-flow graph for a function body (a COMPOUND_STMT node).
+    """
+    return _CFGBuilder().build(body_node)
@@ -1,5 +1,3 @@
-from collections import defaultdict
-
 from clang.cindex import CursorKind
 
 from base_rule import BaseRule
@@ -12,167 +10,58 @@ class ClassFieldRule(BaseRule):
     - field possibly uninitialized
     """
 
-    _CLASS_KINDS = {CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL}
-    _ASSIGN_TOKENS = {"=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>="}
-
-    def __init__(self):
-        self.classes = {}
-        self.class_field_usage = defaultdict(set)
-        self.global_field_like_usage = set()
-
-    def _tokens(self, node):
-        cursor = node.get("cursor")
-        if cursor is None:
-            return []
-        return [t.spelling for t in cursor.get_tokens()]
-
-    def _enclosing_class(self, node):
-        cur = node.get("parent")
-        while cur is not None:
-            if cur.get("kind") in self._CLASS_KINDS:
-                return cur
-            cur = cur.get("parent")
-        return None
-
-    def _ensure_class(self, class_name):
-        if class_name not in self.classes:
-            self.classes[class_name] = {
-                "fields": {},
-                "constructors": [],
-            }
-        return self.classes[class_name]
-
-    def _has_inline_initializer(self, field_node):
-        tokens = self._tokens(field_node)
-        return ("=" in tokens) or ("{" in tokens and "}" in tokens)
+    # Member accesses, implicit ones in methods, dependent names in
+    # templates, and fields of local classes.
+    body_tokens = {".", "->", "this", "template", "class", "struct", "union"}
 
     def matches(self, node):
-        kind = node.get("kind")
-
-        if kind in self._CLASS_KINDS:
-            class_name = node.get("name")
-            if class_name:
-                self._ensure_class(class_name)
-            return False
-
-        if kind == CursorKind.FIELD_DECL:
-            class_node = self._enclosing_class(node)
-            if class_node is None:
-                return False
-            class_name = class_node.get("name")
-            field_name = node.get("name")
-            if not class_name or not field_name:
-                return False
-            data = self._ensure_class(class_name)
-            data["fields"][field_name] = {
-                "line": node.get("line"),
-                "inline_init": self._has_inline_initializer(node),
-            }
-            return False
-
-        if kind == CursorKind.CONSTRUCTOR:
-            class_node = self._enclosing_class(node)
-            if class_node is None:
-                return False
-            class_name = class_node.get("name")
-            if not class_name:
-                return False
-            data = self._ensure_class(class_name)
-            data["constructors"].append(node)
-            return False
-
-        if kind == CursorKind.MEMBER_REF_EXPR:
-            member_name = node.get("name")
-            if not member_name:
-                return False
-
-            parent = node.get("parent")
-            if parent is not None and parent.get("kind") == CursorKind.CALL_EXPR:
-                # Method call (obj.method()), not a field usage.
-                return False
-
-            class_node = self._enclosing_class(node)
-            if class_node is not None and class_node.get("name"):
-                self.class_field_usage[class_node["name"]].add(member_name)
-            self.global_field_like_usage.add(member_name)
-            return False
-
         return False
 
     def apply(self, node):
         return None
 
-    def _ctor_init_list_fields(self, ctor_node, field_names):
-        tokens = self._tokens(ctor_node)
-        if not tokens:
-            return set()
-
-        colon_idx = None
-        for i, tok in enumerate(tokens):
-            if tok != ":":
+    def _first_missing_constructor(self, table, constructors):
+        """
+        field USR -> the first constructor that leaves it uninitialized.
+        Counting initializations first keeps this linear in the size of the
+        initializer sets; only fields some constructor misses are scanned.
+        """
+        counts = {}
+        for ctor in constructors:
+            for usr in ctor.initialized:
+                counts[usr] = counts.get(usr, 0) + 1
+
+        missing = {}
+        for usr in table.fields:
+            if counts.get(usr, 0) == len(constructors):
                 continue
-            prev_tok = tokens[i - 1] if i > 0 else None
-            next_tok = tokens[i + 1] if i + 1 < len(tokens) else None
-            if prev_tok == ":" or next_tok == ":":
-                continue
-            colon_idx = i
-            break
-
-        if colon_idx is None:
-            return set()
-
-        end_idx = len(tokens)
-        for i in range(colon_idx + 1, len(tokens)):
-            if tokens[i] == "{":
-                end_idx = i
-                break
-
-        initialized = set()
-        for i in range(colon_idx + 1, end_idx - 1):
-            tok = tokens[i]
-            nxt = tokens[i + 1]
-            if tok in field_names and nxt in {"(", "{", "="}:
-                initialized.add(tok)
-        return initialized
-
-    def _ctor_assigned_fields(self, ctor_node, field_names):
-        tokens = self._tokens(ctor_node)
-        if not tokens:
-            return set()
-
-        assigned = set()
-        for i, tok in enumerate(tokens):
-            if tok not in field_names:
-                continue
-            prev_tok = tokens[i - 1] if i > 0 else None
-            next_tok = tokens[i + 1] if i + 1 < len(tokens) else None
-            if next_tok in self._ASSIGN_TOKENS or next_tok in {"++", "--"}:
-                assigned.add(tok)
-            elif prev_tok in {"++", "--"}:
-                assigned.add(tok)
-        return assigned
-
-    def _ctor_initialized_fields(self, ctor_node, field_names):
-        initialized = set()
-        initialized.update(self._ctor_init_list_fields(ctor_node, field_names))
-        initialized.update(self._ctor_assigned_fields(ctor_node, field_names))
-        return initialized
+            for ctor in constructors:
+                if usr not in ctor.initialized:
+                    missing[usr] = ctor
+                    break
+        return missing
 
     def finalize(self):
         messages = []
+        symbols = self.context.symbols
+        classes = self.context.classes
 
-        for class_name, data in sorted(self.classes.items()):
-            fields = data.get("fields", {})
-            constructors = data.get("constructors", [])
-            if not fields:
+        for table in sorted(classes.classes.values(), key=lambda t: (t.name, t.usr)):
+            if not table.fields:
                 continue
-
-            usage_for_class = self.class_field_usage.get(class_name, set())
-
-            for field_name, meta in fields.items():
-                field_line = meta.get("line")
-
-                used = (field_name in usage_for_class) or (field_name in self.global_field_like_usage)
+            class_name = table.name
+            constructors = [ctor for ctor in table.constructors.values() if not ctor.deleted]
+            missing = self._first_missing_constructor(table, constructors)
+
+            for field in table.fields.values():
+                field_name = field.name
+                field_line = field.line
+
+                symbol = symbols.get(field.usr)
+                used = (
+                    (symbol is not None and symbol.is_referenced({CursorKind.MEMBER_REF_EXPR}))
+                    or field_name in symbols.unresolved_names
+                )
                 if not used:
                     if field_line:
                         messages.append(
@@ -182,7 +71,9 @@ class ClassFieldRule(BaseRule):
                     else:
                         messages.append(f"[WARN] Field '{field_name}' in class '{class_name}' is never used.")
 
-                if meta.get("inline_init"):
+                if constructors and field.usr not in missing:
+                    continue
+                if classes.has_inline_initializer(field):
                     continue
 
                 if not constructors:
@@ -197,17 +88,9 @@ class ClassFieldRule(BaseRule):
                         )
                     continue
 
-                missing_ctor_line = None
-                for ctor in constructors:
-                    initialized = self._ctor_initialized_fields(ctor, set(fields.keys()))
-                    if field_name not in initialized:
-                        missing_ctor_line = ctor.get("line")
-                        break
-
-                if missing_ctor_line is not None:
-                    messages.append(
-                        f"[WARN] Field '{field_name}' in class '{class_name}' may be uninitialized "
-                        f"in constructor on line {missing_ctor_line}."
-                    )
+                messages.append(
+                    f"[WARN] Field '{field_name}' in class '{class_name}' may be uninitialized "
+                    f"in constructor on line {missing[field.usr].line}."
+                )
 
         return messages
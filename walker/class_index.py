@@ -0,0 +1,183 @@
+from clang.cindex import CursorKind
+
+from symbol_index import UPDATE, WRITE
+
+
+CLASS_KINDS = {CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL}
+
+_ASSIGN_OPERATORS = {"=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>=", "++", "--"}
+
+
+class FieldInfo:
+    """
+    One data member: its FIELD_DECL node. `inline_init` is filled in by
+    ClassIndex.has_inline_initializer.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.usr = node.get("usr")
+        self.name = node.get("name")
+        self.line = node.get("line")
+        self.inline_init = None
+
+
+class ConstructorInfo:
+    """
+    One constructor (its in-class declaration and out-of-line definition
+    share a USR) and the USRs of the fields it initializes, either in its
+    member initializer list or by assignment in its body.
+    """
+
+    def __init__(self, usr, node):
+        self.usr = usr
+        self.node = node
+        self.deleted = False
+        self.initialized = set()
+
+    @property
+    def line(self):
+        return self.node.get("line")
+
+
+class ClassTable:
+    """
+    Fields (in declaration order) and constructors of one class, keyed by USR.
+    """
+
+    def __init__(self, usr, name):
+        self.usr = usr
+        self.name = name
+        self.fields = {}
+        self.constructors = {}
+
+
+class ClassIndex:
+    """
+    Classes of one file keyed by USR, built in a single pass.
+
+    Fields are attached to their enclosing class, constructors to the class
+    of their semantic parent (so out-of-line definitions are found too).
+    Initialized fields come from the MEMBER_REF children of a constructor
+    and from member writes the symbol index classifies inside its body;
+    nothing is tokenized per constructor.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.classes = {}
+        self._ctor_of = {}
+        self._build(context.nodes, context.symbols)
+
+    def _table(self, usr, name):
+        table = self.classes.get(usr)
+        if table is None:
+            table = ClassTable(usr, name)
+            self.classes[usr] = table
+        elif not table.name:
+            table.name = name
+        return table
+
+    def _enclosing_class(self, node):
+        cur = node.get("parent")
+        while cur is not None:
+            if cur.get("kind") in CLASS_KINDS:
+                return cur
+            cur = cur.get("parent")
+        return None
+
+    def _class_of_constructor(self, node):
+        parent = node.get("parent")
+        if parent is not None and parent.get("kind") in CLASS_KINDS:
+            return parent.get("usr"), parent.get("name")
+        try:
+            owner = node["cursor"].semantic_parent
+            return owner.get_usr() or None, owner.spelling
+        except Exception:
+            return None, None
+
+    def _build(self, nodes, symbols):
+        for node in nodes:
+            kind = node.get("kind")
+
+            if kind in CLASS_KINDS:
+                if node.get("usr") and node.get("name"):
+                    self._table(node["usr"], node["name"])
+                continue
+
+            if kind == CursorKind.FIELD_DECL:
+                class_node = self._enclosing_class(node)
+                if class_node is None or not class_node.get("usr") or not class_node.get("name"):
+                    continue
+                if node.get("usr") and node.get("name"):
+                    table = self._table(class_node["usr"], class_node["name"])
+                    table.fields.setdefault(node["usr"], FieldInfo(node))
+                continue
+
+            if kind == CursorKind.CONSTRUCTOR:
+                self._add_constructor(node)
+                continue
+
+            if kind == CursorKind.MEMBER_REF:
+                ctor = self._ctor_of.get(id(node.get("parent")))
+                if ctor is not None and node.get("ref_usr"):
+                    ctor.initialized.add(node["ref_usr"])
+                continue
+
+            if kind == CursorKind.MEMBER_REF_EXPR and node.get("ref_usr"):
+                function = symbols.enclosing_function(node)
+                ctor = self._ctor_of.get(id(function)) if function is not None else None
+                if ctor is not None and self._is_own_member_write(node, symbols):
+                    ctor.initialized.add(node["ref_usr"])
+
+    def _add_constructor(self, node):
+        class_usr, class_name = self._class_of_constructor(node)
+        usr = node.get("usr")
+        if not class_usr or not class_name or not usr:
+            return
+        table = self._table(class_usr, class_name)
+        ctor = table.constructors.get(usr)
+        if ctor is None:
+            ctor = ConstructorInfo(usr, node)
+            table.constructors[usr] = ctor
+        try:
+            ctor.deleted = ctor.deleted or node["cursor"].is_deleted_method()
+        except Exception:
+            pass
+        self._ctor_of[id(node)] = ctor
+
+    def _is_own_member_write(self, node, symbols):
+        # `other.x = ...` writes another object's field.
+        base = node["semantic_children"]
+        if base and base[0].get("kind") != CursorKind.CXX_THIS_EXPR:
+            return False
+        if symbols.access(node) in {WRITE, UPDATE}:
+            return True
+        # Class-type members are assigned through an operator call.
+        parent = node.get("semantic_parent")
+        if parent is None or parent.get("kind") != CursorKind.CALL_EXPR:
+            return False
+        operands = parent["semantic_children"]
+        return parent.get("operator") in _ASSIGN_OPERATORS and bool(operands) and operands[0] is node
+
+    def has_inline_initializer(self, field):
+        """
+        True if the field has a default member initializer (`= value` or
+        `{value}` after its name). Only fields some constructor misses are
+        asked about, so only their (short) declarations are tokenized.
+        """
+        if field.inline_init is not None:
+            return field.inline_init
+        field.inline_init = False
+        cursor = field.node.get("cursor")
+        if cursor is None:
+            return False
+        try:
+            name_offset = cursor.location.offset
+            for token in cursor.get_tokens():
+                if token.spelling in {"=", "{"} and token.location.offset > name_offset:
+                    field.inline_init = True
+                    break
+        except Exception:
+            pass
+        return field.inline_init
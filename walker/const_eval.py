@@ -0,0 +1,439 @@
+import math
+
+from clang.cindex import CursorKind, TypeKind
+
+from expr_renderer import operator_spelling
+
+
+_NULLPTR_KIND = getattr(CursorKind, "CXX_NULL_PTR_LITERAL_EXPR", None)
+
+_CAST_KINDS = {
+    CursorKind.CSTYLE_CAST_EXPR,
+    CursorKind.CXX_STATIC_CAST_EXPR,
+    CursorKind.CXX_FUNCTIONAL_CAST_EXPR,
+}
+
+_UNSIGNED_TYPE_KINDS = {
+    TypeKind.CHAR_U,
+    TypeKind.UCHAR,
+    TypeKind.CHAR16,
+    TypeKind.CHAR32,
+    TypeKind.USHORT,
+    TypeKind.UINT,
+    TypeKind.ULONG,
+    TypeKind.ULONGLONG,
+    TypeKind.UINT128,
+}
+
+_SIGNED_TYPE_KINDS = {
+    TypeKind.CHAR_S,
+    TypeKind.SCHAR,
+    TypeKind.WCHAR,
+    TypeKind.SHORT,
+    TypeKind.INT,
+    TypeKind.LONG,
+    TypeKind.LONGLONG,
+    TypeKind.INT128,
+    TypeKind.ENUM,
+}
+
+_FLOAT_TYPE_KINDS = {
+    TypeKind.FLOAT,
+    TypeKind.DOUBLE,
+    TypeKind.LONGDOUBLE,
+}
+
+# sizeof(<builtin type>) has no child cursor to ask; sizes for LP64 targets.
+_BUILTIN_SIZES = {
+    "char": 1,
+    "signed char": 1,
+    "unsigned char": 1,
+    "bool": 1,
+    "short": 2,
+    "unsigned short": 2,
+    "int": 4,
+    "unsigned": 4,
+    "unsigned int": 4,
+    "float": 4,
+    "long": 8,
+    "unsigned long": 8,
+    "long long": 8,
+    "unsigned long long": 8,
+    "double": 8,
+    "long double": 16,
+}
+
+_CHAR_ESCAPES = {
+    "n": 10,
+    "t": 9,
+    "r": 13,
+    "0": 0,
+    "a": 7,
+    "b": 8,
+    "f": 12,
+    "v": 11,
+    "\\": 92,
+    "'": 39,
+    '"': 34,
+    "?": 63,
+}
+
+# Kinds whose value is computed from their children's values.
+_COMPOSITE_KINDS = {
+    CursorKind.PAREN_EXPR,
+    CursorKind.UNEXPOSED_EXPR,
+    CursorKind.UNARY_OPERATOR,
+    CursorKind.BINARY_OPERATOR,
+    CursorKind.CONDITIONAL_OPERATOR,
+} | _CAST_KINDS
+
+_UNKNOWN = object()
+
+
+def parse_number(token):
+    text = token.lower()
+    while text and text[-1] in {"u", "l", "f"}:
+        text = text[:-1]
+    if not text:
+        return None
+
+    try:
+        if text.startswith("0x"):
+            return int(text, 16)
+        if text.startswith("0b"):
+            return int(text, 2)
+        if text.startswith("0") and text != "0" and text.isdigit():
+            return int(text, 8)
+        if "." in text or "e" in text:
+            return float(text)
+        return int(text, 10)
+    except ValueError:
+        return None
+
+
+def parse_char(token):
+    start = token.find("'")
+    if start < 0 or not token.endswith("'") or len(token) - start < 3:
+        return None
+    body = token[start + 1:-1]
+    if len(body) == 1:
+        return ord(body)
+    if not body.startswith("\\"):
+        return None
+
+    escape = body[1:]
+    if escape in _CHAR_ESCAPES:
+        return _CHAR_ESCAPES[escape]
+    try:
+        if escape.startswith("x"):
+            return int(escape[1:], 16)
+        if escape.isdigit():
+            return int(escape, 8)
+    except ValueError:
+        return None
+    return None
+
+
+def _first_token(node):
+    cursor = node.get("cursor")
+    if cursor is None:
+        return None
+    for token in cursor.get_tokens():
+        return token.spelling
+    return None
+
+
+def _c_divide(left, right):
+    if isinstance(left, float) or isinstance(right, float):
+        return left / right
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def fold_unary(op, value):
+    if op == "-":
+        return -value
+    if op == "+":
+        return value
+    if op == "!":
+        return not value
+    if op == "~":
+        return ~value if isinstance(value, int) else None
+    return None
+
+
+def fold_binary(op, left, right, width=None):
+    """
+    Value of `left op right` for two constant operands, or None.
+    `width` is the bit width of the left operand's type, if known; shifts
+    by that much or more (by more than 64 when unknown) are undefined.
+    """
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        return None if right == 0 else _c_divide(left, right)
+    if op == "%":
+        if right == 0 or isinstance(left, float) or isinstance(right, float):
+            return None
+        return left - right * _c_divide(left, right)
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    if op == ">=":
+        return left >= right
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    if isinstance(left, float) or isinstance(right, float):
+        return None
+    if op == "&":
+        return left & right
+    if op == "|":
+        return left | right
+    if op == "^":
+        return left ^ right
+    if op in {"<<", ">>"}:
+        if right < 0 or right >= (width or 65):
+            return None
+        return left << right if op == "<<" else left >> right
+    return None
+
+
+class ConstantEvaluator:
+    """
+    Folds constant expressions over the AST and memoizes one value per node.
+
+    Handles integer, float, bool, char and nullptr literals, `sizeof`,
+    enum constants, const/constexpr variables with constant initializers,
+    casts, and arithmetic, bitwise, comparison, logical and conditional
+    operators. Casts to a narrower integer type wrap to the target width,
+    so `(unsigned char)300` is 44 and `(signed char)200` is -56.
+    `value(node)` returns None when the node is not constant.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self._values = {}
+
+    def value(self, node):
+        if node is None:
+            return None
+        cached = self._values.get(id(node), _UNKNOWN)
+        if cached is not _UNKNOWN:
+            return cached
+
+        # Post-order with an explicit stack: long operator chains are deep trees.
+        stack = [(node, False)]
+        while stack:
+            cur, expanded = stack.pop()
+            key = id(cur)
+            if key in self._values:
+                continue
+            if not expanded and cur.get("kind") in _COMPOSITE_KINDS:
+                stack.append((cur, True))
+                for child in cur.get("children", []):
+                    if id(child) not in self._values:
+                        stack.append((child, False))
+                continue
+            # Marked first so a self-referencing initializer cannot recurse forever.
+            self._values[key] = None
+            try:
+                value = self._evaluate(cur)
+            except (ArithmeticError, ValueError, TypeError):
+                value = None
+            self._values[key] = value
+        return self._values[id(node)]
+
+    def truthiness(self, node):
+        """
+        True/False for a condition that is constant, else None.
+        """
+        if node is not None and node["semantic"].get("kind") == CursorKind.STRING_LITERAL:
+            # A string literal decays to a non-null pointer.
+            return True
+
+        value = self.value(node)
+        if value is None:
+            return None
+        return bool(value)
+
+    def _evaluate(self, node):
+        kind = node.get("kind")
+        children = node.get("children", [])
+
+        if kind == CursorKind.INTEGER_LITERAL or kind == CursorKind.FLOATING_LITERAL:
+            token = _first_token(node)
+            return parse_number(token) if token else None
+        if kind == CursorKind.CHARACTER_LITERAL:
+            token = _first_token(node)
+            return parse_char(token) if token else None
+        if kind == CursorKind.CXX_BOOL_LITERAL_EXPR:
+            token = _first_token(node)
+            return {"true": True, "false": False}.get(token)
+        if _NULLPTR_KIND is not None and kind == _NULLPTR_KIND:
+            return 0
+
+        if kind == CursorKind.PAREN_EXPR:
+            return self.value(children[0]) if len(children) == 1 else None
+        if kind == CursorKind.UNEXPOSED_EXPR:
+            # Mostly implicit conversions; apply the node's own type.
+            if len(children) != 1:
+                return None
+            value = self.value(children[0])
+            return self.convert(value, node) if value is not None else None
+        if kind in _CAST_KINDS:
+            if not children:
+                return None
+            value = self.value(children[-1])
+            return self.convert(value, node) if value is not None else None
+
+        if kind == CursorKind.DECL_REF_EXPR:
+            return self._referenced_value(node)
+        if kind == CursorKind.CXX_UNARY_EXPR:
+            return self._sizeof(node)
+        if kind == CursorKind.UNARY_OPERATOR:
+            return self._unary(node)
+        if kind == CursorKind.BINARY_OPERATOR:
+            return self._binary(node)
+        if kind == CursorKind.CONDITIONAL_OPERATOR:
+            if len(children) != 3:
+                return None
+            cond = self.value(children[0])
+            if cond is None:
+                return None
+            return self.value(children[1] if cond else children[2])
+        return None
+
+    def convert(self, value, node):
+        """
+        `value` converted to the type of `node` (bool, float, or a
+        truncated integer wrapped to the width of the type).
+        """
+        cursor = node.get("cursor")
+        if cursor is None:
+            return value
+        type_ = cursor.type.get_canonical()
+        type_kind = type_.kind
+        if type_kind == TypeKind.BOOL:
+            return bool(value)
+        if type_kind in _FLOAT_TYPE_KINDS:
+            return float(value)
+        if type_kind in _UNSIGNED_TYPE_KINDS:
+            size = type_.get_size()
+            value = math.trunc(value)
+            return value % (1 << (8 * size)) if size > 0 else value
+        if type_kind in _SIGNED_TYPE_KINDS:
+            value = math.trunc(value)
+            size = type_.get_size()
+            if type_kind == TypeKind.ENUM or size <= 0:
+                return value
+            # Narrowing to a signed type wraps in two's complement (C++20, and
+            # what every supported compiler does before it).
+            half = 1 << (8 * size - 1)
+            return (value + half) % (2 * half) - half
+        return value
+
+    def bit_width(self, node):
+        """
+        Bit width of the integer type of `node`, or None.
+        """
+        cursor = node.get("cursor")
+        if cursor is None:
+            return None
+        type_ = cursor.type.get_canonical()
+        if type_.kind not in _UNSIGNED_TYPE_KINDS and type_.kind not in _SIGNED_TYPE_KINDS:
+            return None
+        size = type_.get_size()
+        return 8 * size if size > 0 else None
+
+    def _referenced_value(self, node):
+        cursor = node.get("cursor")
+        referenced = cursor.referenced if cursor is not None else None
+        if referenced is None:
+            return None
+
+        if referenced.kind == CursorKind.ENUM_CONSTANT_DECL:
+            return referenced.enum_value
+        if referenced.kind != CursorKind.VAR_DECL:
+            return None
+        if not referenced.type.is_const_qualified():
+            return None
+
+        symbol = self.symbols.get(node.get("ref_usr"))
+        decl = symbol.definition if symbol is not None else None
+        if decl is None:
+            return None
+        init = None
+        for child in decl.get("children", []):
+            if child.get("kind") not in {CursorKind.TYPE_REF, CursorKind.NAMESPACE_REF, CursorKind.TEMPLATE_REF}:
+                init = child
+        if init is None:
+            return None
+        value = self.value(init)
+        return self.convert(value, decl) if value is not None else None
+
+    def _sizeof(self, node):
+        if _first_token(node) != "sizeof":
+            return None
+        children = node.get("children", [])
+        cursor = None
+        if children:
+            cursor = children[-1].get("cursor")
+        if cursor is not None:
+            size = cursor.type.get_size()
+            return size if size > 0 else None
+
+        spelled = [t.spelling for t in node["cursor"].get_tokens()][1:]
+        if len(spelled) >= 3 and spelled[0] == "(" and spelled[-1] == ")":
+            return _BUILTIN_SIZES.get(" ".join(spelled[1:-1]))
+        return None
+
+    def _unary(self, node):
+        children = node.get("children", [])
+        if len(children) != 1:
+            return None
+        op = operator_spelling(node)
+        if op not in {"-", "+", "!", "~"}:
+            return None
+        value = self.value(children[0])
+        if value is None:
+            return None
+        return fold_unary(op, value)
+
+    def _binary(self, node):
+        children = node.get("children", [])
+        if len(children) != 2:
+            return None
+        op = operator_spelling(node)
+
+        left = self.value(children[0])
+        if op == "&&":
+            if left is not None and not left:
+                return False
+            right = self.value(children[1])
+            if right is not None and not right:
+                return False
+            return True if left is not None and right is not None else None
+        if op == "||":
+            if left is not None and left:
+                return True
+            right = self.value(children[1])
+            if right is not None and right:
+                return True
+            return False if left is not None and right is not None else None
+
+        if left is None:
+            return None
+        right = self.value(children[1])
+        if right is None:
+            return None
+        value = fold_binary(op, left, right, self.bit_width(children[0]))
+        return self.convert(value, node) if value is not None else None
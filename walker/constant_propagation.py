@@ -0,0 +1,373 @@
+from collections import deque
+
+from clang.cindex import CursorKind, StorageClass, TypeKind
+
+from cfg import build_cfg
+from const_eval import fold_binary, fold_unary
+from expr_renderer import operator_spelling
+from symbol_index import ESCAPE, READ
+
+
+_LAMBDA_KIND = getattr(CursorKind, "LAMBDA_EXPR", None)
+
+_CAST_KINDS = {
+    CursorKind.CSTYLE_CAST_EXPR,
+    CursorKind.CXX_STATIC_CAST_EXPR,
+    CursorKind.CXX_FUNCTIONAL_CAST_EXPR,
+}
+
+_ARITHMETIC_TYPE_KINDS = set()
+for _name in (
+    "BOOL", "CHAR_U", "UCHAR", "CHAR16", "CHAR32", "USHORT", "UINT", "ULONG", "ULONGLONG",
+    "UINT128", "CHAR_S", "SCHAR", "WCHAR", "SHORT", "INT", "LONG", "LONGLONG", "INT128",
+    "FLOAT", "DOUBLE", "LONGDOUBLE", "ENUM",
+):
+    _value = getattr(TypeKind, _name, None)
+    if _value is not None:
+        _ARITHMETIC_TYPE_KINDS.add(_value)
+
+_FOLD_ERRORS = (ArithmeticError, ValueError, TypeError)
+
+
+class ConstantPropagation:
+    """
+    Conditional constant propagation over one function's CFG.
+
+    Tracks local arithmetic variables whose address never escapes and that
+    no lambda captures. Each block's entry state maps such a variable's
+    USR to its known constant value; a missing entry means "not constant".
+    Blocks are only visited along edges that can execute: a branch whose
+    condition folds to a constant feeds just the taken successor. States
+    only lose entries as the worklist runs, so every block is revisited at
+    most once per tracked variable.
+
+    Once solved, `value(node)` is a dictionary lookup giving the constant
+    an expression node evaluates to at that point, or None.
+    """
+
+    def __init__(self, func_node, symbols, constants):
+        self.func_node = func_node
+        self.symbols = symbols
+        self.constants = constants
+        self.values = {}
+        # USR -> bit position of each tracked variable.
+        self._tracked = {}
+        self._run()
+
+    def value(self, node):
+        return self.values.get(id(node))
+
+    def _body(self):
+        for child in self.func_node.get("children", []):
+            if child.get("kind") == CursorKind.COMPOUND_STMT:
+                return child
+        return None
+
+    def _is_candidate(self, symbol):
+        if symbol.kind != CursorKind.VAR_DECL or not symbol.decls:
+            return False
+        if any(access == ESCAPE for _ref, access in symbol.refs):
+            return False
+        cursor = symbol.decls[0].get("cursor")
+        if cursor is None:
+            return False
+        try:
+            if cursor.storage_class in {StorageClass.STATIC, StorageClass.EXTERN}:
+                return False
+            type_ = cursor.type
+            if type_.is_volatile_qualified():
+                return False
+            return type_.get_canonical().kind in _ARITHMETIC_TYPE_KINDS
+        except Exception:
+            return False
+
+    def _captured(self, body):
+        captured = set()
+        if _LAMBDA_KIND is None:
+            return captured
+        stack = [(body, False)]
+        while stack:
+            node, in_lambda = stack.pop()
+            if in_lambda and node.get("ref_usr"):
+                captured.add(node["ref_usr"])
+            in_lambda = in_lambda or node.get("kind") == _LAMBDA_KIND
+            for child in node.get("children", []):
+                stack.append((child, in_lambda))
+        return captured
+
+    def _run(self):
+        body = self._body()
+        if body is None:
+            return
+        captured = self._captured(body)
+        for symbol in self.symbols.locals_of(self.func_node):
+            if symbol.usr not in captured and self._is_candidate(symbol):
+                self._tracked.setdefault(symbol.usr, len(self._tracked))
+        if not self._tracked:
+            return
+
+        cfg = build_cfg(body)
+        live_in = self._liveness(cfg)
+        count = len(cfg.blocks)
+        in_envs = [None] * count
+        in_envs[cfg.entry.index] = {}
+        queued = [False] * count
+        queued[cfg.entry.index] = True
+        worklist = deque([cfg.entry])
+
+        while worklist:
+            block = worklist.popleft()
+            queued[block.index] = False
+            env, succs = self._visit(block, dict(in_envs[block.index]), False)
+            for succ in succs:
+                # Dead variables are dropped, so a state only holds live ranges.
+                live = live_in[succ.index]
+                current = in_envs[succ.index]
+                if current is None:
+                    merged = {usr: value for usr, value in env.items() if live >> self._tracked[usr] & 1}
+                else:
+                    merged = {usr: value for usr, value in current.items() if usr in env and env[usr] == value}
+                    if len(merged) == len(current):
+                        continue
+                in_envs[succ.index] = merged
+                if not queued[succ.index]:
+                    queued[succ.index] = True
+                    worklist.append(succ)
+
+        # Values are recorded only from the final states.
+        for block in cfg.blocks:
+            if in_envs[block.index] is not None:
+                self._visit(block, dict(in_envs[block.index]), True)
+
+    def _liveness(self, cfg):
+        """
+        Per-block bit sets of tracked variables that may be referenced
+        before being redeclared, from a backward worklist pass.
+        """
+        count = len(cfg.blocks)
+        gen = [0] * count
+        kill = [0] * count
+        for block in cfg.blocks:
+            g = k = 0
+            for item in block.items:
+                stack = [item]
+                while stack:
+                    node = stack.pop()
+                    if node.get("kind") == CursorKind.VAR_DECL:
+                        bit = self._tracked.get(node.get("usr"))
+                        if bit is not None and not g >> bit & 1:
+                            k |= 1 << bit
+                    else:
+                        bit = self._tracked.get(node.get("ref_usr"))
+                        if bit is not None and not k >> bit & 1:
+                            g |= 1 << bit
+                    stack.extend(reversed(node.get("children", [])))
+            gen[block.index] = g
+            kill[block.index] = k
+
+        live_in = list(gen)
+        worklist = deque(reversed(cfg.reverse_postorder()))
+        queued = [False] * count
+        for block in worklist:
+            queued[block.index] = True
+        while worklist:
+            block = worklist.popleft()
+            queued[block.index] = False
+            live_out = 0
+            for succ in block.succs:
+                live_out |= live_in[succ.index]
+            live = gen[block.index] | (live_out & ~kill[block.index])
+            if live == live_in[block.index]:
+                continue
+            live_in[block.index] = live
+            for pred in block.preds:
+                if not queued[pred.index]:
+                    queued[pred.index] = True
+                    worklist.append(pred)
+        return live_in
+
+    def _visit(self, block, env, record):
+        """
+        Run the block's items over `env`; returns (env, executable successors).
+        """
+        branch_value = None
+        for item in block.items:
+            vals = self._evaluate(item, env)
+            if record:
+                for key, value in vals.items():
+                    if value is not None:
+                        self.values[key] = value
+            if block.branch is not None and item is block.branch[0]:
+                branch_value = vals.get(id(item))
+
+        if block.branch is not None and branch_value is not None:
+            _cond, when_true, when_false = block.branch
+            return env, [when_true if branch_value else when_false]
+        return env, block.succs
+
+    def _evaluate(self, item, env):
+        """
+        Post-order evaluation of one item; returns {id(node): value}.
+        """
+        vals = {}
+        stack = [(item, False, False)]
+        while stack:
+            node, conditional, expanded = stack.pop()
+            kind = node.get("kind")
+            if not expanded:
+                if kind == CursorKind.CXX_UNARY_EXPR:
+                    # sizeof/alignof do not evaluate their operand.
+                    vals[id(node)] = self.constants.value(node)
+                    continue
+                if _LAMBDA_KIND is not None and kind == _LAMBDA_KIND:
+                    continue
+                stack.append((node, conditional, True))
+                children = node.get("children", [])
+                # Operands after the first of &&, || and ?: may be skipped,
+                # so assignments inside them only hold conditionally.
+                skippable = kind == CursorKind.CONDITIONAL_OPERATOR or (
+                    kind == CursorKind.BINARY_OPERATOR and operator_spelling(node) in {"&&", "||"}
+                )
+                for index in range(len(children) - 1, -1, -1):
+                    stack.append((children[index], conditional or (skippable and index > 0), False))
+                continue
+            try:
+                vals[id(node)] = self._transfer(node, kind, vals, env, conditional)
+            except _FOLD_ERRORS:
+                vals[id(node)] = None
+        return vals
+
+    def _define(self, env, usr, value, conditional):
+        if value is None or (conditional and env.get(usr) != value):
+            env.pop(usr, None)
+        else:
+            env[usr] = value
+
+    def _target(self, node):
+        node = node["semantic"] if node is not None else None
+        if node is None or node.get("kind") != CursorKind.DECL_REF_EXPR:
+            return None
+        usr = node.get("ref_usr")
+        return usr if usr in self._tracked else None
+
+    def _is_handled_write(self, ref):
+        parent = ref["semantic_parent"]
+        if parent is None:
+            return False
+        siblings = parent["semantic_children"]
+        if not siblings or siblings[0] is not ref:
+            return False
+        kind = parent.get("kind")
+        if kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR:
+            return True
+        if kind == CursorKind.BINARY_OPERATOR:
+            return operator_spelling(parent) == "="
+        if kind == CursorKind.UNARY_OPERATOR:
+            return operator_spelling(parent) in {"++", "--"}
+        return False
+
+    def _is_postfix(self, node, operand):
+        cursor = node.get("cursor")
+        operand_cursor = operand.get("cursor")
+        if cursor is None or operand_cursor is None:
+            return False
+        return cursor.extent.start.offset == operand_cursor.extent.start.offset
+
+    def _transfer(self, node, kind, vals, env, conditional):
+        children = node.get("children", [])
+        operands = [vals.get(id(child)) for child in children]
+
+        if kind == CursorKind.DECL_REF_EXPR:
+            usr = node.get("ref_usr")
+            if usr not in self._tracked:
+                return self.constants.value(node)
+            value = env.get(usr)
+            if self.symbols.access(node) != READ and not self._is_handled_write(node):
+                # Written some other way (`cin >> x`): no longer known.
+                env.pop(usr, None)
+            return value
+
+        if kind == CursorKind.VAR_DECL:
+            usr = node.get("usr")
+            if usr in self._tracked:
+                init = None
+                for child in children:
+                    if child.get("kind").is_expression():
+                        init = child
+                value = vals.get(id(init)) if init is not None else None
+                if value is not None:
+                    value = self.constants.convert(value, node)
+                self._define(env, usr, value, conditional)
+            return None
+
+        if kind == CursorKind.PAREN_EXPR:
+            return operands[0] if len(operands) == 1 else None
+        if kind == CursorKind.UNEXPOSED_EXPR:
+            if len(operands) != 1 or operands[0] is None:
+                return None
+            return self.constants.convert(operands[0], node)
+        if kind in _CAST_KINDS:
+            if not operands or operands[-1] is None:
+                return None
+            return self.constants.convert(operands[-1], node)
+
+        if kind == CursorKind.UNARY_OPERATOR and len(children) == 1:
+            op = operator_spelling(node)
+            old = operands[0]
+            if op in {"++", "--"}:
+                usr = self._target(children[0])
+                if usr is None:
+                    return None
+                new = None
+                if old is not None:
+                    new = self.constants.convert(old + 1 if op == "++" else old - 1, children[0])
+                self._define(env, usr, new, conditional)
+                return old if self._is_postfix(node, children[0]) else new
+            return fold_unary(op, old) if old is not None else None
+
+        if kind == CursorKind.BINARY_OPERATOR and len(children) == 2:
+            op = operator_spelling(node)
+            left, right = operands
+            if op == "=":
+                value = self.constants.convert(right, children[0]) if right is not None else None
+                usr = self._target(children[0])
+                if usr is not None:
+                    self._define(env, usr, value, conditional)
+                return value
+            if op == "&&":
+                if (left is not None and not left) or (right is not None and not right):
+                    return False
+                return True if left is not None and right is not None else None
+            if op == "||":
+                if (left is not None and left) or (right is not None and right):
+                    return True
+                return False if left is not None and right is not None else None
+            if op == ",":
+                return right
+            if left is None or right is None:
+                return None
+            value = fold_binary(op, left, right, self.constants.bit_width(children[0]))
+            return self.constants.convert(value, node) if value is not None else None
+
+        if kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR and len(children) == 2:
+            op = operator_spelling(node)
+            left, right = operands
+            value = None
+            if left is not None and right is not None and op.endswith("="):
+                value = fold_binary(op[:-1], left, right, self.constants.bit_width(children[0]))
+                if value is not None:
+                    value = self.constants.convert(value, children[0])
+            usr = self._target(children[0])
+            if usr is not None:
+                self._define(env, usr, value, conditional)
+            return value
+
+        if kind == CursorKind.CONDITIONAL_OPERATOR and len(children) == 3:
+            cond, when_true, when_false = operands
+            if cond is None:
+                return when_true if when_true is not None and when_true == when_false else None
+            return when_true if cond else when_false
+
+        if not children and kind is not None and kind.is_expression():
+            return self.constants.value(node)
+        return None
@@ -0,0 +1,298 @@
+import math
+
+from clang.cindex import CursorKind, TypeKind
+
+from expr_renderer import operator_spelling
+
+
+_INTEGRAL_TYPE_KINDS = {
+    TypeKind.BOOL,
+    TypeKind.CHAR_U,
+    TypeKind.UCHAR,
+    TypeKind.CHAR16,
+    TypeKind.CHAR32,
+    TypeKind.USHORT,
+    TypeKind.UINT,
+    TypeKind.ULONG,
+    TypeKind.ULONGLONG,
+    TypeKind.UINT128,
+    TypeKind.CHAR_S,
+    TypeKind.SCHAR,
+    TypeKind.WCHAR,
+    TypeKind.SHORT,
+    TypeKind.INT,
+    TypeKind.LONG,
+    TypeKind.LONGLONG,
+    TypeKind.INT128,
+    TypeKind.ENUM,
+}
+
+_COMPARISONS = {"<", "<=", ">", ">=", "==", "!="}
+_REVERSED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+_NEGATED = {"<": ">=", "<=": ">", ">": "<=", ">=": "<", "==": "!=", "!=": "=="}
+
+_INF = float("inf")
+
+# An interval is (low, low_closed, high, high_closed); a value set is a
+# sorted list of disjoint intervals. Infinite bounds are always open.
+_EVERYTHING = [(-_INF, False, _INF, False)]
+
+
+def _atom_intervals(op, value):
+    if op == "<":
+        return [(-_INF, False, value, False)]
+    if op == "<=":
+        return [(-_INF, False, value, True)]
+    if op == ">":
+        return [(value, False, _INF, False)]
+    if op == ">=":
+        return [(value, True, _INF, False)]
+    if op == "==":
+        return [(value, True, value, True)]
+    return [(-_INF, False, value, False), (value, False, _INF, False)]
+
+
+def _is_empty(low, low_closed, high, high_closed):
+    return low > high or (low == high and not (low_closed and high_closed))
+
+
+def _union(intervals):
+    out = []
+    for cur in sorted(intervals, key=lambda iv: (iv[0], not iv[1])):
+        if out:
+            low, low_closed, high, high_closed = out[-1]
+            if high > cur[0] or (high == cur[0] and (high_closed or cur[1])):
+                if cur[2] > high:
+                    high, high_closed = cur[2], cur[3]
+                elif cur[2] == high:
+                    high_closed = high_closed or cur[3]
+                out[-1] = (low, low_closed, high, high_closed)
+                continue
+        out.append(cur)
+    return out
+
+
+def _complement(intervals):
+    out = []
+    low, low_closed = -_INF, False
+    for cur_low, cur_low_closed, cur_high, cur_high_closed in intervals:
+        if not _is_empty(low, low_closed, cur_low, not cur_low_closed):
+            out.append((low, low_closed, cur_low, not cur_low_closed))
+        low, low_closed = cur_high, not cur_high_closed
+    if not _is_empty(low, low_closed, _INF, False):
+        out.append((low, low_closed, _INF, False))
+    return out
+
+
+def _intersect_all(sets):
+    if len(sets) == 1:
+        return sets[0]
+    # Intersection as the complement of the union of complements: one sort
+    # over every interval instead of pairwise merges.
+    merged = []
+    for value_set in sets:
+        merged.extend(_complement(value_set))
+    return _complement(_union(merged))
+
+
+def _union_all(sets):
+    if len(sets) == 1:
+        return sets[0]
+    merged = []
+    for value_set in sets:
+        merged.extend(value_set)
+    return _union(merged)
+
+
+def _to_integers(intervals):
+    out = []
+    for low, low_closed, high, high_closed in intervals:
+        if low != -_INF:
+            low = math.ceil(low) if low_closed else math.floor(low) + 1
+            low_closed = True
+        if high != _INF:
+            high = math.floor(high) if high_closed else math.ceil(high) - 1
+            high_closed = True
+        if not _is_empty(low, low_closed, high, high_closed):
+            out.append((low, low_closed, high, high_closed))
+    return out
+
+
+class _Unsatisfiable:
+    """
+    Box result for a formula with no solution; `name` is the variable
+    whose value set became empty.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class ConditionSolver:
+    """
+    Decides whether a boolean condition is always false or always true.
+
+    The condition is normalized in one pass: `&&`/`||` chains are
+    flattened, `!` is pushed down to the comparisons (flipping them), and
+    reversed operands (`5 < x`) are turned around. Each subformula becomes
+    a "box": a per-variable set of intervals that over-approximates its
+    solutions. Conjunctions intersect boxes, disjunctions join them, and
+    anything that is not a variable/literal comparison is unconstrained.
+    An empty box means the condition can never hold; an empty box for the
+    negated condition means it always holds.
+
+    `excluded` holds variable keys written inside the condition itself;
+    comparisons on those are left unconstrained. Constant operands
+    (literals, enum constants, constexpr variables) are folded by the
+    shared ConstantEvaluator.
+    """
+
+    def __init__(self, constants):
+        self.constants = constants
+        self._integral = {}
+        self._names = {}
+
+    def analyze(self, condition, excluded=frozenset()):
+        """
+        ("false", name), ("true", name) or (None, None).
+        """
+        self._excluded = excluded
+        box = self._box(condition, False)
+        if isinstance(box, _Unsatisfiable):
+            return "false", box.name
+        box = self._box(condition, True)
+        if isinstance(box, _Unsatisfiable):
+            return "true", box.name
+        return None, None
+
+    def _flatten(self, node, op):
+        operands = []
+        stack = [node]
+        while stack:
+            cur = stack.pop()["semantic"]
+            if cur.get("kind") == CursorKind.BINARY_OPERATOR and operator_spelling(cur) == op:
+                children = cur["semantic_children"]
+                if len(children) == 2:
+                    # Right pushed first so operands come out left to right.
+                    stack.append(children[1])
+                    stack.append(children[0])
+                    continue
+            operands.append(cur)
+        return operands
+
+    def _box(self, node, negated):
+        if node is None:
+            return {}
+        node = node["semantic"]
+
+        if self.constants.value(node) is not None:
+            # Constant conditions are ConstantConditionRule's to report.
+            return {}
+
+        kind = node.get("kind")
+        if kind == CursorKind.UNARY_OPERATOR and operator_spelling(node) == "!":
+            children = node["semantic_children"]
+            return self._box(children[0], not negated) if children else {}
+
+        if kind == CursorKind.BINARY_OPERATOR:
+            op = operator_spelling(node)
+            if op in {"&&", "||"}:
+                boxes = [self._box(operand, negated) for operand in self._flatten(node, op)]
+                if (op == "&&") != negated:
+                    return self._conjoin(boxes)
+                return self._disjoin(boxes)
+            if op in _COMPARISONS:
+                return self._comparison_box(node, op, negated)
+            return {}
+
+        if kind == CursorKind.DECL_REF_EXPR:
+            # Truthiness: `x` means `x != 0`.
+            key = self._variable_key(node)
+            if key is None:
+                return {}
+            return self._atom_box(key, "==" if negated else "!=", 0)
+
+        return {}
+
+    def _comparison_box(self, node, op, negated):
+        # Raw operands: their implicit conversions matter for the values.
+        children = node.get("children", [])
+        if len(children) != 2:
+            return {}
+
+        left, right = children
+        key = self._variable_key(left)
+        value = self.constants.value(right)
+        if key is None or value is None:
+            key = self._variable_key(right)
+            value = self.constants.value(left)
+            op = _REVERSED[op]
+            if key is None or value is None:
+                return {}
+
+        if negated:
+            op = _NEGATED[op]
+        return self._atom_box(key, op, value)
+
+    def _atom_box(self, key, op, value):
+        intervals = _atom_intervals(op, value)
+        if self._integral.get(key):
+            intervals = _to_integers(intervals)
+        if not intervals:
+            return _Unsatisfiable(self._names.get(key))
+        return {key: intervals}
+
+    def _conjoin(self, boxes):
+        per_var = {}
+        for box in boxes:
+            if isinstance(box, _Unsatisfiable):
+                return box
+            for key, value_set in box.items():
+                per_var.setdefault(key, []).append(value_set)
+
+        out = {}
+        for key, sets in per_var.items():
+            value_set = _intersect_all(sets)
+            if self._integral.get(key):
+                value_set = _to_integers(value_set)
+            if not value_set:
+                return _Unsatisfiable(self._names.get(key))
+            out[key] = value_set
+        return out
+
+    def _disjoin(self, boxes):
+        live = [box for box in boxes if not isinstance(box, _Unsatisfiable)]
+        if not live:
+            return boxes[0]
+
+        # Only variables constrained by every alternative stay constrained.
+        keys = set(live[0])
+        for box in live[1:]:
+            keys &= set(box)
+
+        out = {}
+        for key in keys:
+            value_set = _union_all([box[key] for box in live])
+            if value_set != _EVERYTHING:
+                out[key] = value_set
+        return out
+
+    def _variable_key(self, node):
+        node = node["semantic"] if node is not None else None
+        if node is None or node.get("kind") != CursorKind.DECL_REF_EXPR or not node.get("name"):
+            return None
+
+        key = node.get("ref_usr") or node["name"]
+        if key in self._excluded or self.constants.value(node) is not None:
+            return None
+        if key not in self._integral:
+            self._names[key] = node["name"]
+            self._integral[key] = self._is_integral(node)
+        return key
+
+    def _is_integral(self, node):
+        cursor = node.get("cursor")
+        try:
+            return cursor is not None and cursor.type.get_canonical().kind in _INTEGRAL_TYPE_KINDS
+        except Exception:
+            return False
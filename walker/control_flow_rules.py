@@ -1,6 +1,6 @@
 from clang.cindex import CursorKind
 from base_rule import BaseRule
-from expr_renderer import describe_expr, find_condition_node
+from expr_renderer import describe_expr, find_condition_node, macro_invocation
 
 
 class ControlFlowRule(BaseRule):
@@ -14,6 +14,8 @@ class ControlFlowRule(BaseRule):
     to the AST walker or a dedicated expression analyzer.
     """
 
+    body_tokens = {"if", "switch"}
+
     def matches(self, node: dict) -> bool:
         """
         Determine whether this rule applies to the given AST node.
@@ -36,6 +38,11 @@ class ControlFlowRule(BaseRule):
             if line is None:
                 return "This is an if-statement."
 
+            invocation = macro_invocation(node)
+            if invocation:
+                # Written by a macro: name the invocation instead of the expanded code.
+                return f"This is an if-statement on line {line} expanded from {invocation}."
+
             condition_node = find_condition_node(node)
             if condition_node is None:
                 return f"This is an if-statement on line {line}."
@@ -47,6 +54,10 @@ class ControlFlowRule(BaseRule):
             if line is None:
                 return "This is a switch statement."
 
+            invocation = macro_invocation(node)
+            if invocation:
+                return f"This is a switch statement on line {line} expanded from {invocation}."
+
             condition_node = find_condition_node(node)
             if condition_node is None:
                 return f"This is a switch statement on line {line}."
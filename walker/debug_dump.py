@@ -29,7 +29,7 @@ def main():
     line_start = int(sys.argv[2]) if len(sys.argv) > 2 else None
     line_end = int(sys.argv[3]) if len(sys.argv) > 3 else None
 
-    tu = parse_cpp_file(filename)
+    tu = parse_cpp_file(filename, detailed=True)
     nodes = []
     walk_ast(tu.cursor, nodes)
 
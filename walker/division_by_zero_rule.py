@@ -1,40 +1,33 @@
 from base_rule import BaseRule
 from clang.cindex import CursorKind
 
+from expr_renderer import operator_spelling
+
 
 class DivisionByZeroRule(BaseRule):
     """
-    Detects obvious division/modulo-by-zero operations.
+    Detects division/modulo by a constant zero, including a local variable
+    that is known to hold zero where it is used.
     """
 
+    _KINDS = {CursorKind.BINARY_OPERATOR, CursorKind.COMPOUND_ASSIGNMENT_OPERATOR}
+
     def matches(self, node):
-        return node.get("kind") == CursorKind.BINARY_OPERATOR
+        if node.get("kind") not in self._KINDS:
+            return False
+        return operator_spelling(node) in {"/", "%", "/=", "%="}
 
     def apply(self, node):
-        cursor = node.get("cursor")
-        if cursor is None:
-            return None
-
-        tokens = [t.spelling for t in cursor.get_tokens()]
-        if not tokens:
-            return None
-
-        has_div = "/" in tokens
-        has_mod = "%" in tokens
-        if not has_div and not has_mod:
-            return None
-
-        operator_index = None
-        for i, tok in enumerate(tokens):
-            if tok in {"/", "%"}:
-                operator_index = i
-                break
-
-        if operator_index is None or operator_index + 1 >= len(tokens):
+        children = node.get("children", [])
+        if len(children) != 2:
             return None
 
-        rhs = tokens[operator_index + 1]
-        if rhs not in {"0", "0.0", "0.0f", "0.0F"}:
+        divisor = self.context.constants.value(children[1])
+        if divisor is None:
+            func = self.context.symbols.enclosing_function(node)
+            if func is not None:
+                divisor = self.context.propagation(func).value(children[1])
+        if divisor is None or divisor != 0:
             return None
 
         line = node.get("line")
@@ -1,6 +1,6 @@
 from clang.cindex import CursorKind
 from base_rule import BaseRule
-from expr_renderer import find_condition_node, describe_expr
+from expr_renderer import describe_expr, find_condition_node, macro_invocation
 
 
 class DoWhileRule(BaseRule):
@@ -8,11 +8,19 @@ class DoWhileRule(BaseRule):
     Describes do-while loops.
     """
 
+    body_tokens = {"do"}
+
     def matches(self, node):
         return node.get("kind") == CursorKind.DO_STMT
 
     def apply(self, node):
         line = node.get("line")
+        invocation = macro_invocation(node)
+        if invocation:
+            # Written by a macro: name the invocation instead of the expanded code.
+            if line:
+                return f"This is a do-while loop on line {line} expanded from {invocation}."
+            return f"This is a do-while loop expanded from {invocation}."
         condition_node = find_condition_node(node)
         if condition_node is None:
             if line:
@@ -1,7 +1,4 @@
-from clang.cindex import CursorKind
-
 from base_rule import BaseRule
-from expr_renderer import find_condition_node
 
 
 class DuplicateBranchConditionRule(BaseRule):
@@ -10,85 +7,29 @@ class DuplicateBranchConditionRule(BaseRule):
     in the same if/else-if chain.
     """
 
-    def matches(self, node):
-        return node.get("kind") == CursorKind.IF_STMT
+    body_tokens = {"if"}
 
-    def _tokens(self, node):
-        cursor = node.get("cursor")
-        if cursor is None:
-            return []
-        return [t.spelling for t in cursor.get_tokens()]
+    def matches(self, node):
+        # Each chain is checked once, from its head.
+        return self.context.if_chains.chain_at(node) is not None
 
-    def _normalized_condition(self, if_node):
-        cond = find_condition_node(if_node)
+    def _condition_key(self, branch):
+        cond = branch.condition
         if cond is None:
             return None
-        if self._has_side_effect(cond):
+        expressions = self.context.expressions
+        if expressions.has_side_effects(cond):
             return None
-        tokens = self._tokens(cond)
-        if not tokens:
-            return None
-        normalized = [t for t in tokens if t not in {"(", ")", "{", "}", ";"}]
-        return " ".join(normalized)
-
-    def _has_side_effect(self, node):
-        if node is None:
-            return False
-
-        kind = node.get("kind")
-
-        call_kinds = set()
-        for attr in ("CALL_EXPR", "CXX_MEMBER_CALL_EXPR", "CXX_OPERATOR_CALL_EXPR"):
-            value = getattr(CursorKind, attr, None)
-            if value is not None:
-                call_kinds.add(value)
-
-        if kind in call_kinds:
-            return True
-
-        tokens = self._tokens(node)
-        if kind == CursorKind.UNARY_OPERATOR and ("++" in tokens or "--" in tokens):
-            return True
-
-        if kind == CursorKind.BINARY_OPERATOR:
-            assign_ops = {"=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>="}
-            if any(op in tokens for op in assign_ops):
-                return True
-
-        for child in node.get("children", []):
-            if self._has_side_effect(child):
-                return True
-
-        return False
-
-    def _then_else_nodes(self, if_node):
-        children = list(if_node.get("children", []))
-        cond = find_condition_node(if_node)
-        if cond in children:
-            children.remove(cond)
-        then_node = children[0] if len(children) > 0 else None
-        else_node = children[1] if len(children) > 1 else None
-        return then_node, else_node
-
-    def _is_else_if(self, node):
-        parent = node.get("parent")
-        if parent is None or parent.get("kind") != CursorKind.IF_STMT:
-            return False
-        _, else_node = self._then_else_nodes(parent)
-        return else_node is node
+        return expressions.key(cond)
 
     def apply(self, node):
-        if self._is_else_if(node):
-            return None
-
         seen = {}
-        current = node
-        while current is not None and current.get("kind") == CursorKind.IF_STMT:
-            norm = self._normalized_condition(current)
-            line = current.get("line")
-            if norm:
-                if norm in seen:
-                    first_line = seen[norm]
+        for branch in self.context.if_chains.chain_at(node).branches:
+            key = self._condition_key(branch)
+            line = branch.if_node.get("line")
+            if key is not None:
+                if key in seen:
+                    first_line = seen[key]
                     if line and first_line:
                         return (
                             f"[WARN] Else-if condition on line {line} duplicates "
@@ -97,12 +38,6 @@ class DuplicateBranchConditionRule(BaseRule):
                     if line:
                         return f"[WARN] Else-if condition on line {line} duplicates an earlier condition."
                     return "[WARN] Else-if condition duplicates an earlier condition."
-                seen[norm] = line
-
-            _, else_node = self._then_else_nodes(current)
-            if else_node is not None and else_node.get("kind") == CursorKind.IF_STMT:
-                current = else_node
-                continue
-            break
+                seen[key] = line
 
         return None
@@ -8,6 +8,8 @@ class EmptyLoopBodyRule(BaseRule):
     Warns when a loop body is empty (e.g., while (...); or for (...){ }).
     """
 
+    body_tokens = {"for", "while", "do"}
+
     _LOOP_KINDS = {
         CursorKind.WHILE_STMT,
         CursorKind.FOR_STMT,
@@ -18,23 +20,6 @@ class EmptyLoopBodyRule(BaseRule):
     def matches(self, node):
         return node.get("kind") in self._LOOP_KINDS
 
-    def _body_node(self, loop_node):
-        children = list(loop_node.get("children", []))
-        if not children:
-            return None
-
-        if loop_node.get("kind") == CursorKind.DO_STMT:
-            return children[0]
-
-        if children[-1].get("kind") in {CursorKind.NULL_STMT, CursorKind.COMPOUND_STMT}:
-            return children[-1]
-
-        for child in children:
-            if child.get("kind") in {CursorKind.NULL_STMT, CursorKind.COMPOUND_STMT}:
-                return child
-
-        return None
-
     def _loop_label(self, kind):
         if kind == CursorKind.WHILE_STMT:
             return "while-loop"
@@ -45,7 +30,7 @@ class EmptyLoopBodyRule(BaseRule):
         return "range-based for-loop"
 
     def apply(self, node):
-        body = self._body_node(node)
+        body = self.context.loop(node).body
         if body is None:
             return None
 
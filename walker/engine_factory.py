@@ -100,3 +100,19 @@ def build_engine(enabled_groups=None):
         )
 
     return RuleEngine(rules)
+
+
+def needs_macro_info(enabled_groups=None):
+    """
+    True if a rule in the enabled groups needs the detailed processing
+    record, so files should be parsed with it.
+    """
+    return build_engine(enabled_groups).needs_macros
+
+
+def needed_body_tokens(enabled_groups=None):
+    """
+    Tokens a function body must spell for a rule in the enabled groups to
+    read it (None: every body is read); passed to walk_ast.
+    """
+    return build_engine(enabled_groups).body_tokens
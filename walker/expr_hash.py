@@ -0,0 +1,166 @@
+from clang.cindex import CursorKind
+
+from expr_renderer import operator_spelling
+
+
+_CAST_KINDS = {
+    CursorKind.CSTYLE_CAST_EXPR,
+    CursorKind.CXX_STATIC_CAST_EXPR,
+    CursorKind.CXX_FUNCTIONAL_CAST_EXPR,
+}
+
+_LITERAL_KINDS = {
+    CursorKind.INTEGER_LITERAL,
+    CursorKind.FLOATING_LITERAL,
+    CursorKind.CHARACTER_LITERAL,
+    CursorKind.STRING_LITERAL,
+    CursorKind.CXX_BOOL_LITERAL_EXPR,
+}
+
+_COMMUTATIVE_OPS = {"+", "*", "==", "!=", "&", "|", "^", "&&", "||"}
+
+# a > b is hashed as b < a, a >= b as b <= a.
+_MIRRORED_OPS = {">": "<", ">=": "<="}
+
+_ASSIGN_OPS = {"=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>="}
+
+_CALL_KINDS = {
+    getattr(CursorKind, attr)
+    for attr in ("CALL_EXPR", "CXX_MEMBER_CALL_EXPR", "CXX_OPERATOR_CALL_EXPR")
+    if getattr(CursorKind, attr, None) is not None
+}
+
+
+def _spelling(node):
+    cursor = node.get("cursor")
+    if cursor is None:
+        return ""
+    return " ".join(t.spelling for t in cursor.get_tokens())
+
+
+class ExpressionHasher:
+    """
+    Canonical structural ids for expression subtrees.
+
+    Each subtree is hash-consed into a small integer: two subtrees get the
+    same id exactly when they have the same shape, operators, literals and
+    referenced declarations. The walk follows the wrapper-collapsed view,
+    so parentheses and single-child UNEXPOSED_EXPR wrappers are
+    transparent; operands of commutative operators are
+    ordered, and `a > b` is treated as `b < a`. Ids are computed on
+    demand, post-order, and memoized per node.
+
+    Literals expanded from a macro are keyed by their value (from the
+    context's constant evaluator): their tokens span the macro
+    definition, not the literal.
+    """
+
+    def __init__(self, context=None):
+        self.context = context
+        self._ids = {}
+        self._impure = {}
+        self._interned = {}
+
+    def key(self, node):
+        if node is None:
+            return None
+        node = node["semantic"]
+        self._compute(node)
+        return self._ids[id(node)]
+
+    def has_side_effects(self, node):
+        """
+        True if the subtree calls a function, assigns, or increments.
+        """
+        if node is None:
+            return False
+        node = node["semantic"]
+        self._compute(node)
+        return self._impure[id(node)]
+
+    def _compute(self, node):
+        if id(node) in self._ids:
+            return
+
+        stack = [(node, False)]
+        while stack:
+            cur, expanded = stack.pop()
+            if id(cur) in self._ids:
+                continue
+            if not expanded:
+                stack.append((cur, True))
+                for child in cur["semantic_children"]:
+                    if id(child) not in self._ids:
+                        stack.append((child, False))
+                continue
+            label, child_ids, impure = self._shape(cur)
+            impure = impure or any(self._impure[id(child)] for child in cur["semantic_children"])
+            self._ids[id(cur)] = self._intern((label, child_ids))
+            self._impure[id(cur)] = impure
+
+    def _intern(self, shape):
+        value = self._interned.get(shape)
+        if value is None:
+            value = len(self._interned)
+            self._interned[shape] = value
+        return value
+
+    def _shape(self, node):
+        """
+        (label, child ids, own side effect) for one semantic node.
+        """
+        kind = node.get("kind")
+        children = node["semantic_children"]
+        child_ids = tuple(self._ids[id(child)] for child in children)
+
+        if kind == CursorKind.DECL_REF_EXPR:
+            return ("ref", node.get("ref_usr") or node.get("name")), (), False
+
+        if kind == CursorKind.MEMBER_REF_EXPR:
+            return ("member", node.get("ref_usr") or node.get("name")), child_ids, False
+
+        if kind in _LITERAL_KINDS:
+            if node.get("macro"):
+                return self._macro_literal(node), (), False
+            return ("literal", kind.name, _spelling(node)), (), False
+
+        if kind in {CursorKind.BINARY_OPERATOR, CursorKind.COMPOUND_ASSIGNMENT_OPERATOR}:
+            op = operator_spelling(node)
+            if op is None:
+                # Unresolved (inside a macro expansion): equal to no other operator.
+                return ("binary", None, id(node)), child_ids, False
+            if len(child_ids) == 2:
+                if op in _MIRRORED_OPS:
+                    op = _MIRRORED_OPS[op]
+                    child_ids = (child_ids[1], child_ids[0])
+                elif op in _COMMUTATIVE_OPS:
+                    child_ids = tuple(sorted(child_ids))
+            return ("binary", op), child_ids, op in _ASSIGN_OPS
+
+        if kind == CursorKind.UNARY_OPERATOR:
+            op = operator_spelling(node)
+            if op is None:
+                return ("unary", None, id(node)), child_ids, False
+            if op in {"++", "--"}:
+                # Prefix and postfix differ; both are side effects.
+                return ("unary", op, _spelling(node)), child_ids, True
+            return ("unary", op), child_ids, False
+
+        if kind in _CALL_KINDS:
+            return ("call", node.get("ref_usr") or node.get("name")), child_ids, True
+
+        if kind in _CAST_KINDS:
+            cursor = node.get("cursor")
+            type_name = cursor.type.spelling if cursor is not None else ""
+            return ("cast", kind.name, type_name), child_ids, False
+
+        if not children:
+            return ("leaf", kind.name if kind is not None else "", _spelling(node)), (), False
+        return ("node", kind.name if kind is not None else "", node.get("name")), child_ids, False
+
+    def _macro_literal(self, node):
+        value = self.context.constants.value(node) if self.context is not None else None
+        if value is None:
+            # Unknown value (e.g. a string): equal to no other literal.
+            return ("literal", "macro", id(node))
+        return ("literal", node.get("kind").name, "value", value)
@@ -1,7 +1,8 @@
 from clang.cindex import CursorKind
 
+from ast_walker import resolve_operator
+
 
-_WRAPPER_KINDS = {CursorKind.UNEXPOSED_EXPR, CursorKind.PAREN_EXPR}
 _NULLPTR_KIND = getattr(CursorKind, "CXX_NULL_PTR_LITERAL_EXPR", None)
 
 _BINARY_OP_WORDS = {
@@ -37,50 +38,94 @@ def _tokens(node):
 
 
 def _token_spelling(node):
+    if node.get("macro"):
+        # The extent of a macro-expanded node spans the invocation, not the node.
+        return None
     toks = _tokens(node)
     if not toks:
         return None
     return " ".join(toks)
 
 
-def _unwrap(node):
-    cur = node
-    while cur is not None and cur.get("kind") in _WRAPPER_KINDS:
-        children = cur.get("children", [])
-        if len(children) != 1:
-            break
-        cur = children[0]
-    return cur
-
-
-def _extract_operator(node, operators):
-    for tok in _tokens(node):
-        if tok in operators:
-            return tok
+def macro_invocation(node):
+    """
+    Text of the macro invocation `node` was expanded from, e.g.
+    "CHECK(b > LIMIT)", or None for hand-written code.
+    """
+    while node is not None and node.get("macro"):
+        if node.get("macro_text"):
+            return node["macro_text"]
+        node = node.get("parent")
     return None
 
 
-def _extract_binary_operator(node, operators):
-    children = node.get("children", [])
-    tokens = _tokens(node)
-    if not tokens:
-        return None
-
-    if len(children) >= 2:
-        left_tokens = _tokens(children[0])
-        right_tokens = _tokens(children[1])
-
-        middle = list(tokens)
-        if left_tokens and middle[: len(left_tokens)] == left_tokens:
-            middle = middle[len(left_tokens) :]
-        if right_tokens and len(middle) >= len(right_tokens) and middle[-len(right_tokens) :] == right_tokens:
-            middle = middle[: -len(right_tokens)]
+def operator_spelling(node):
+    """
+    Operator of a BINARY_OPERATOR, COMPOUND_ASSIGNMENT_OPERATOR,
+    UNARY_OPERATOR or overloaded-operator call node, as resolved once by
+    the walker. Resolved here (and cached) only for nodes built elsewhere.
+    """
+    if "operator" not in node:
+        cursor = node.get("cursor")
+        children = [child.get("cursor") for child in node.get("children", [])]
+        if cursor is None or None in children:
+            node["operator"] = None
+        else:
+            node["operator"] = resolve_operator(cursor, node.get("kind"), children)
+    return node["operator"]
+
+
+# Defaults for `describe_expr`; see `set_describe_limits`.
+DESCRIBE_MAX_LENGTH = 240
+DESCRIBE_MAX_DEPTH = 48
+
+_ELLIPSIS = "..."
+
+_UNARY_OP_WORDS = {
+    "!": "not",
+    "-": "negative",
+    "++": "incremented",
+    "--": "decremented",
+}
 
-        for tok in middle:
-            if tok in operators:
-                return tok
+_CXX_OPERATOR_CALL_KIND = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
 
-    return _extract_operator(node, operators)
+_LITERAL_KINDS = {
+    CursorKind.INTEGER_LITERAL,
+    CursorKind.FLOATING_LITERAL,
+    CursorKind.STRING_LITERAL,
+    CursorKind.CHARACTER_LITERAL,
+    CursorKind.CXX_BOOL_LITERAL_EXPR,
+}
+if _NULLPTR_KIND is not None:
+    _LITERAL_KINDS.add(_NULLPTR_KIND)
+
+
+def set_describe_limits(max_length=None, max_depth=None):
+    """
+    Change the default output-length and nesting-depth caps of
+    `describe_expr`. Descriptions cached under other limits are ignored.
+    """
+    global DESCRIBE_MAX_LENGTH, DESCRIBE_MAX_DEPTH
+    if max_length is not None:
+        DESCRIBE_MAX_LENGTH = max_length
+    if max_depth is not None:
+        DESCRIBE_MAX_DEPTH = max_depth
+
+
+def _clip(text, max_length):
+    if len(text) <= max_length:
+        return text
+    keep = max(0, max_length - len(_ELLIPSIS))
+    head = text[:keep]
+    if " " in head and text[keep : keep + 1] != " ":
+        # Cut at a word boundary rather than mid-name.
+        head = head.rsplit(" ", 1)[0]
+    head = head.rstrip()
+    if head.endswith(_ELLIPSIS):
+        # An operand that was already clipped.
+        head = head[: -len(_ELLIPSIS)].rstrip()
+    return head + " " + _ELLIPSIS
 
 
 def _describe_binary(op, left_text, right_text):
@@ -88,33 +133,8 @@ def _describe_binary(op, left_text, right_text):
     return f"{left_text} {phrase} {right_text}"
 
 
-def _describe_call(node):
-    name = node.get("name")
-    children = [_unwrap(c) for c in node.get("children", [])]
-    children = [c for c in children if c is not None]
-
-    if not name:
-        return _token_spelling(node) or "a function call"
-
-    if not children:
-        return f"{name}()"
-
-    arg_texts = []
-    for child in children:
-        text = describe_expr(child)
-        if text and text != "an expression":
-            arg_texts.append(text)
-        if len(arg_texts) >= 2:
-            break
-
-    if not arg_texts:
-        return f"{name}()"
-    return f"{name} called with {', '.join(arg_texts)}"
-
-
 def _cxx_operator_operands(node):
-    children = [_unwrap(c) for c in node.get("children", [])]
-    children = [c for c in children if c is not None]
+    children = node["semantic_children"]
 
     filtered = []
     for child in children:
@@ -133,158 +153,156 @@ def _cxx_operator_operands(node):
     return None, None
 
 
-def describe_expr(node):
-    if node is None:
-        return "a condition"
-
-    node = _unwrap(node)
-    if node is None:
-        return "an expression"
-
+def _plan(node):
+    """
+    How to describe one unwrapped node: (operand nodes to describe first,
+    function combining their descriptions into this node's).
+    Leaves have no operands.
+    """
     kind = node.get("kind")
-    children = node.get("children", [])
+    children = node["semantic_children"]
+
+    macro_text = node.get("macro_text")
+    if macro_text:
+        # A macro invocation is described as written.
+        return [], lambda texts: macro_text
 
     if kind == CursorKind.BINARY_OPERATOR:
-        operators = {
-            "==",
-            "!=",
-            ">=",
-            "<=",
-            ">",
-            "<",
-            "&&",
-            "||",
-            "+",
-            "-",
-            "*",
-            "/",
-            "%",
-            "&",
-            "|",
-            "^",
-            "<<",
-            ">>",
-            "=",
-            "+=",
-            "-=",
-        }
-        op = _extract_binary_operator(
-            node,
-            operators,
-        )
-        left = describe_expr(children[0]) if len(children) > 0 else "the left side"
-        right = describe_expr(children[1]) if len(children) > 1 else "the right side"
-        if op is None:
-            return _token_spelling(node) or "an expression"
-        return _describe_binary(op, left, right)
-
-    cxx_operator_call = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
-    if cxx_operator_call is not None and kind == cxx_operator_call:
-        operators = {
-            "==",
-            "!=",
-            ">=",
-            "<=",
-            ">",
-            "<",
-            "&&",
-            "||",
-            "+",
-            "-",
-            "*",
-            "/",
-            "%",
-            "&",
-            "|",
-            "^",
-            "<<",
-            ">>",
-            "=",
-            "+=",
-            "-=",
-        }
-        op = _extract_binary_operator(
-            node,
-            operators,
-        )
+        op = operator_spelling(node)
+        if op not in _BINARY_OP_WORDS or len(children) != 2:
+            return [], lambda texts: _token_spelling(node) or "an expression"
+        return children, lambda texts: _describe_binary(op, texts[0], texts[1])
+
+    if _CXX_OPERATOR_CALL_KIND is not None and kind == _CXX_OPERATOR_CALL_KIND:
+        op = operator_spelling(node)
+        if op not in _BINARY_OP_WORDS:
+            op = None
         left_node, right_node = _cxx_operator_operands(node)
         if op and left_node is not None and right_node is not None:
-            left = describe_expr(left_node)
-            right = describe_expr(right_node)
-            return _describe_binary(op, left, right)
-        return _token_spelling(node) or "an expression"
+            return [left_node, right_node], lambda texts: _describe_binary(op, texts[0], texts[1])
+        return [], lambda texts: _token_spelling(node) or "an expression"
 
     if kind == CursorKind.UNARY_OPERATOR:
-        op = _extract_operator(node, {"!", "-", "+", "++", "--"})
-        operand = describe_expr(children[0]) if children else "a value"
-        if op == "!":
-            return f"not {operand}"
-        if op == "-":
-            return f"negative {operand}"
-        if op == "++":
-            return f"incremented {operand}"
-        if op == "--":
-            return f"decremented {operand}"
-        return operand
+        if not children:
+            return [], lambda texts: "a value"
+        word = _UNARY_OP_WORDS.get(operator_spelling(node))
+        if word is None:
+            return children[:1], lambda texts: texts[0]
+        return children[:1], lambda texts: f"{word} {texts[0]}"
 
     if kind == CursorKind.DECL_REF_EXPR:
-        return node.get("name") or "a variable"
+        return [], lambda texts: node.get("name") or "a variable"
 
-    literal_kinds = {
-        CursorKind.INTEGER_LITERAL,
-        CursorKind.FLOATING_LITERAL,
-        CursorKind.STRING_LITERAL,
-        CursorKind.CHARACTER_LITERAL,
-        CursorKind.CXX_BOOL_LITERAL_EXPR,
-    }
-    if _NULLPTR_KIND is not None:
-        literal_kinds.add(_NULLPTR_KIND)
-
-    if kind in literal_kinds:
-        return _token_spelling(node) or "a literal"
+    if kind in _LITERAL_KINDS:
+        return [], lambda texts: _token_spelling(node) or "a literal"
 
     if kind == CursorKind.CALL_EXPR:
-        return _describe_call(node)
+        name = node.get("name")
+        if not name:
+            return [], lambda texts: _token_spelling(node) or "a function call"
+        if not children:
+            return [], lambda texts: f"{name}()"
+
+        def describe_call(texts):
+            arg_texts = [text for text in texts if text and text != "an expression"][:2]
+            if not arg_texts:
+                return f"{name}()"
+            return f"{name} called with {', '.join(arg_texts)}"
+
+        return children, describe_call
 
     if kind == CursorKind.CONDITIONAL_OPERATOR and len(children) >= 3:
-        cond = describe_expr(children[0])
-        when_true = describe_expr(children[1])
-        when_false = describe_expr(children[2])
-        return f"{cond} ? {when_true} : {when_false}"
+        return children[:3], lambda texts: f"{texts[0]} ? {texts[1]} : {texts[2]}"
 
     if children:
         # Fallback for wrappers/other expression nodes.
-        return describe_expr(children[0])
+        return children[:1], lambda texts: texts[0]
+
+    return [], lambda texts: node.get("name") or _token_spelling(node) or "an expression"
+
+
+def describe_expr(node, max_length=None, max_depth=None):
+    """
+    Plain-English description of an expression node.
+
+    Rendered iteratively in post-order, so expression depth never touches
+    the recursion limit. Each description is clipped to `max_length`
+    characters and operands nested deeper than `max_depth` (wrappers not
+    counted) render as an ellipsis, so the work per node is bounded and a
+    huge generated condition costs time linear in its size. Descriptions
+    are cached on the nodes: operands rendered in full are reused by any
+    later render, and a clipped top-level render is reused when the same
+    node is described again with the same limits.
+    """
+    if node is None:
+        return "a condition"
+
+    node = node["semantic"]
+
+    limits = (
+        max_length if max_length is not None else DESCRIBE_MAX_LENGTH,
+        max_depth if max_depth is not None else DESCRIBE_MAX_DEPTH,
+    )
+    cached = node.get("description")
+    if cached is not None and cached[0] == limits:
+        return cached[1]
+
+    # (text, complete) per node id; complete means no operand was cut off.
+    done = {}
+    plans = {}
+    stack = [(node, 0, False)]
+    while stack:
+        cur, depth, expanded = stack.pop()
+
+        if expanded:
+            operands, combine = plans.pop(id(cur))
+            parts = [done[id(operand)] for operand in operands]
+            complete = all(part[1] for part in parts)
+            if parts and all(part[0] == _ELLIPSIS for part in parts):
+                # Nothing left to show; one ellipsis stands for the subtree.
+                text = _ELLIPSIS
+            else:
+                text = _clip(combine([part[0] for part in parts]), limits[0])
+            done[id(cur)] = (text, complete)
+            if complete or cur is node:
+                cur["description"] = (limits, text, complete)
+            continue
+
+        cached = cur.get("description")
+        if cached is not None and cached[0] == limits and cached[2]:
+            done[id(cur)] = (cached[1], True)
+            continue
+        if depth > limits[1]:
+            done[id(cur)] = (_ELLIPSIS, False)
+            continue
 
-    return node.get("name") or _token_spelling(node) or "an expression"
+        operands, combine = _plan(cur)
+        plans[id(cur)] = (operands, combine)
+        stack.append((cur, depth, True))
+        for operand in reversed(operands):
+            stack.append((operand, depth + 1, False))
+
+    return done[id(node)][0]
+
+
+_CONDITION_KINDS = _LITERAL_KINDS | {
+    CursorKind.BINARY_OPERATOR,
+    CursorKind.UNARY_OPERATOR,
+    CursorKind.PAREN_EXPR,
+    CursorKind.UNEXPOSED_EXPR,
+    CursorKind.DECL_REF_EXPR,
+    CursorKind.CALL_EXPR,
+    CursorKind.CONDITIONAL_OPERATOR,
+}
+if _CXX_OPERATOR_CALL_KIND is not None:
+    _CONDITION_KINDS.add(_CXX_OPERATOR_CALL_KIND)
 
 
 def find_condition_node(node):
     children = node.get("children", [])
 
-    expr_kinds = {
-        CursorKind.BINARY_OPERATOR,
-        CursorKind.UNARY_OPERATOR,
-        CursorKind.PAREN_EXPR,
-        CursorKind.UNEXPOSED_EXPR,
-        CursorKind.DECL_REF_EXPR,
-        CursorKind.INTEGER_LITERAL,
-        CursorKind.FLOATING_LITERAL,
-        CursorKind.STRING_LITERAL,
-        CursorKind.CHARACTER_LITERAL,
-        CursorKind.CXX_BOOL_LITERAL_EXPR,
-        CursorKind.CALL_EXPR,
-        CursorKind.CONDITIONAL_OPERATOR,
-    }
-    if _NULLPTR_KIND is not None:
-        expr_kinds.add(_NULLPTR_KIND)
-
-    cxx_operator_call = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
-    if cxx_operator_call is not None:
-        expr_kinds.add(cxx_operator_call)
-
     for child in children:
-        if child.get("kind") in expr_kinds:
+        if child.get("kind") in _CONDITION_KINDS:
             return child
 
     return children[0] if children else None
@@ -0,0 +1,255 @@
+import math
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits; workers run without a memory limit.
+    resource = None
+
+
+# Default limits for one file in a supervised worker.
+WORKER_TIMEOUT_S = 60.0
+WORKER_MEMORY_MB = 2048
+
+# Exit status of a worker that ran out of memory.
+_EXIT_OUT_OF_MEMORY = 70
+
+
+def _limit_memory(memory_mb):
+    if resource is None or not memory_mb:
+        return
+    limit = int(memory_mb) * 1024 * 1024
+    try:
+        _soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, analyze, memory_mb):
+    """
+    Worker loop: analyze one job at a time until told to stop. Stage
+    timings (with the CPU time the job has used so far) are sent as they
+    finish, so a file that later hangs or crashes still has them.
+    """
+    _limit_memory(memory_mb)
+    conn.send(("ready",))
+
+    cpu_start = 0.0
+
+    def cpu_ms():
+        return (time.process_time() - cpu_start) * 1000.0
+
+    def report(stage, ms):
+        conn.send(("stage", stage, ms, cpu_ms()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        cpu_start = time.process_time()
+        try:
+            payload = analyze(job, report)
+        except MemoryError:
+            os._exit(_EXIT_OUT_OF_MEMORY)
+        except Exception:
+            conn.send(("failed", traceback.format_exc().strip().splitlines()[-1], cpu_ms()))
+            continue
+        conn.send(("done", payload, cpu_ms()))
+
+
+def _exit_detail(exitcode, memory_mb):
+    if exitcode == _EXIT_OUT_OF_MEMORY:
+        return f"ran out of memory (limit {memory_mb} MB)"
+    if exitcode is not None and exitcode < 0:
+        try:
+            return f"was killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            return f"was killed by signal {-exitcode}"
+    return f"exited with status {exitcode}"
+
+
+class FileWorker:
+    """
+    One warm worker process, analyzing one file at a time.
+
+    The process (and everything it has imported and cached) is reused
+    across files; one that crashes or times out is replaced when the
+    next file is submitted. `index` and `deadline` describe the file in
+    progress, `stages` the stage timings it has reported so far and
+    `cpu_ms` the worker CPU time it has used.
+    """
+
+    def __init__(self, analyze, timeout, memory_mb, context):
+        self.analyze = analyze
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.context = context
+        self.process = None
+        self.conn = None
+        self.index = None
+        self.started = None
+        self.stages = {}
+        self.cpu_ms = 0.0
+
+    def _start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.analyze, self.memory_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        # Start-up (imports under the spawn method) does not count
+        # against the first file's timeout.
+        try:
+            parent_conn.recv()
+        except EOFError:
+            raise RuntimeError("A worker process could not be started.") from None
+
+    def submit(self, index, job):
+        if self.process is None or not self.process.is_alive():
+            self._discard()
+            self._start()
+        try:
+            self.conn.send(job)
+        except OSError:
+            # It died while idle; one restart is enough.
+            self._discard()
+            self._start()
+            self.conn.send(job)
+        self.index = index
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.cpu_ms = 0.0
+
+    @property
+    def deadline(self):
+        # A timeout of 0 (or one that is not a finite number) means none.
+        if self.started is None or not self.timeout or not 0 < self.timeout < math.inf:
+            return None
+        return self.started + self.timeout
+
+    def _outcome(self, status, **extra):
+        outcome = {
+            "status": status,
+            "stages": dict(self.stages),
+            "elapsed_ms": (time.perf_counter() - self.started) * 1000.0,
+            "cpu_ms": self.cpu_ms,
+        }
+        outcome.update(extra)
+        self.started = None
+        return outcome
+
+    def receive(self):
+        """
+        Handle one message from the worker. Returns the file's outcome
+        once it is finished, otherwise None.
+        """
+        try:
+            message = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1.0)
+            detail = _exit_detail(self.process.exitcode, self.memory_mb)
+            self._discard()
+            return self._outcome("crashed", detail=f"The worker process {detail}.")
+
+        self.cpu_ms = message[-1]
+        if message[0] == "stage":
+            self.stages[message[1]] = message[2]
+            return None
+        if message[0] == "failed":
+            return self._outcome("crashed", detail=f"Analysis failed: {message[1]}")
+        return self._outcome("done", payload=message[1])
+
+    def expire(self):
+        """
+        Kill the worker for the file past its deadline.
+        """
+        self._discard()
+        return self._outcome("timed out", detail=f"Gave up after {self.timeout:g} s.")
+
+    def _discard(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(1.0)
+        self._discard()
+
+
+class WorkerPool:
+    """
+    Supervised worker processes for per-file analysis.
+
+    `analyze(job, report)` runs in a worker and returns a picklable
+    payload; `report(stage, ms)` passes stage timings back as they are
+    measured. Each file gets `timeout` seconds of wall-clock time (none
+    if 0) and the workers an address-space limit of `memory_mb`.
+
+    Outcomes are dicts with "status" ("done", "timed out" or "crashed"),
+    "stages" (the timings reported), "elapsed_ms", "cpu_ms" (worker CPU
+    time, as of the last message for a file that did not finish) and
+    either "payload" or a "detail" sentence. With `size` workers, up to
+    `size` files are analyzed at once.
+    """
+
+    def __init__(self, analyze, size=1, timeout=WORKER_TIMEOUT_S, memory_mb=WORKER_MEMORY_MB):
+        context = multiprocessing.get_context()
+        self.workers = [FileWorker(analyze, timeout, memory_mb, context) for _ in range(max(1, size))]
+
+    def run(self, jobs):
+        """
+        Yield (index, outcome) for each (index, job), in completion order.
+        """
+        pending = list(reversed(jobs))
+        idle = list(self.workers)
+        busy = {}
+        while pending or busy:
+            while pending and idle:
+                worker = idle.pop()
+                worker.submit(*pending.pop())
+                busy[worker.conn] = worker
+
+            deadlines = [w.deadline for w in busy.values() if w.deadline is not None]
+            timeout = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+            for conn in wait(list(busy), timeout):
+                worker = busy[conn]
+                outcome = worker.receive()
+                if outcome is not None:
+                    del busy[conn]
+                    idle.append(worker)
+                    yield worker.index, outcome
+
+            now = time.perf_counter()
+            for conn, worker in list(busy.items()):
+                if worker.deadline is not None and worker.deadline <= now:
+                    del busy[conn]
+                    idle.append(worker)
+                    yield worker.index, worker.expire()
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
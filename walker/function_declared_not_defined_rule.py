@@ -1,4 +1,4 @@
-from clang.cindex import CursorKind
+from clang.cindex import CursorKind, StorageClass
 
 from base_rule import BaseRule
 
@@ -11,71 +11,32 @@ class FunctionDeclaredNotDefinedRule(BaseRule):
 
     def __init__(self):
         self.declared = {}
-        self.defined = set()
-        self.called = set()
+        # (usr, message) for every warning, so a batch run can revise them.
+        self.reported = []
 
     def _has_body(self, node):
         return any(child.get("kind") == CursorKind.COMPOUND_STMT for child in node.get("children", []))
 
-    def _tokens(self, node):
+    def _is_external_declaration(self, node):
+        # External declarations are often defined in other translation units.
         cursor = node.get("cursor")
         if cursor is None:
-            return []
-        return [t.spelling for t in cursor.get_tokens()]
-
-    def _usr(self, cursor):
-        if cursor is None:
-            return None
+            return False
         try:
-            usr = cursor.get_usr()
+            return cursor.storage_class == StorageClass.EXTERN
         except Exception:
-            usr = None
-        return usr or None
-
-    def _function_usr(self, node):
-        return self._usr(node.get("cursor"))
-
-    def _is_external_declaration(self, node):
-        # External declarations are often defined in other translation units.
-        tokens = self._tokens(node)
-        return "extern" in tokens
-
-    def matches(self, node):
-        kind = node.get("kind")
-
-        if kind == CursorKind.CALL_EXPR:
-            cursor = node.get("cursor")
-            if cursor is None:
-                return False
-            try:
-                referenced = cursor.referenced
-            except Exception:
-                referenced = None
-            if referenced is None:
-                return False
-            if referenced.kind != CursorKind.FUNCTION_DECL:
-                return False
-            usr = self._usr(referenced)
-            if usr:
-                self.called.add(usr)
             return False
 
-        if kind != CursorKind.FUNCTION_DECL:
+    def matches(self, node):
+        if node.get("kind") != CursorKind.FUNCTION_DECL:
             return False
 
         name = node.get("name")
-        if not name:
-            return False
-
-        usr = self._function_usr(node)
-        if not usr:
+        usr = node.get("usr")
+        if not name or not usr:
             return False
 
-        if self._has_body(node):
-            self.defined.add(usr)
-            return False
-
-        if self._is_external_declaration(node):
+        if self._has_body(node) or self._is_external_declaration(node):
             return False
 
         if usr not in self.declared:
@@ -88,26 +49,40 @@ class FunctionDeclaredNotDefinedRule(BaseRule):
     def apply(self, node):
         return None
 
-    def finalize(self):
-        messages = []
+    def undefined(self):
+        """
+        (usr, meta) of the declarations seen by `matches` that have no
+        definition in this file, in line order. Needs no function bodies,
+        so the outline mode lists them too.
+        """
+        symbols = self.context.symbols
         sortable = []
         for usr, meta in self.declared.items():
             sortable.append((meta.get("line") or 10**9, meta.get("name") or "", usr, meta))
+        out = []
         for _, _, usr, meta in sorted(sortable):
-            if usr in self.defined:
+            symbol = symbols.get(usr)
+            if symbol is None or symbol.definition is not None:
                 continue
-            if usr not in self.called:
+            out.append((usr, meta))
+        return out
+
+    def finalize(self):
+        messages = []
+        symbols = self.context.symbols
+        for usr, meta in self.undefined():
+            if not symbols.get(usr).is_referenced({CursorKind.CALL_EXPR}):
                 continue
 
             name = meta.get("name") or "function"
             line = meta.get("line")
             if line:
-                messages.append(
+                message = (
                     f"[WARN] Function '{name}' declared on line {line} is called "
                     "but not defined in this file."
                 )
             else:
-                messages.append(
-                    f"[WARN] Function '{name}' is called but not defined in this file."
-                )
+                message = f"[WARN] Function '{name}' is called but not defined in this file."
+            self.reported.append((usr, message))
+            messages.append(message)
         return messages
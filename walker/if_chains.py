@@ -0,0 +1,101 @@
+from clang.cindex import CursorKind
+
+from expr_renderer import find_condition_node
+
+
+class IfBranch:
+    """
+    One link of an if/else-if chain: its position, IF_STMT, condition
+    and body.
+    """
+
+    def __init__(self, position, if_node, condition, body):
+        self.position = position
+        self.if_node = if_node
+        self.condition = condition
+        self.body = body
+
+
+class IfChain:
+    """
+    An if statement and the else-ifs hanging off it, in source order,
+    plus the body of the final plain `else` (None if there is none).
+    """
+
+    def __init__(self, index, branches, else_body):
+        self.index = index
+        self.branches = branches
+        self.else_body = else_body
+
+    @property
+    def head(self):
+        return self.branches[0].if_node
+
+
+class IfChainIndex:
+    """
+    Every if/else-if chain of one file, found in a single pass.
+
+    Nodes arrive in pre-order, so a chain's head is seen before its
+    else-if links; each chain is followed down its else links once and
+    every IF_STMT in it is mapped back to the chain. Rules that reason
+    about whole chains match the head only, so an N-link chain costs O(N)
+    instead of being re-walked from every link.
+    """
+
+    def __init__(self, nodes):
+        self.chains = []
+        self._branch_of = {}
+        self._parts = {}
+        for node in nodes:
+            if node.get("kind") == CursorKind.IF_STMT and id(node) not in self._branch_of:
+                self._build(node)
+
+    def _split(self, if_node):
+        condition = find_condition_node(if_node)
+        rest = [child for child in if_node.get("children", []) if child is not condition]
+        then_node = rest[0] if len(rest) > 0 else None
+        else_node = rest[1] if len(rest) > 1 else None
+        parts = (condition, then_node, else_node)
+        self._parts[id(if_node)] = parts
+        return parts
+
+    def _build(self, head):
+        chain = IfChain(len(self.chains), [], None)
+        self.chains.append(chain)
+        current = head
+        while True:
+            condition, then_node, else_node = self._split(current)
+            branch = IfBranch(len(chain.branches), current, condition, then_node)
+            chain.branches.append(branch)
+            self._branch_of[id(current)] = (chain, branch)
+            if else_node is not None and else_node.get("kind") == CursorKind.IF_STMT:
+                current = else_node
+                continue
+            chain.else_body = else_node
+            return
+
+    def parts(self, if_node):
+        """
+        (condition, then, else) children of an IF_STMT.
+        """
+        parts = self._parts.get(id(if_node))
+        if parts is None:
+            parts = self._split(if_node)
+        return parts
+
+    def branch_of(self, if_node):
+        """
+        (chain, branch) for an IF_STMT, or (None, None).
+        """
+        return self._branch_of.get(id(if_node), (None, None))
+
+    def chain_at(self, node):
+        """
+        The chain `node` heads, or None if it is not an IF_STMT or is an
+        else-if link of another chain.
+        """
+        chain, branch = self.branch_of(node)
+        if chain is None or branch.position:
+            return None
+        return chain
@@ -4,6 +4,7 @@ from clang.cindex import CursorKind
 
 from base_rule import BaseRule
 from expr_renderer import describe_expr, find_condition_node
+from token_index import has_offset_between, node_offsets
 
 
 class IOStreamRule(BaseRule):
@@ -15,6 +16,7 @@ class IOStreamRule(BaseRule):
 
     _OUTPUT_NAMES = {"cout", "cerr", "clog"}
     _INPUT_NAMES = {"cin"}
+    body_tokens = _OUTPUT_NAMES | _INPUT_NAMES
     _SKIP_OUTPUT_ITEMS = {"std", "::", "endl", "std::endl"}
 
     def __init__(self):
@@ -27,6 +29,15 @@ class IOStreamRule(BaseRule):
             CursorKind.CALL_EXPR,
         }
         self._cxx_operator_call = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
+        self._stream_roots = set()
+        self._switch_of = {}
+        self._prefix_cache = {}
+
+    def prepare(self, context):
+        super().prepare(context)
+        self._stream_roots = self._mark_stream_roots(context)
+        self._switch_of = {}
+        self._prefix_cache = {}
 
     def _tokens(self, node):
         cursor = node.get("cursor")
@@ -41,63 +52,118 @@ class IOStreamRule(BaseRule):
                 return True
         return False
 
-    def _node_has_io(self, node):
-        tokens = self._tokens(node)
-        if not tokens:
-            return False
-        has_shift = ("<<" in tokens) or (">>" in tokens)
-        if not has_shift:
-            return False
-        return self._has_stream_token(tokens, self._OUTPUT_NAMES | self._INPUT_NAMES)
-
-    def _is_descendant(self, node, root):
-        cur = node
-        while cur is not None:
-            if cur is root:
-                return True
-            cur = cur.get("parent")
-        return False
+    def _is_candidate(self, node):
+        kind = node.get("kind")
+        return kind in self._candidate_kinds or (kind is not None and kind == self._cxx_operator_call)
+
+    def _mark_stream_roots(self, context):
+        """
+        ids of the outermost candidate expressions whose extent contains
+        both a shift operator and a stream name.
+
+        One pass over the file's tokens records where shifts and stream
+        names occur, so checking a node is two binary searches instead of
+        a tokenization. Nodes come in pre-order, so a node is outermost
+        exactly when no enclosing candidate was already marked.
+        """
+        shifts = []
+        streams = []
+        names = self._OUTPUT_NAMES | self._INPUT_NAMES
+        for spelling, _is_identifier, _line, _column, offset in context.tokens:
+            if spelling in {"<<", ">>"}:
+                shifts.append(offset)
+            elif spelling.split("::")[-1] in names:
+                streams.append(offset)
+
+        roots = set()
+        if not shifts or not streams:
+            return roots
+
+        inside = {}
+        for node in context.nodes:
+            parent = node.get("parent")
+            in_stream = inside.get(id(parent), False) if parent is not None else False
+            if not in_stream and self._is_candidate(node):
+                span = node_offsets(node)
+                if (
+                    span is not None
+                    and has_offset_between(shifts, span[0], span[1])
+                    and has_offset_between(streams, span[0], span[1])
+                ):
+                    roots.add(id(node))
+                    in_stream = True
+            inside[id(node)] = in_stream
+        return roots
 
     def _if_context(self, node):
+        branch = node
         cur = node.get("parent")
         while cur is not None:
             if cur.get("kind") == CursorKind.IF_STMT:
-                cond_node = find_condition_node(cur)
-                condition = describe_expr(cond_node) if cond_node is not None else None
-
-                children = list(cur.get("children", []))
-                if cond_node in children:
-                    children.remove(cond_node)
-                then_node = children[0] if len(children) > 0 else None
-                else_node = children[1] if len(children) > 1 else None
-
-                in_else = else_node is not None and self._is_descendant(node, else_node)
-                if in_else:
-                    if condition:
-                        return f"Inside the else-branch of an if-statement that checks whether {condition}, "
-                    return "Inside the else-branch of an if-statement, "
-                if condition:
-                    return f"Inside an if-statement that checks whether {condition}, "
-                return "Inside an if-statement, "
+                return self._if_prefix(cur, branch)
+            branch = cur
             cur = cur.get("parent")
         return ""
 
-    def _switch_context(self, node):
-        switch_node = None
-        case_node = None
+    def _if_prefix(self, if_node, branch):
+        cond_node, _then_node, else_node = self.context.if_chains.parts(if_node)
+        in_else = else_node is not None and branch is else_node
+
+        key = ("if", id(if_node), in_else)
+        cached = self._prefix_cache.get(key)
+        if cached is not None:
+            return cached
+
+        condition = describe_expr(cond_node) if cond_node is not None else None
+        if in_else:
+            if condition:
+                text = f"Inside the else-branch of an if-statement that checks whether {condition}, "
+            else:
+                text = "Inside the else-branch of an if-statement, "
+        elif condition:
+            text = f"Inside an if-statement that checks whether {condition}, "
+        else:
+            text = "Inside an if-statement, "
+
+        self._prefix_cache[key] = text
+        return text
+
+    def _enclosing_switch(self, node):
+        """
+        (innermost enclosing switch, nearest case/default label below it).
+
+        Memoized per node and filled from the nearest memoized ancestor,
+        so deeply nested code (long else-if chains) is climbed once in
+        total rather than once per stream expression.
+        """
+        path = []
         cur = node.get("parent")
-        while cur is not None:
-            kind = cur.get("kind")
-            if kind == CursorKind.SWITCH_STMT:
-                switch_node = cur
-                break
-            if kind in {CursorKind.CASE_STMT, CursorKind.DEFAULT_STMT} and case_node is None:
-                case_node = cur
+        while cur is not None and id(cur) not in self._switch_of:
+            path.append(cur)
             cur = cur.get("parent")
+        context = self._switch_of[id(cur)] if cur is not None else (None, None)
+        for ancestor in reversed(path):
+            kind = ancestor.get("kind")
+            if kind == CursorKind.SWITCH_STMT:
+                context = (ancestor, None)
+            elif kind in {CursorKind.CASE_STMT, CursorKind.DEFAULT_STMT} and context[0] is not None:
+                context = (context[0], ancestor)
+            self._switch_of[id(ancestor)] = context
+        return context
 
+    def _switch_context(self, node):
+        switch_node, case_node = self._enclosing_switch(node)
         if switch_node is None:
             return ""
 
+        key = ("switch", id(switch_node), id(case_node) if case_node is not None else None)
+        cached = self._prefix_cache.get(key)
+        if cached is None:
+            cached = self._switch_prefix(switch_node, case_node)
+            self._prefix_cache[key] = cached
+        return cached
+
+    def _switch_prefix(self, switch_node, case_node):
         cond_node = find_condition_node(switch_node)
         switch_expr = describe_expr(cond_node) if cond_node is not None else None
 
@@ -203,22 +269,7 @@ class IOStreamRule(BaseRule):
         if path:
             self._seen_files.add(path)
 
-        kind = node.get("kind")
-        if kind not in self._candidate_kinds and kind != self._cxx_operator_call:
-            return False
-
-        if not self._node_has_io(node):
-            return False
-
-        parent = node.get("parent")
-        while parent is not None:
-            parent_kind = parent.get("kind")
-            if parent_kind in self._candidate_kinds or parent_kind == self._cxx_operator_call:
-                if self._node_has_io(parent):
-                    return False
-            parent = parent.get("parent")
-
-        return True
+        return id(node) in self._stream_roots
 
     def apply(self, node):
         tokens = self._tokens(node)
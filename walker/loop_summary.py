@@ -0,0 +1,190 @@
+from clang.cindex import CursorKind
+
+from cfg import for_loop_parts
+from expr_renderer import find_condition_node, operator_spelling
+from symbol_index import READ
+
+
+_FOR_RANGE_KIND = getattr(CursorKind, "CXX_FOR_RANGE_STMT", None)
+
+LOOP_KINDS = {
+    CursorKind.WHILE_STMT,
+    CursorKind.FOR_STMT,
+    CursorKind.DO_STMT,
+}
+if _FOR_RANGE_KIND is not None:
+    LOOP_KINDS.add(_FOR_RANGE_KIND)
+
+_EMPTY = frozenset()
+
+_VARIABLE_KINDS = {CursorKind.VAR_DECL, CursorKind.PARM_DECL, CursorKind.FIELD_DECL}
+
+
+class WriteSummary:
+    """
+    USRs of the variables written anywhere in each node's subtree.
+
+    Computed once, bottom-up, over the walked nodes. A variable counts as
+    written by assignment, compound assignment, ++/--, `cin >>`, being
+    passed to a non-const reference parameter, having its address taken,
+    or a non-const method call on it. Writes through `*p`, `a[i]` and
+    `s.f` are attributed to `p`, `a` and `s`.
+    """
+
+    def __init__(self, nodes, symbols):
+        self.symbols = symbols
+        self._writes = {}
+        # Pre-order list reversed: every child is summarized before its parent.
+        for node in reversed(nodes):
+            self._writes[id(node)] = self._summarize(node)
+
+    def writes(self, node):
+        if node is None:
+            return _EMPTY
+        return self._writes.get(id(node), _EMPTY)
+
+    def _summarize(self, node):
+        own = self._own_writes(node)
+        child_sets = [self._writes.get(id(child), _EMPTY) for child in node.get("children", [])]
+        child_sets = [s for s in child_sets if s]
+        if not own and len(child_sets) <= 1:
+            # Share the child's set instead of copying it up the tree.
+            return child_sets[0] if child_sets else _EMPTY
+        out = set(own)
+        for s in child_sets:
+            out |= s
+        return frozenset(out)
+
+    def _own_writes(self, node):
+        kind = node.get("kind")
+        out = set()
+
+        ref_usr = node.get("ref_usr")
+        if ref_usr and kind in {CursorKind.DECL_REF_EXPR, CursorKind.MEMBER_REF_EXPR}:
+            if self.symbols.access(node) != READ:
+                out.add(ref_usr)
+
+        target = None
+        if kind == CursorKind.BINARY_OPERATOR and operator_spelling(node) == "=":
+            target = node
+        elif kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR:
+            target = node
+        elif kind == CursorKind.UNARY_OPERATOR and operator_spelling(node) in {"++", "--"}:
+            target = node
+        elif kind == CursorKind.CALL_EXPR:
+            callee = self._member_callee(node)
+            if callee is not None and not self._is_const_method(callee):
+                usr = _lvalue_root(callee)
+                if usr:
+                    out.add(usr)
+
+        if target is not None:
+            children = target.get("children", [])
+            usr = _lvalue_root(children[0]) if children else None
+            if usr:
+                out.add(usr)
+
+        return out
+
+    def _member_callee(self, call_node):
+        children = call_node["semantic_children"]
+        node = children[0] if children else None
+        if node is None or node.get("kind") != CursorKind.MEMBER_REF_EXPR:
+            return None
+        return node
+
+    def _is_const_method(self, member_node):
+        cursor = member_node.get("cursor")
+        try:
+            method = cursor.referenced if cursor is not None else None
+            return method is not None and method.is_const_method()
+        except Exception:
+            return False
+
+
+def _lvalue_root(node):
+    """
+    USR of the variable an lvalue expression ultimately designates.
+    """
+    while node is not None:
+        kind = node.get("kind")
+        children = node.get("children", [])
+        if kind == CursorKind.DECL_REF_EXPR:
+            return node.get("ref_usr")
+        if kind == CursorKind.MEMBER_REF_EXPR and not children:
+            # Implicit `this->field`.
+            return node.get("ref_usr")
+        if kind == CursorKind.UNARY_OPERATOR and operator_spelling(node) != "*":
+            return None
+        if kind not in {
+            CursorKind.PAREN_EXPR,
+            CursorKind.UNEXPOSED_EXPR,
+            CursorKind.UNARY_OPERATOR,
+            CursorKind.ARRAY_SUBSCRIPT_EXPR,
+            CursorKind.MEMBER_REF_EXPR,
+        }:
+            return None
+        node = children[0] if children else None
+    return None
+
+
+class LoopSummary:
+    """
+    The parts of one loop. `writes` (variables written anywhere in the
+    condition, increment or body) and `condition_vars` are computed on
+    first use, so rules that only need the parts never build the
+    file-wide write summary.
+    """
+
+    def __init__(self, node, context):
+        self.node = node
+        self.kind = node.get("kind")
+        self.init = self.condition = self.increment = self.body = None
+        self._context = context
+        self._writes = None
+        self._condition_vars = None
+
+        children = node.get("children", [])
+        if self.kind == CursorKind.FOR_STMT:
+            self.init, self.condition, self.increment, self.body = for_loop_parts(node)
+        elif self.kind == CursorKind.DO_STMT:
+            self.body = children[0] if children else None
+            self.condition = find_condition_node(node)
+        elif self.kind == CursorKind.WHILE_STMT:
+            self.body = children[-1] if children else None
+            self.condition = find_condition_node(node)
+        elif children:
+            self.body = children[-1]
+
+    @property
+    def writes(self):
+        if self._writes is None:
+            summary = self._context.writes
+            self._writes = (
+                summary.writes(self.condition)
+                | summary.writes(self.increment)
+                | summary.writes(self.body)
+            )
+        return self._writes
+
+    @property
+    def condition_vars(self):
+        """
+        {usr: name} of the variables read by the condition.
+        """
+        if self._condition_vars is not None:
+            return self._condition_vars
+
+        symbols = self._context.symbols
+        out = {}
+        stack = [self.condition] if self.condition is not None else []
+        while stack:
+            cur = stack.pop()
+            if cur.get("kind") == CursorKind.DECL_REF_EXPR:
+                usr = cur.get("ref_usr")
+                symbol = symbols.get(usr)
+                if symbol is not None and symbol.kind in _VARIABLE_KINDS:
+                    out[usr] = cur.get("name")
+            stack.extend(cur.get("children", []))
+        self._condition_vars = out
+        return out
@@ -1,7 +1,6 @@
 from clang.cindex import CursorKind
 
 from base_rule import BaseRule
-from expr_renderer import find_condition_node
 
 
 class MissingReturnRule(BaseRule):
@@ -46,15 +45,6 @@ class MissingReturnRule(BaseRule):
                 return child
         return None
 
-    def _if_then_else(self, if_node):
-        children = list(if_node.get("children", []))
-        cond = find_condition_node(if_node)
-        if cond in children:
-            children.remove(cond)
-        then_node = children[0] if len(children) > 0 else None
-        else_node = children[1] if len(children) > 1 else None
-        return then_node, else_node
-
     def _stmt_guarantees_return(self, node):
         kind = node.get("kind")
 
@@ -65,10 +55,14 @@ class MissingReturnRule(BaseRule):
             return self._block_guarantees_return(node)
 
         if kind == CursorKind.IF_STMT:
-            then_node, else_node = self._if_then_else(node)
-            if then_node is None or else_node is None:
+            # The whole else-if chain at once, without recursing down it.
+            chain, start = self.context.if_chains.branch_of(node)
+            branches = chain.branches[start.position :]
+            if chain.else_body is None or any(branch.body is None for branch in branches):
+                return False
+            if not all(self._stmt_guarantees_return(branch.body) for branch in branches):
                 return False
-            return self._stmt_guarantees_return(then_node) and self._stmt_guarantees_return(else_node)
+            return self._stmt_guarantees_return(chain.else_body)
 
         if kind == CursorKind.SWITCH_STMT:
             return self._switch_guarantees_return(node)
@@ -0,0 +1,95 @@
+from clang.cindex import CursorKind
+
+from analysis_context import AnalysisContext
+from class_index import FieldInfo
+from function_declared_not_defined_rule import FunctionDeclaredNotDefinedRule
+
+
+_FUNCTION_LABELS = {
+    CursorKind.FUNCTION_DECL: "function",
+    CursorKind.FUNCTION_TEMPLATE: "function",
+    CursorKind.CXX_METHOD: "method",
+    CursorKind.CONSTRUCTOR: "constructor",
+    CursorKind.DESTRUCTOR: "destructor",
+}
+_CLASS_LABELS = {
+    CursorKind.CLASS_DECL: "class",
+    CursorKind.STRUCT_DECL: "struct",
+    CursorKind.CLASS_TEMPLATE: "class",
+}
+
+
+def _has_body(node):
+    return any(child.get("kind") == CursorKind.COMPOUND_STMT for child in node.get("children", []))
+
+
+def _owner_class(node):
+    """
+    Name of the class a member belongs to, or None. Out-of-line member
+    definitions are resolved through their semantic parent.
+    """
+    parent = node.get("parent")
+    if parent is not None and parent.get("kind") in _CLASS_LABELS:
+        return parent.get("name") or None
+    if node.get("kind") in _FUNCTION_LABELS and node.get("kind") != CursorKind.FUNCTION_DECL:
+        try:
+            owner = node["cursor"].semantic_parent
+        except Exception:
+            return None
+        if owner is not None and owner.kind in _CLASS_LABELS:
+            return owner.spelling or None
+    return None
+
+
+def build_outline(nodes):
+    """
+    Outline of one file walked with walk_ast(outline=True).
+
+    Returns {"symbols": [...], "undefined": [...]}. Each symbol (function,
+    method, class, field) is one dict keyed by USR, in source order, with
+    the line of its first declaration, the line of its definition in this
+    file (None if there is none) and, for members, its class; fields also
+    say whether they have a default member initializer. "undefined" lists
+    the free functions declared but not defined here, from
+    FunctionDeclaredNotDefinedRule's declaration pass; whether they are
+    called needs function bodies, which the outline does not have.
+    """
+    context = AnalysisContext(nodes)
+    undefined_rule = FunctionDeclaredNotDefinedRule()
+    undefined_rule.prepare(context)
+
+    classes = context.classes
+    fields = {}
+    for table in classes.classes.values():
+        fields.update(table.fields)
+
+    entries = {}
+    for node in nodes:
+        undefined_rule.matches(node)
+        kind = node.get("kind")
+        label = _FUNCTION_LABELS.get(kind) or _CLASS_LABELS.get(kind)
+        if kind == CursorKind.FIELD_DECL:
+            label = "field"
+        usr = node.get("usr")
+        if label is None or not usr or not node.get("name"):
+            continue
+
+        entry = entries.get(usr)
+        if entry is None:
+            entry = {"kind": label, "name": node["name"], "line": node.get("line"), "definition": None}
+            owner = _owner_class(node)
+            if owner is not None:
+                entry["class"] = owner
+            if label == "field":
+                field = fields.get(usr) or FieldInfo(node)
+                entry["definition"] = entry["line"]
+                entry["initializer"] = classes.has_inline_initializer(field)
+            entries[usr] = entry
+
+        if entry["definition"] is None:
+            defined = _has_body(node) if kind in _FUNCTION_LABELS else node["cursor"].is_definition()
+            if defined:
+                entry["definition"] = node.get("line")
+
+    undefined = [{"name": meta.get("name"), "line": meta.get("line")} for _usr, meta in undefined_rule.undefined()]
+    return {"symbols": list(entries.values()), "undefined": undefined}
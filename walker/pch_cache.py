@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import re
+
+from clang import cindex
+from clang.cindex import Diagnostic
+
+from ast_parser import INCLUDE_ENV
+
+
+# Bump when the key or the files kept per entry change meaning.
+PCH_VERSION = 1
+
+PCH_CACHE_BYTES = 512 * 1024 * 1024
+
+_SYSTEM_INCLUDE = re.compile(r"#\s*include\s*<([^<>\n]+)>\s*$")
+
+
+def leading_includes(path):
+    """
+    Headers of the `#include <...>` lines a file starts with (blank lines
+    and comments allowed in between), in order. The block ends at the
+    first other line, so a `#define` that configures a header, a quoted
+    include or any code stops it.
+    """
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    includes = []
+    in_comment = False
+    for raw in lines:
+        line = raw.strip()
+        if in_comment:
+            if "*/" not in line:
+                continue
+            line = line.split("*/", 1)[1].strip()
+            in_comment = False
+        if line.startswith("/*"):
+            if "*/" not in line:
+                in_comment = True
+                continue
+            line = line.split("*/", 1)[1].strip()
+        if not line or line.startswith("//"):
+            continue
+        match = _SYSTEM_INCLUDE.match(line.split("//", 1)[0].strip())
+        if match is None:
+            break
+        includes.append(match.group(1).strip())
+    return includes
+
+
+class PchCache:
+    """
+    Precompiled headers for the include block files start with.
+
+    An entry is keyed by the exact header list, the parser arguments, the
+    include-path environment and the libclang library, and holds the PCH,
+    the generated header it was built from and the headers it covers.
+    Headers that do not precompile without errors get a marker instead,
+    so they are not rebuilt on every run. Entries are touched on use and
+    the least recently used are evicted once the PCH files take more than
+    `max_bytes`. `hits` and `misses` count lookups for files that have an
+    include block; `last` is "hit", "miss" or None for the latest one.
+
+    Headers inside a PCH are not listed by TranslationUnit.get_includes(),
+    so `last_headers` holds them for callers that track dependencies.
+    """
+
+    def __init__(self, directory, max_bytes=PCH_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.last = None
+        self.last_headers = []
+        os.makedirs(directory, exist_ok=True)
+
+    def _base(self, includes, args):
+        key = json.dumps(
+            [
+                PCH_VERSION,
+                includes,
+                args,
+                [os.environ.get(name, "") for name in INCLUDE_ENV],
+                cindex.conf.get_filename(),
+            ]
+        )
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def lookup(self, index, filename, args):
+        """
+        Path of a PCH for the file's leading system includes under `args`
+        (the arguments the file itself is parsed with), built on a miss.
+        None if the file has no such block or its headers do not
+        precompile cleanly.
+        """
+        self.last = None
+        self.last_headers = []
+        includes = leading_includes(filename)
+        if not includes:
+            return None
+
+        base = self._base(includes, args)
+        pch = base + ".pch"
+        if os.path.exists(pch):
+            headers = self._headers(base)
+            if headers is not None:
+                self.hits += 1
+                self.last = "hit"
+                self.last_headers = headers
+                try:
+                    os.utime(pch)
+                except OSError:
+                    pass
+                return pch
+
+        self.misses += 1
+        self.last = "miss"
+        if os.path.exists(base + ".bad"):
+            return None
+        if not self._build(index, base, includes, args):
+            return None
+        self.last_headers = self._headers(base) or []
+        self._evict(keep=pch)
+        return pch
+
+    def _headers(self, base):
+        try:
+            with open(base + ".json", encoding="utf-8") as f:
+                return json.load(f)["headers"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _build(self, index, base, includes, args):
+        # Workers running in parallel may build the same entry; temporary
+        # files are per process and the header, whose contents follow from
+        # the key, is written once.
+        suffix = f".{os.getpid()}.tmp"
+        source = base + ".hpp"
+        if not os.path.exists(source):
+            with open(source + suffix, "w", encoding="utf-8") as f:
+                f.write("".join(f"#include <{header}>\n" for header in includes))
+            os.replace(source + suffix, source)
+
+        header_args = list(args)
+        for i in range(len(header_args) - 1):
+            if header_args[i] == "-x":
+                header_args[i + 1] = "c++-header"
+        try:
+            unit = index.parse(source, args=header_args, options=cindex.TranslationUnit.PARSE_INCOMPLETE)
+        except cindex.TranslationUnitLoadError:
+            unit = None
+        if unit is None or any(d.severity >= Diagnostic.Error for d in unit.diagnostics):
+            open(base + ".bad", "w").close()
+            return False
+
+        headers = sorted({os.path.realpath(i.include.name) for i in unit.get_includes() if i.include is not None})
+        try:
+            unit.save(base + ".pch" + suffix)
+        except cindex.TranslationUnitSaveError:
+            open(base + ".bad", "w").close()
+            return False
+        with open(base + ".json" + suffix, "w", encoding="utf-8") as f:
+            json.dump({"includes": includes, "headers": headers}, f)
+        os.replace(base + ".json" + suffix, base + ".json")
+        os.replace(base + ".pch" + suffix, base + ".pch")
+        return True
+
+    def rejected(self, translation_unit):
+        """
+        True if libclang refused the PCH a file was parsed with (headers
+        changed since it was built, or another libclang built it).
+        """
+        return any(
+            d.severity >= Diagnostic.Fatal and ("precompiled header" in d.spelling or "AST file" in d.spelling)
+            for d in translation_unit.diagnostics
+        )
+
+    def discard(self, pch):
+        """
+        Drop an entry libclang refused; its lookup then counts as a miss.
+        """
+        if self.last == "hit":
+            self.hits -= 1
+            self.misses += 1
+        self.last = "miss"
+        self.last_headers = []
+        self._remove(pch)
+
+    def _remove(self, pch):
+        base = pch[: -len(".pch")]
+        for suffix in (".pch", ".json", ".hpp"):
+            try:
+                os.remove(base + suffix)
+            except OSError:
+                pass
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pch"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+from collections import deque
+
+from function_declared_not_defined_rule import FunctionDeclaredNotDefinedRule
+from unused_function_rule import UnusedFunctionRule, unused_function_message
+
+
+# Bump when the summary layout or the rules feeding it change meaning.
+SUMMARY_VERSION = 2
+
+
+def _rule_of_type(engine, rule_type):
+    return next((rule for rule in engine.rules if isinstance(rule, rule_type)), None)
+
+
+def file_summary(engine):
+    """
+    Compact, JSON-ready symbol summary of the file `engine` last ran on.
+
+    Holds the function USRs the file defines and only declares, its call
+    edges and entry points, and the findings that another file could
+    overturn ("never called", "not defined in this file").
+    """
+    context = engine.context
+    graph = context.call_graph
+    symbols = context.symbols
+
+    defined = []
+    declared = []
+    for usr in sorted(graph.functions):
+        symbol = symbols.get(usr)
+        if symbol is not None and symbol.definition is not None:
+            defined.append(usr)
+        else:
+            declared.append(usr)
+
+    functions = {}
+    reported_unused = []
+    unused_rule = _rule_of_type(engine, UnusedFunctionRule)
+    if unused_rule is not None:
+        for usr, (name, line) in unused_rule.functions.items():
+            functions[usr] = [name, line, unused_rule.textual_calls.get(usr, False)]
+        reported_unused = [message for _usr, message in unused_rule.reported]
+
+    reported_undefined = []
+    undefined_rule = _rule_of_type(engine, FunctionDeclaredNotDefinedRule)
+    if undefined_rule is not None:
+        reported_undefined = [[usr, message] for usr, message in undefined_rule.reported]
+
+    return {
+        "version": SUMMARY_VERSION,
+        "defined": defined,
+        "declared": declared,
+        "mains": sorted(graph.mains),
+        "entries": sorted(graph.entries - graph.mains),
+        "calls": {caller: sorted(callees) for caller, callees in sorted(graph.edges.items())},
+        "functions": functions,
+        "reported_unused": reported_unused,
+        "reported_undefined": reported_undefined,
+    }
+
+
+class ProjectIndex:
+    """
+    Reduce step over the file summaries of one batch.
+
+    Merges every file's definitions and call edges into one graph, runs a
+    single reachability search from all `main` functions (or, when no file
+    defines `main`, treats every referenced function as used), and then
+    revises each file's cross-file findings against the whole batch.
+    """
+
+    def __init__(self, summaries):
+        self.defined = set()
+        self.mains = set()
+        self.entries = set()
+        self.edges = {}
+        self.callers = {}
+        for summary in summaries:
+            if summary is None:
+                continue
+            self.defined.update(summary["defined"])
+            self.mains.update(summary["mains"])
+            self.entries.update(summary["entries"])
+            for caller, callees in summary["calls"].items():
+                self.edges.setdefault(caller, set()).update(callees)
+                for callee in callees:
+                    self.callers.setdefault(callee, set()).add(caller)
+        self.reachable = self._search()
+
+    def _search(self):
+        roots = self.mains | self.entries
+        seen = set(roots)
+        queue = deque(roots)
+        while queue:
+            usr = queue.popleft()
+            for callee in self.edges.get(usr, ()):
+                if callee not in seen:
+                    seen.add(callee)
+                    queue.append(callee)
+        return seen
+
+    def has_callers(self, usr):
+        if usr in self.entries:
+            return True
+        return any(caller != usr for caller in self.callers.get(usr, ()))
+
+    def is_used(self, usr):
+        if self.mains:
+            return usr in self.reachable
+        return self.has_callers(usr)
+
+    def revise(self, summary):
+        """
+        (messages to drop, messages to add) for one file's explanations.
+        """
+        previous = set(summary["reported_unused"])
+        current = []
+        for usr, (name, line, textual) in summary["functions"].items():
+            if textual or self.is_used(usr):
+                continue
+            current.append((line or 10**9, name, unused_function_message(name, line, self.has_callers(usr))))
+        current = [message for _line, _name, message in sorted(current)]
+
+        dropped = previous - set(current)
+        for usr, message in summary["reported_undefined"]:
+            if usr in self.defined:
+                dropped.add(message)
+        added = [message for message in current if message not in previous]
+        return dropped, added
+
+
+class SummaryCache:
+    """
+    On-disk cache of per-file results and summaries.
+
+    An entry is keyed by the file's real path, the selected rule groups
+    and `options` (whatever else changes the result: output options and
+    ast_parser.parser_settings()), and stays valid while the file and every header it included keep their
+    size and modification time. A batch where one file changed therefore
+    re-parses that file only; the others come from the cache and are merged.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_path(self, path, groups, options):
+        key = json.dumps([SUMMARY_VERSION, os.path.realpath(path), sorted(groups), options], sort_keys=True)
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _stamp(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load(self, path, groups, options=None):
+        """
+        (result, summary) for an up-to-date entry, else None.
+        """
+        try:
+            with open(self._entry_path(path, groups, options), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != SUMMARY_VERSION:
+            return None
+        for dep_path, stamp in entry.get("deps", []):
+            if self._stamp(dep_path) != stamp:
+                return None
+        return entry["result"], entry["summary"]
+
+    def store(self, path, groups, translation_unit, result, summary, headers=(), options=None):
+        """
+        Save a file's result; `headers` adds dependencies the translation
+        unit does not list itself (those loaded from a precompiled header).
+        """
+        deps = [os.path.realpath(path)] + list(headers)
+        for include in translation_unit.get_includes():
+            included = include.include
+            if included is not None and included.name:
+                deps.append(os.path.realpath(included.name))
+        entry = {
+            "version": SUMMARY_VERSION,
+            "deps": [[dep, self._stamp(dep)] for dep in sorted(set(deps))],
+            "result": result,
+            "summary": summary,
+        }
+        target = self._entry_path(path, groups, options)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, target)
@@ -8,6 +8,8 @@ class RangeForRule(BaseRule):
     Describes range-based for-loops (for (auto x : range)).
     """
 
+    body_tokens = {"for"}
+
     def matches(self, node):
         return node.get("kind") == CursorKind.CXX_FOR_RANGE_STMT
 
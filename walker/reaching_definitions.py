@@ -0,0 +1,237 @@
+from collections import deque
+
+from clang.cindex import CursorKind, StorageClass, TypeKind
+
+from cfg import build_cfg
+from expr_renderer import operator_spelling
+from symbol_index import READ, UPDATE, WRITE
+
+
+_LAMBDA_KIND = getattr(CursorKind, "LAMBDA_EXPR", None)
+
+_SCALAR_TYPE_KINDS = set()
+for _name in (
+    "BOOL", "CHAR_U", "UCHAR", "CHAR16", "CHAR32", "USHORT", "UINT", "ULONG", "ULONGLONG",
+    "UINT128", "CHAR_S", "SCHAR", "WCHAR", "SHORT", "INT", "LONG", "LONGLONG", "INT128",
+    "FLOAT", "DOUBLE", "LONGDOUBLE", "POINTER", "ENUM",
+):
+    _value = getattr(TypeKind, _name, None)
+    if _value is not None:
+        _SCALAR_TYPE_KINDS.add(_value)
+
+
+def solve_forward(cfg, gen, kill):
+    """
+    Worklist solver for a forward, union-meet bit-vector problem.
+
+    `gen` and `kill` are per-block integers indexed by block.index.
+    Returns the IN set of every block.
+    """
+    count = len(cfg.blocks)
+    in_bits = [0] * count
+    out_bits = [0] * count
+
+    # Blocks unreachable from the entry never run, so they contribute nothing.
+    order = cfg.reverse_postorder()
+    worklist = deque(order)
+    queued = [False] * count
+    for block in order:
+        queued[block.index] = True
+        out_bits[block.index] = gen[block.index]
+
+    while worklist:
+        block = worklist.popleft()
+        queued[block.index] = False
+
+        incoming = 0
+        for pred in block.preds:
+            incoming |= out_bits[pred.index]
+        in_bits[block.index] = incoming
+
+        outgoing = gen[block.index] | (incoming & ~kill[block.index])
+        if outgoing == out_bits[block.index]:
+            continue
+        out_bits[block.index] = outgoing
+        for succ in block.succs:
+            if not queued[succ.index]:
+                queued[succ.index] = True
+                worklist.append(succ)
+
+    return in_bits
+
+
+class UninitializedAnalysis:
+    """
+    Reaching-definitions analysis for locals declared without an initializer.
+
+    Every such local gets one synthetic "undefined" definition at its
+    declaration and one bit position (keyed by USR). A use that the
+    undefined definition still reaches may read an uninitialized value.
+    Reads and writes come from the file's SymbolIndex.
+    """
+
+    def __init__(self, func_node, symbols):
+        self.func_node = func_node
+        self.symbols = symbols
+        self.bits = {}
+        self.decls = []
+        self.assign_lines = {}
+
+    def _body(self):
+        for child in self.func_node.get("children", []):
+            if child.get("kind") == CursorKind.COMPOUND_STMT:
+                return child
+        return None
+
+    def _is_candidate(self, node):
+        cursor = node.get("cursor")
+        if cursor is None:
+            return False
+        if any(child.get("kind").is_expression() for child in node.get("children", [])):
+            return False
+        try:
+            if cursor.storage_class in {StorageClass.STATIC, StorageClass.EXTERN}:
+                return False
+            type_kind = cursor.type.get_canonical().kind
+        except Exception:
+            return False
+        return type_kind in _SCALAR_TYPE_KINDS
+
+    def _collect_locals(self):
+        for symbol in self.symbols.locals_of(self.func_node):
+            if symbol.kind != CursorKind.VAR_DECL or symbol.usr in self.bits:
+                continue
+            decl = symbol.decls[0]
+            if self._is_candidate(decl):
+                self.bits[symbol.usr] = len(self.decls)
+                self.decls.append(decl)
+
+    def _is_write_target(self, node):
+        while node is not None and node.get("kind") == CursorKind.PAREN_EXPR:
+            children = node.get("children", [])
+            node = children[0] if len(children) == 1 else None
+        if node is None or node.get("kind") != CursorKind.DECL_REF_EXPR:
+            return False
+        return self.symbols.access(node) in {WRITE, UPDATE}
+
+    def _events(self, node, events, conditional=False):
+        kind = node.get("kind")
+        children = node.get("children", [])
+
+        if _LAMBDA_KIND is not None and kind == _LAMBDA_KIND:
+            # Captures may initialize or read the local whenever the lambda
+            # runs; treat them as an escape that defines it for good.
+            stack = list(children)
+            while stack:
+                cur = stack.pop()
+                bit = self.bits.get(cur.get("ref_usr"))
+                if bit is not None:
+                    events.append(("def", bit, cur, False))
+                stack.extend(cur.get("children", []))
+            return
+
+        if kind == CursorKind.CXX_UNARY_EXPR:
+            # sizeof/alignof do not evaluate their operand.
+            return
+
+        if kind == CursorKind.DECL_REF_EXPR:
+            bit = self.bits.get(node.get("ref_usr"))
+            if bit is None:
+                return
+            access = self.symbols.access(node)
+            if access in {READ, UPDATE}:
+                events.append(("use", bit, node, conditional))
+            if access != READ:
+                events.append(("def", bit, node, conditional))
+            return
+
+        if kind == CursorKind.VAR_DECL:
+            for child in children:
+                self._events(child, events, conditional)
+            bit = self.bits.get(node.get("usr"))
+            if bit is not None:
+                events.append(("decl", bit, node, conditional))
+            return
+
+        if kind in {CursorKind.BINARY_OPERATOR, CursorKind.COMPOUND_ASSIGNMENT_OPERATOR} and len(children) == 2:
+            if self._is_write_target(children[0]):
+                # The right-hand side is evaluated before the store.
+                self._events(children[1], events, conditional)
+                self._events(children[0], events, conditional)
+                return
+            if kind == CursorKind.BINARY_OPERATOR and operator_spelling(node) in {"&&", "||"}:
+                self._events(children[0], events, conditional)
+                self._events(children[1], events, True)
+                return
+
+        if kind == CursorKind.CONDITIONAL_OPERATOR and len(children) == 3:
+            self._events(children[0], events, conditional)
+            self._events(children[1], events, True)
+            self._events(children[2], events, True)
+            return
+
+        for child in children:
+            self._events(child, events, conditional)
+
+    def run(self):
+        """
+        Return [(decl_node, first_uninitialized_use_node), ...].
+        """
+        body = self._body()
+        if body is None:
+            return []
+        self._collect_locals()
+        if not self.bits:
+            return []
+
+        cfg = build_cfg(body)
+        block_events = []
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            events = []
+            for item in block.items:
+                self._events(item, events)
+            block_events.append(events)
+
+            g = 0
+            k = 0
+            for action, bit, node, conditional in events:
+                mask = 1 << bit
+                if action == "decl":
+                    g |= mask
+                    k |= mask
+                elif action == "def":
+                    line = node.get("line")
+                    if isinstance(line, int):
+                        cur = self.assign_lines.get(bit)
+                        if cur is None or line < cur:
+                            self.assign_lines[bit] = line
+                    if not conditional:
+                        g &= ~mask
+                        k |= mask
+            gen.append(g)
+            kill.append(k)
+
+        in_bits = solve_forward(cfg, gen, kill)
+
+        first_use = {}
+        for block in cfg.blocks:
+            state = in_bits[block.index]
+            for action, bit, node, conditional in block_events[block.index]:
+                mask = 1 << bit
+                if action == "use":
+                    if state & mask:
+                        line = node.get("line")
+                        prev = first_use.get(bit)
+                        if prev is None or (line or 10**9) < (prev.get("line") or 10**9):
+                            first_use[bit] = node
+                elif action == "decl":
+                    state |= mask
+                elif not conditional:
+                    state &= ~mask
+
+        return [(self.decls[bit], use) for bit, use in sorted(first_use.items())]
+
+    def first_assignment_line(self, decl_node):
+        return self.assign_lines.get(self.bits.get(decl_node.get("usr")))
@@ -1,3 +1,6 @@
+from analysis_context import AnalysisContext
+
+
 class RuleEngine:
     """
     Applies a collection of rules to a flat list of AST nodes
@@ -6,10 +9,39 @@ class RuleEngine:
 
     def __init__(self, rules):
         self.rules = rules
+        # The AnalysisContext of the last run, for callers that export indexes.
+        self.context = None
+
+    @property
+    def needs_macros(self):
+        """
+        True if any rule needs the parser's detailed processing record.
+        """
+        return any(getattr(rule, "needs_macros", False) for rule in self.rules)
+
+    @property
+    def body_tokens(self):
+        """
+        Union of the rules' body tokens for walk_ast, or None if some rule
+        reads every function body.
+        """
+        tokens = set()
+        for rule in self.rules:
+            own = getattr(rule, "body_tokens", None)
+            if own is None:
+                return None
+            tokens |= own
+        return tokens
 
     def run(self, nodes):
         explanations = []
 
+        context = AnalysisContext(nodes)
+        self.context = context
+        for rule in self.rules:
+            if hasattr(rule, "prepare"):
+                rule.prepare(context)
+
         for node in nodes:
             for rule in self.rules:
                 # Check if the rule applies to this node
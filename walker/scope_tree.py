@@ -0,0 +1,131 @@
+from clang.cindex import CursorKind
+
+from symbol_index import FUNCTION_KINDS
+
+
+_FOR_RANGE_KIND = getattr(CursorKind, "CXX_FOR_RANGE_STMT", None)
+
+SCOPE_KINDS = FUNCTION_KINDS | {
+    CursorKind.COMPOUND_STMT,
+    CursorKind.IF_STMT,
+    CursorKind.FOR_STMT,
+    CursorKind.WHILE_STMT,
+    CursorKind.DO_STMT,
+    CursorKind.SWITCH_STMT,
+}
+if _FOR_RANGE_KIND is not None:
+    SCOPE_KINDS.add(_FOR_RANGE_KIND)
+
+DECL_KINDS = {CursorKind.VAR_DECL, CursorKind.PARM_DECL}
+
+_EXIT = object()
+
+
+class Scope:
+    """
+    One lexical scope: the node that opens it, its parent scope, the
+    function it belongs to, and the first declaration of each name in it.
+    """
+
+    def __init__(self, index, node, parent, function):
+        self.index = index
+        self.node = node
+        self.parent = parent
+        self.function = function
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.decls = {}
+
+
+class ScopeTree:
+    """
+    Lexical scopes of one file, built in a single pre-order pass.
+
+    Functions, compound statements and the statements that may declare a
+    variable in their header (if, for, while, do, switch) open scopes.
+    While walking, a name -> stack of (scope, declaration) map tracks what
+    each name currently refers to, so the declaration a new variable or
+    parameter hides is found in O(1) and recorded for `outer_declaration`.
+    """
+
+    def __init__(self, nodes):
+        self.scopes = []
+        self._scope_of = {}
+        self._outer = {}
+        self._function_decls = {}
+        root = nodes[0] if nodes else None
+        self.root = self._new_scope(root, None, None)
+        if root is not None:
+            self._build(root)
+
+    def _new_scope(self, node, parent, function):
+        scope = Scope(len(self.scopes), node, parent, function)
+        self.scopes.append(scope)
+        return scope
+
+    def _build(self, root):
+        self._scope_of[id(root)] = self.root
+        visible = {}
+        stack = [(child, self.root) for child in reversed(root.get("children", []))]
+        while stack:
+            node, scope = stack.pop()
+            if node is _EXIT:
+                for name in scope.decls:
+                    entries = visible[name]
+                    entries.pop()
+                    if not entries:
+                        del visible[name]
+                continue
+
+            kind = node.get("kind")
+            if kind in SCOPE_KINDS:
+                function = node if kind in FUNCTION_KINDS else scope.function
+                scope = self._new_scope(node, scope, function)
+                stack.append((_EXIT, scope))
+            self._scope_of[id(node)] = scope
+
+            name = node.get("name")
+            if kind in DECL_KINDS and name:
+                self._declare(node, name, scope, visible)
+
+            for child in reversed(node.get("children", [])):
+                stack.append((child, scope))
+
+    def _declare(self, node, name, scope, visible):
+        entries = visible.get(name)
+        outer = None
+        if entries:
+            top_scope, top_decl = entries[-1]
+            if top_scope is not scope:
+                outer = top_decl
+            elif len(entries) > 1:
+                # A redeclaration in the same scope still hides the outer one.
+                outer = entries[-2][1]
+        if outer is not None:
+            self._outer[id(node)] = outer
+
+        if name not in scope.decls:
+            scope.decls[name] = node
+            visible.setdefault(name, []).append((scope, node))
+
+        if scope.function is not None:
+            self._function_decls.setdefault(id(scope.function), []).append(node)
+
+    def scope_of(self, node):
+        """
+        The innermost scope containing `node` (a scope-opening node maps to
+        the scope it opens).
+        """
+        return self._scope_of.get(id(node))
+
+    def outer_declaration(self, decl):
+        """
+        The same-named declaration from an enclosing scope that `decl` hides,
+        or None.
+        """
+        return self._outer.get(id(decl))
+
+    def declarations(self, function_node):
+        """
+        Variables and parameters declared inside `function_node`, in order.
+        """
+        return self._function_decls.get(id(function_node), [])
@@ -1,24 +1,22 @@
 from clang.cindex import CursorKind
 
 from base_rule import BaseRule
+from expr_renderer import operator_spelling
 
 
 class SelfComparisonRule(BaseRule):
     """
-    Warns on comparisons where both sides are syntactically identical.
-    Example: x == x, value > value.
+    Warns on comparisons where both sides are structurally identical.
+    Example: x == x, value > value, (a + b) <= (b + a).
     """
 
     _OPS = {"==", "!=", "<", ">", "<=", ">="}
-
-    def __init__(self):
-        self._cxx_operator_call = getattr(CursorKind, "CXX_OPERATOR_CALL_EXPR", None)
+    body_tokens = _OPS
 
     def matches(self, node):
-        kind = node.get("kind")
-        if kind == CursorKind.BINARY_OPERATOR:
-            return True
-        return self._cxx_operator_call is not None and kind == self._cxx_operator_call
+        if node.get("kind") != CursorKind.BINARY_OPERATOR:
+            return False
+        return operator_spelling(node) in self._OPS
 
     def _tokens(self, node):
         cursor = node.get("cursor")
@@ -44,38 +42,28 @@ class SelfComparisonRule(BaseRule):
             out = out[1:-1]
         return out
 
-    def _normalize_side(self, tokens):
-        cleaned = [t for t in tokens if t not in {" ", "\t"}]
-        while cleaned and cleaned[-1] in {";", ","}:
-            cleaned = cleaned[:-1]
-        cleaned = self._strip_wrapping_parens(cleaned)
-        return cleaned
+    def _side_text(self, node):
+        return " ".join(self._strip_wrapping_parens(self._tokens(node)))
 
     def apply(self, node):
-        tokens = self._tokens(node)
-        if not tokens:
+        children = node.get("children", [])
+        if len(children) != 2:
             return None
 
-        op_index = None
-        op_token = None
-        for i, tok in enumerate(tokens):
-            if tok in self._OPS:
-                op_index = i
-                op_token = tok
-                break
-
-        if op_index is None:
+        left, right = children
+        expressions = self.context.expressions
+        if expressions.key(left) != expressions.key(right):
             return None
-
-        left = self._normalize_side(tokens[:op_index])
-        right = self._normalize_side(tokens[op_index + 1 :])
-        if not left or not right:
+        # `i++ == i++` or `f() == f()` can differ between evaluations.
+        if expressions.has_side_effects(node):
             return None
 
-        if left != right:
+        left_text = self._side_text(left)
+        right_text = self._side_text(right)
+        if not left_text or not right_text:
             return None
 
-        left_text = " ".join(left)
+        op_token = operator_spelling(node)
         line = node.get("line")
 
         always_true_ops = {"==", "<=", ">="}
@@ -84,6 +72,6 @@ class SelfComparisonRule(BaseRule):
         if line:
             return (
                 f"[WARN] Self-comparison on line {line}: "
-                f"'{left_text} {op_token} {left_text}' is always {result}."
+                f"'{left_text} {op_token} {right_text}' is always {result}."
             )
-        return f"[WARN] Self-comparison: '{left_text} {op_token} {left_text}' is always {result}."
+        return f"[WARN] Self-comparison: '{left_text} {op_token} {right_text}' is always {result}."
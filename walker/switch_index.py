@@ -0,0 +1,261 @@
+from bisect import bisect_left
+
+from clang.cindex import CursorKind
+
+from expr_renderer import find_condition_node
+from token_index import has_offset_between, node_offsets
+
+
+_LABEL_KINDS = {CursorKind.CASE_STMT, CursorKind.DEFAULT_STMT}
+
+_TERMINATOR_KINDS = {
+    CursorKind.BREAK_STMT,
+    CursorKind.RETURN_STMT,
+    CursorKind.CONTINUE_STMT,
+    CursorKind.GOTO_STMT,
+}
+_THROW_KIND = getattr(CursorKind, "CXX_THROW_EXPR", None)
+if _THROW_KIND is not None:
+    _TERMINATOR_KINDS.add(_THROW_KIND)
+
+
+class EnumTable:
+    """
+    Enumerators of the enums used in one file, keyed by enum USR.
+
+    Enums declared in the file are read from its nodes; others (from
+    headers) are read from the declaration cursor on first use.
+    """
+
+    def __init__(self, nodes):
+        self._enums = {}
+        for node in nodes:
+            if node.get("kind") == CursorKind.ENUM_DECL and node.get("usr"):
+                constants = [
+                    (child.get("name"), child["cursor"].enum_value)
+                    for child in node.get("children", [])
+                    if child.get("kind") == CursorKind.ENUM_CONSTANT_DECL
+                ]
+                if constants or node.get("usr") not in self._enums:
+                    self._enums[node["usr"]] = constants
+
+    def enumerators(self, declaration):
+        """
+        [(name, value)] for an ENUM_DECL cursor, in declaration order.
+        """
+        usr = declaration.get_usr()
+        constants = self._enums.get(usr)
+        if not constants:
+            constants = [
+                (child.spelling, child.enum_value)
+                for child in declaration.get_children()
+                if child.kind == CursorKind.ENUM_CONSTANT_DECL
+            ]
+            self._enums[usr] = constants
+        return constants
+
+
+class SwitchLabel:
+    """
+    One case or default label: its node and evaluated value (None if
+    unknown; `upper` is set for a GNU `case lo ... hi` range). `text` is
+    filled in by SwitchIndex.label_text.
+    """
+
+    def __init__(self, node, value, upper):
+        self.node = node
+        self.is_default = node.get("kind") == CursorKind.DEFAULT_STMT
+        self.value = value
+        self.upper = upper
+        self.text = None
+        self.line = node.get("line")
+
+
+class SwitchTable:
+    """
+    The labels of one switch and how control moves between them.
+
+    `labels` holds every case/default label that belongs to this switch
+    (labels of nested switches are theirs), `fallthrough` the (label, next
+    label) pairs whose section can run into the next one, and, when the
+    condition has enum type, `enumerators` and `missing` the enumerators
+    of that enum and those no case handles.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.condition = find_condition_node(node)
+        self.labels = []
+        self.default = None
+        self.fallthrough = []
+        self.enumerators = None
+        self.missing = []
+
+    @property
+    def values_known(self):
+        return all(label.value is not None for label in self.labels if not label.is_default)
+
+
+class SwitchIndex:
+    """
+    Switch tables of one file.
+
+    Each switch subtree is walked once (stopping at nested switches) to
+    collect its labels; fallthrough uses subtree terminator flags computed
+    once for the whole file and a token-offset lookup for [[fallthrough]]
+    markers, so even generated switches with thousands of cases cost time
+    linear in their size.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.enums = EnumTable(context.nodes)
+        self._markers = None
+        self._offsets = None
+        self._terminates = {}
+        self.tables = []
+        for node in context.nodes:
+            if node.get("kind") == CursorKind.SWITCH_STMT:
+                self.tables.append(self._build(node))
+
+    def _build(self, switch_node):
+        table = SwitchTable(switch_node)
+        body = None
+        for child in switch_node.get("children", []):
+            if child.get("kind") == CursorKind.COMPOUND_STMT:
+                body = child
+                break
+
+        stack = list(reversed(switch_node.get("children", [])))
+        while stack:
+            node = stack.pop()
+            kind = node.get("kind")
+            if kind == CursorKind.SWITCH_STMT:
+                continue
+            if kind in _LABEL_KINDS:
+                label = self._label(node)
+                table.labels.append(label)
+                if label.is_default and table.default is None:
+                    table.default = label
+            stack.extend(reversed(node.get("children", [])))
+
+        if body is not None:
+            self._link_sections(table, body)
+        self._check_enum(table)
+        return table
+
+    def _label(self, node):
+        if node.get("kind") == CursorKind.DEFAULT_STMT:
+            return SwitchLabel(node, None, None)
+        constants = self.context.constants
+        children = node.get("children", [])
+        value_node = children[0] if children else None
+        upper_node = children[1] if len(children) > 2 and children[1].get("kind").is_expression() else None
+        value = constants.value(value_node) if value_node is not None else None
+        upper = constants.value(upper_node) if upper_node is not None else None
+        return SwitchLabel(node, value, upper)
+
+    def _load_tokens(self):
+        # Only sections without a terminator need the token stream.
+        if self._offsets is None:
+            tokens = self.context.tokens
+            self._offsets = [token[4] for token in tokens]
+            self._markers = [token[4] for token in tokens if token[0].lower() == "fallthrough"]
+
+    def label_text(self, label):
+        """
+        Source text of a case value ("lo ... hi" for a range), joined from
+        the file's token stream; rendered on first request.
+        """
+        if label.text is not None:
+            return label.text
+        label.text = "default" if label.is_default else "case"
+        children = label.node.get("children", [])
+        if label.is_default or not children:
+            return label.text
+        start = node_offsets(children[0])
+        end = node_offsets(children[1] if label.upper is not None else children[0])
+        if start is None or end is None:
+            return label.text
+
+        self._load_tokens()
+        tokens = self.context.tokens
+        i = bisect_left(self._offsets, start[0])
+        spelled = []
+        while i < len(self._offsets) and self._offsets[i] < end[1]:
+            spelled.append(tokens[i][0])
+            i += 1
+        if spelled:
+            label.text = " ".join(spelled)
+        return label.text
+
+    def _has_terminator(self, root):
+        """
+        True if the subtree contains break/return/continue/goto/throw.
+        Flags are memoized per node, so each node is visited once per file.
+        """
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in self._terminates:
+                continue
+            children = node.get("children", [])
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children if id(child) not in self._terminates)
+                continue
+            self._terminates[id(node)] = node.get("kind") in _TERMINATOR_KINDS or any(
+                self._terminates[id(child)] for child in children
+            )
+        return self._terminates[id(root)]
+
+    def _link_sections(self, table, body):
+        children = body.get("children", [])
+        starts = [i for i, child in enumerate(children) if child.get("kind") in _LABEL_KINDS]
+        by_node = {id(label.node): label for label in table.labels}
+        for position, start in enumerate(starts[:-1]):
+            section = children[start : starts[position + 1]]
+            if any(self._has_terminator(node) for node in section):
+                continue
+            if self._has_marker(section):
+                continue
+            table.fallthrough.append((by_node[id(children[start])], by_node[id(children[starts[position + 1]])]))
+
+    def _has_marker(self, section):
+        self._load_tokens()
+        if not self._markers:
+            return False
+        first = node_offsets(section[0])
+        last = node_offsets(section[-1])
+        if first is None or last is None:
+            return False
+        return has_offset_between(self._markers, first[0], last[1])
+
+    def _check_enum(self, table):
+        condition = table.condition
+        if condition is None:
+            return
+        cursor = condition["semantic"].get("cursor")
+        try:
+            declaration = cursor.type.get_canonical().get_declaration() if cursor is not None else None
+        except Exception:
+            declaration = None
+        if declaration is None or declaration.kind != CursorKind.ENUM_DECL:
+            return
+
+        table.enumerators = self.enums.enumerators(declaration)
+        if not table.values_known:
+            return
+        points = set()
+        ranges = []
+        for label in table.labels:
+            if label.is_default:
+                continue
+            if label.upper is None:
+                points.add(label.value)
+            else:
+                ranges.append((label.value, label.upper))
+        for name, value in table.enumerators:
+            if value in points or any(low <= value <= high for low, high in ranges):
+                continue
+            table.missing.append(name)
@@ -0,0 +1,231 @@
+from clang.cindex import CursorKind, TypeKind
+
+from expr_renderer import operator_spelling
+
+
+FUNCTION_KINDS = {
+    CursorKind.FUNCTION_DECL,
+    CursorKind.CXX_METHOD,
+    CursorKind.CONSTRUCTOR,
+    CursorKind.DESTRUCTOR,
+    CursorKind.FUNCTION_TEMPLATE,
+}
+
+# Reference access classes.
+READ = "read"
+WRITE = "write"
+UPDATE = "update"  # read-modify-write: x++, x += 1
+ESCAPE = "escape"  # address taken or bound to a non-const reference
+
+
+class Symbol:
+    """
+    One declared entity, identified by USR.
+    """
+
+    def __init__(self, usr, node):
+        self.usr = usr
+        self.name = node.get("name")
+        self.kind = node.get("kind")
+        self.decls = []
+        self.definition = None
+        self.owner = None
+        self.refs = []
+
+    @property
+    def line(self):
+        node = self.definition or (self.decls[0] if self.decls else None)
+        return node.get("line") if node is not None else None
+
+    def is_referenced(self, kinds=None):
+        if kinds is None:
+            return bool(self.refs)
+        return any(ref.get("kind") in kinds for ref, _access in self.refs)
+
+    def is_read(self):
+        return any(access in {READ, UPDATE, ESCAPE} for _ref, access in self.refs)
+
+
+class SymbolIndex:
+    """
+    USR-keyed declaration/reference index for one file.
+
+    Built in a single pass over the walked nodes, using the "usr" and
+    "ref_usr" fields resolved by the walker. Every reference is classified
+    as read, write, update or escape.
+    """
+
+    def __init__(self, nodes):
+        self.symbols = {}
+        self._owners = {}
+        self._access = {}
+        self._by_owner = {}
+        self._ref_args = {}
+        # Names of references libclang could not resolve (dependent template code).
+        self.unresolved_names = set()
+        self._build(nodes)
+
+    def _build(self, nodes):
+        for node in nodes:
+            kind = node.get("kind")
+            parent = node.get("parent")
+            if kind in FUNCTION_KINDS:
+                owner = node
+            elif parent is not None:
+                owner = self._owners.get(id(parent))
+            else:
+                owner = None
+            self._owners[id(node)] = owner
+
+            usr = node.get("usr")
+            if usr:
+                symbol = self.symbols.get(usr)
+                if symbol is None:
+                    symbol = Symbol(usr, node)
+                    self.symbols[usr] = symbol
+                symbol.decls.append(node)
+                if symbol.definition is None and self._is_definition(node):
+                    symbol.definition = node
+                if kind in {CursorKind.VAR_DECL, CursorKind.PARM_DECL} and symbol.owner is None:
+                    func = owner if owner is not node else None
+                    symbol.owner = func
+                    if func is not None:
+                        self._by_owner.setdefault(id(func), []).append(symbol)
+
+            ref_usr = node.get("ref_usr")
+            if not ref_usr and kind in {CursorKind.DECL_REF_EXPR, CursorKind.MEMBER_REF_EXPR}:
+                if node.get("name"):
+                    self.unresolved_names.add(node["name"])
+            if ref_usr:
+                symbol = self.symbols.get(ref_usr)
+                if symbol is None:
+                    # Referenced before (or without) a declaration in this file.
+                    symbol = Symbol(ref_usr, node)
+                    symbol.kind = None
+                    self.symbols[ref_usr] = symbol
+                access = self._classify(node)
+                self._access[id(node)] = access
+                symbol.refs.append((node, access))
+
+        # Symbols first seen through a reference pick up their kind later.
+        for symbol in self.symbols.values():
+            if symbol.kind is None and symbol.decls:
+                symbol.kind = symbol.decls[0].get("kind")
+                symbol.name = symbol.decls[0].get("name")
+
+    def _is_definition(self, node):
+        kind = node.get("kind")
+        if kind in FUNCTION_KINDS:
+            return any(child.get("kind") == CursorKind.COMPOUND_STMT for child in node.get("children", []))
+        if kind in {CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL, CursorKind.ENUM_DECL}:
+            return bool(node.get("children"))
+        return True
+
+    def _is_cin_chain(self, node):
+        while node is not None:
+            if node.get("kind") == CursorKind.DECL_REF_EXPR:
+                return (node.get("name") or "").split("::")[-1] == "cin"
+            children = node.get("children", [])
+            node = children[0] if children else None
+        return False
+
+    def _reference_arguments(self, call_node):
+        """
+        ids of child nodes passed to non-const lvalue-reference parameters.
+        """
+        key = id(call_node)
+        cached = self._ref_args.get(key)
+        if cached is not None:
+            return cached
+
+        out = set()
+        cursor = call_node.get("cursor")
+        direct = [
+            child for child in call_node.get("children", [])
+            if child.get("kind") in {CursorKind.DECL_REF_EXPR, CursorKind.MEMBER_REF_EXPR, CursorKind.PAREN_EXPR}
+        ]
+        if direct and cursor is not None:
+            try:
+                callee = cursor.referenced
+                params = [arg.type for arg in callee.get_arguments()] if callee is not None else []
+                args = list(cursor.get_arguments())
+            except Exception:
+                params, args = [], []
+            # Operator calls pass the implicit object first; align from the right.
+            offset = len(args) - len(params)
+            by_cursor = {child["cursor"]: child for child in direct if child.get("cursor") is not None}
+            for i, arg in enumerate(args):
+                j = i - offset
+                if j < 0 or j >= len(params):
+                    continue
+                param = params[j]
+                if param.kind != TypeKind.LVALUEREFERENCE or param.get_pointee().is_const_qualified():
+                    continue
+                child = by_cursor.get(arg)
+                if child is not None:
+                    out.add(id(child))
+
+        self._ref_args[key] = out
+        return out
+
+    def _classify(self, node):
+        kind = node.get("kind")
+        if kind not in {CursorKind.DECL_REF_EXPR, CursorKind.MEMBER_REF_EXPR}:
+            return READ
+
+        child = node
+        parent = node.get("parent")
+        while parent is not None and parent.get("kind") in {CursorKind.PAREN_EXPR, CursorKind.UNEXPOSED_EXPR}:
+            child = parent
+            parent = parent.get("parent")
+        if parent is None:
+            return READ
+
+        parent_kind = parent.get("kind")
+        siblings = parent.get("children", [])
+        is_lhs = bool(siblings) and siblings[0] is child
+
+        if parent_kind == CursorKind.BINARY_OPERATOR:
+            op = operator_spelling(parent)
+            if op == "=" and is_lhs:
+                return WRITE
+            if op == ">>" and not is_lhs and self._is_cin_chain(siblings[0]):
+                # Without <iostream> resolved, `cin >> x` stays a plain shift.
+                return WRITE
+            return READ
+
+        if parent_kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR:
+            return UPDATE if is_lhs else READ
+
+        if parent_kind == CursorKind.UNARY_OPERATOR:
+            op = operator_spelling(parent)
+            if op in {"++", "--"}:
+                return UPDATE
+            if op == "&":
+                return ESCAPE
+            return READ
+
+        if parent_kind == CursorKind.CALL_EXPR and id(child) in self._reference_arguments(parent):
+            return ESCAPE
+
+        return READ
+
+    def get(self, usr):
+        if not usr:
+            return None
+        return self.symbols.get(usr)
+
+    def of_kind(self, kinds):
+        return [s for s in self.symbols.values() if s.decls and s.kind in kinds]
+
+    def access(self, ref_node):
+        return self._access.get(id(ref_node), READ)
+
+    def enclosing_function(self, node):
+        return self._owners.get(id(node))
+
+    def locals_of(self, func_node):
+        """
+        Parameters and local variables declared directly in `func_node`.
+        """
+        return list(self._by_owner.get(id(func_node), []))
@@ -1,4 +1,7 @@
+import functools
 import json
+import math
+import multiprocessing
 import os
 import re
 import sys
@@ -6,9 +9,13 @@ import time
 
 from clang.cindex import Diagnostic
 
-from ast_parser import parse_cpp_file
+from ast_parser import parse_cpp_file, parser_settings
 from ast_walker import walk_ast
-from engine_factory import ALL_RULE_GROUPS, build_engine
+from engine_factory import ALL_RULE_GROUPS, build_engine, needed_body_tokens, needs_macro_info
+from file_worker import WORKER_MEMORY_MB, WORKER_TIMEOUT_S, WorkerPool
+from outline import build_outline
+from pch_cache import PchCache
+from project_index import ProjectIndex, SummaryCache, file_summary
 
 
 LINE_RE = re.compile(r"\bline (\d+)\b")
@@ -110,6 +117,12 @@ def _metadata_for_message(message, severity, source):
             "Fix conflicting comparisons so the condition can become true for at least one input.",
             0.95,
         )
+    if "tautological condition" in text:
+        return (
+            "conditionals",
+            "Remove the redundant check, or fix the comparisons so the condition can become false.",
+            0.9,
+        )
     if "duplicates an earlier condition" in text:
         return (
             "conditionals",
@@ -166,7 +179,7 @@ def _metadata_for_message(message, severity, source):
             "Remove unused parameters or use them in function logic.",
             0.86,
         )
-    if "function '" in text and "is never called" in text:
+    if "function '" in text and ("is never called" in text or "is only called from functions" in text):
         return (
             "functions",
             "Call the function from program flow, or remove it if unnecessary.",
@@ -371,12 +384,460 @@ def _timing_ms(parse_ms, traversal_ms, interpretation_ms):
     }
 
 
+def _print_text_result(result, multiple, is_last):
+    display_name = result["file"]
+    explanations = result["explanations"]
+    items = result["items"]
+    timing = result["timing_ms"]
+    blocking_parse_errors = _has_blocking_parse_errors(
+        [item for item in items if item.get("source") == "clang"]
+    )
+
+    if multiple:
+        print(f"=== {display_name} ===")
+
+    if explanations:
+        for explanation in explanations:
+            print(explanation)
+    elif blocking_parse_errors:
+        for item in items:
+            severity = item.get("severity")
+            if severity not in {"error", "warning"}:
+                continue
+            if item.get("source") not in {"clang", "runtime"}:
+                continue
+            prefix = "[ERROR]" if severity == "error" else "[WARN]"
+            line = item.get("line")
+            column = item.get("column")
+            location_parts = []
+            if isinstance(line, int):
+                location_parts.append(f"line {line}")
+            if isinstance(column, int):
+                location_parts.append(f"column {column}")
+            location = f" ({', '.join(location_parts)})" if location_parts else ""
+            print(f"{prefix} {item.get('message', '').strip()}{location}")
+
+    pch = f", pch: {timing['pch']}" if timing.get("pch") else ""
+    print(
+        f"[timing] parse: {timing['parse']} ms, traversal: {timing['traversal']} ms, "
+        f"interpretation: {timing['interpretation']} ms, total: {timing['total']} ms{pch}."
+    )
+
+    if not is_last:
+        print()
+
+
+def _apply_project_revision(result, dropped, added):
+    """
+    Replace a file's cross-file findings with the batch-wide verdicts.
+    """
+    if not dropped and not added:
+        return
+    dropped_items = {_classify_rule_message(message)["message"] for message in dropped}
+    explanations = [text for text in result["explanations"] if text not in dropped]
+    for message in added:
+        line = _line_from_message(message)
+        index = len(explanations)
+        if line is not None:
+            # Keep the engine's line order.
+            index = next(
+                (i for i, text in enumerate(explanations) if (_line_from_message(text) or 10**9) > line),
+                len(explanations),
+            )
+        explanations.insert(index, message)
+
+    items = [
+        item for item in result["items"]
+        if not (item.get("source") == "rule" and item.get("message") in dropped_items)
+    ]
+    items.extend(_classify_rule_message(message) for message in added)
+    items = _sort_items(items)
+    result["explanations"] = explanations
+    result["items"] = items
+    result["summary"] = _summary(items)
+
+
+def _outline_result(filename, pch_cache=None):
+    """
+    Declaration outline of one file (see outline.build_outline): parsed
+    with function bodies skipped and walked for declarations only.
+    """
+    display_name = _display_name(filename)
+    target_file = os.path.realpath(filename)
+    is_pasted = display_name == "pasted code:"
+    result = {
+        "file": display_name,
+        "path": None if is_pasted else target_file,
+        "is_pasted": is_pasted,
+        "ok": True,
+        "error": None,
+        "symbols": [],
+        "undefined": [],
+    }
+
+    parse_start = time.perf_counter()
+    try:
+        translation_unit = parse_cpp_file(filename, outline=True, pch_cache=pch_cache)
+    except Exception as exc:
+        result["ok"] = False
+        result["error"] = f"Failed to parse {display_name}: {exc}"
+        result["timing_ms"] = _timing_ms((time.perf_counter() - parse_start) * 1000.0, 0.0, 0.0)
+        return result
+    parse_ms = (time.perf_counter() - parse_start) * 1000.0
+
+    traversal_start = time.perf_counter()
+    nodes = []
+    walk_ast(translation_unit.cursor, nodes, target_file=target_file, outline=True)
+    traversal_ms = (time.perf_counter() - traversal_start) * 1000.0
+
+    interpretation_start = time.perf_counter()
+    result.update(build_outline(nodes))
+    interpretation_ms = (time.perf_counter() - interpretation_start) * 1000.0
+    result["timing_ms"] = _timing_ms(parse_ms, traversal_ms, interpretation_ms)
+    _add_pch_status(result["timing_ms"], pch_cache)
+    return result
+
+
+def _print_outline(result, multiple, is_last):
+    if multiple:
+        print(f"=== {result['file']} ===")
+    if not result["ok"]:
+        print(result["error"])
+    for symbol in result["symbols"]:
+        name = f"{symbol['class']}::{symbol['name']}" if symbol.get("class") else symbol["name"]
+        if symbol["kind"] == "field":
+            detail = " (has initializer)" if symbol.get("initializer") else ""
+        elif symbol["definition"] is None:
+            detail = " (declared only)"
+        elif symbol["definition"] != symbol["line"]:
+            detail = f" (defined on line {symbol['definition']})"
+        else:
+            detail = ""
+        print(f"line {symbol['line']}: {symbol['kind']} {name}{detail}")
+    for entry in result["undefined"]:
+        print(f"[WARN] Function '{entry['name']}' declared on line {entry['line']} is not defined in this file.")
+    timing = result["timing_ms"]
+    print(
+        f"[timing] parse: {timing['parse']} ms, traversal: {timing['traversal']} ms, "
+        f"interpretation: {timing['interpretation']} ms, total: {timing['total']} ms."
+    )
+    if not is_last:
+        print()
+
+
+def _run_outline(files, json_mode, pch_cache=None):
+    overall_start = time.perf_counter()
+    results = [_outline_result(filename, pch_cache) for filename in files]
+    if json_mode:
+        timing = {"total": _round_ms((time.perf_counter() - overall_start) * 1000.0)}
+        timing.update(_pch_totals(pch_cache, [result["timing_ms"] for result in results]))
+        print(json.dumps({"ok": True, "mode": "outline", "results": results, "timing_ms": timing}))
+        return
+    for i, result in enumerate(results):
+        _print_outline(result, len(results) > 1, i == len(results) - 1)
+    _print_pch_totals(pch_cache, [result["timing_ms"] for result in results])
+
+
+def _add_pch_status(timing, pch_cache):
+    """
+    Record whether a file's include block came from the PCH cache
+    ("hit", "miss", or None when it has no leading system includes).
+    """
+    if pch_cache is not None:
+        timing["pch"] = pch_cache.last
+
+
+def _pch_totals(pch_cache, timings):
+    """
+    PCH hits and misses over the files' timings (counted from the results,
+    since worker processes keep their own PchCache counters).
+    """
+    if pch_cache is None:
+        return {}
+    statuses = [timing.get("pch") for timing in timings]
+    return {"pch_hits": statuses.count("hit"), "pch_misses": statuses.count("miss")}
+
+
+def _print_pch_totals(pch_cache, timings):
+    totals = _pch_totals(pch_cache, timings)
+    if totals:
+        print(f"[pch cache] hits: {totals['pch_hits']}, misses: {totals['pch_misses']}.")
+
+
+# Stages a file goes through, in order; workers report each as it ends.
+_STAGES = ("parse", "traversal", "interpretation")
+
+
+def _failed_result(filename, message, timing, suggestion):
+    display_name = _display_name(filename)
+    is_pasted = display_name == "pasted code:"
+    return {
+        "file": display_name,
+        "path": None if is_pasted else os.path.realpath(filename),
+        "is_pasted": is_pasted,
+        "ok": False,
+        "error": message,
+        "explanations": [],
+        "items": [
+            {
+                "severity": "error",
+                "source": "runtime",
+                "line": None,
+                "message": message,
+                "topic": "runtime",
+                "suggestion": suggestion,
+                "confidence": 1.0,
+            }
+        ],
+        "summary": {"error": 1, "warning": 0, "info": 0, "total": 1, "by_topic": {"runtime": 1}},
+        "timing_ms": timing,
+    }
+
+
+def _supervision_failure(filename, outcome):
+    """
+    Result for a file whose worker timed out or crashed. Stages that
+    finished keep their timing; the one in progress gets the rest of the
+    elapsed time.
+    """
+    stages = outcome["stages"]
+    remaining = outcome["elapsed_ms"] - sum(stages.values())
+    times = []
+    current = None
+    for stage in _STAGES:
+        if stage in stages:
+            times.append(stages[stage])
+        elif current is None:
+            current = stage
+            times.append(max(remaining, 0.0))
+        else:
+            times.append(0.0)
+
+    status = outcome["status"]
+    message = f"Analysis of {_display_name(filename)} {status} during {current or 'reporting'}. {outcome['detail']}"
+    result = _failed_result(
+        filename,
+        message,
+        _timing_ms(*times),
+        "The rest of the batch was analyzed; run this file alone, or raise --timeout / --memory-limit.",
+    )
+    result["status"] = status
+    result["stage"] = current
+    return result
+
+
+def _print_failure(result, multiple, is_last):
+    timing = result["timing_ms"]
+    if multiple:
+        print(f"=== {result['file']} ===")
+    print(result["error"])
+    print(
+        f"[timing] parse: {timing['parse']} ms, traversal: {timing['traversal']} ms, "
+        f"interpretation: {timing['interpretation']} ms, total: {timing['total']} ms."
+    )
+    if not is_last:
+        print()
+
+
+def _analyze_file(filename, report=None, settings=None):
+    """
+    Parse, walk and run the selected rules on one file.
+
+    Runs in a worker process (unless --in-process is given), so it
+    returns a picklable payload: {"result", "summary"}, or {"parse_error",
+    "timing"} if libclang could not parse the file. `report(stage, ms)`
+    is called as each stage ends.
+    """
+    pch_cache = settings["pch_cache"]
+    display_name = _display_name(filename)
+    target_file = os.path.realpath(filename)
+    is_pasted = display_name == "pasted code:"
+
+    parse_start = time.perf_counter()
+    try:
+        translation_unit = parse_cpp_file(filename, detailed=settings["detailed"], pch_cache=pch_cache)
+    except MemoryError:
+        raise
+    except Exception as exc:
+        parse_ms = (time.perf_counter() - parse_start) * 1000.0
+        return {"parse_error": str(exc), "timing": _timing_ms(parse_ms, 0.0, 0.0)}
+    parse_ms = (time.perf_counter() - parse_start) * 1000.0
+    if report is not None:
+        report("parse", parse_ms)
+
+    traversal_start = time.perf_counter()
+    nodes = []
+    walk_ast(translation_unit.cursor, nodes, target_file=target_file, body_tokens=settings["body_tokens"])
+    traversal_ms = (time.perf_counter() - traversal_start) * 1000.0
+    if report is not None:
+        report("traversal", traversal_ms)
+
+    clang_items = _clang_items(translation_unit, target_file)
+    blocking_parse_errors = _has_blocking_parse_errors(clang_items)
+
+    interpretation_ms = 0.0
+    explanations = []
+    rule_items = []
+    call_graph = None
+    if not blocking_parse_errors:
+        interpretation_start = time.perf_counter()
+        engine = build_engine(settings["groups"])
+        explanations = engine.run(nodes)
+        interpretation_ms = (time.perf_counter() - interpretation_start) * 1000.0
+        rule_items = [_classify_rule_message(e) for e in explanations]
+        if settings["call_graph"]:
+            call_graph = engine.context.call_graph.to_dict()
+
+    combined_items = list(clang_items) + list(rule_items)
+    if blocking_parse_errors:
+        error_lines = [item.get("line") for item in clang_items if item.get("severity") == "error"]
+        first_error_line = min((ln for ln in error_lines if isinstance(ln, int)), default=None)
+        combined_items.append(_limited_analysis_item(first_error_line))
+
+    items = _sort_items(combined_items)
+    timing = _timing_ms(parse_ms, traversal_ms, interpretation_ms)
+    _add_pch_status(timing, pch_cache)
+
+    result = {
+        "file": display_name,
+        "path": None if is_pasted else target_file,
+        "is_pasted": is_pasted,
+        "ok": True,
+        "error": None,
+        "explanations": explanations,
+        "items": items,
+        "summary": _summary(items),
+        "timing_ms": timing,
+        "rule_groups": settings["groups"],
+    }
+    if settings["call_graph"]:
+        result["call_graph"] = call_graph
+
+    symbol_summary = None
+    if settings["project"]:
+        symbol_summary = file_summary(engine) if not blocking_parse_errors else None
+        summary_cache = settings["summary_cache"]
+        if summary_cache is not None and symbol_summary is not None:
+            headers = pch_cache.last_headers if pch_cache is not None else ()
+            summary_cache.store(
+                filename,
+                settings["groups"],
+                translation_unit,
+                result,
+                symbol_summary,
+                headers,
+                settings["cache_options"],
+            )
+    return {"result": result, "summary": symbol_summary}
+
+
 def main():
     args = sys.argv[1:]
     json_mode = True
     if "--text" in args:
         json_mode = False
         args = [a for a in args if a != "--text"]
+    # --pch-cache DIR loads the standard headers files start with from
+    # precompiled headers kept in DIR.
+    pch_cache = None
+    if "--pch-cache" in args:
+        idx = args.index("--pch-cache")
+        if idx + 1 >= len(args):
+            error = "Missing directory after --pch-cache."
+            if json_mode:
+                print(json.dumps({"ok": False, "error": error}))
+            else:
+                print(error)
+            return
+        pch_cache = PchCache(args[idx + 1])
+        args = args[:idx] + args[idx + 2 :]
+    # --outline lists declarations only (function bodies are not parsed);
+    # rule groups do not apply.
+    if "--outline" in args:
+        files = [a for a in args if a != "--outline"]
+        if not files:
+            error = "No files provided."
+            print(json.dumps({"ok": False, "error": error}) if json_mode else error)
+            return
+        _run_outline(files, json_mode, pch_cache)
+        return
+    export_call_graph = "--call-graph" in args
+    if export_call_graph:
+        args = [a for a in args if a != "--call-graph"]
+    # --project merges symbol summaries across all given files;
+    # --summary-cache DIR also reuses unchanged files' results.
+    project_mode = "--project" in args
+    if project_mode:
+        args = [a for a in args if a != "--project"]
+    summary_cache = None
+    if "--summary-cache" in args:
+        idx = args.index("--summary-cache")
+        if idx + 1 >= len(args):
+            error = "Missing directory after --summary-cache."
+            if json_mode:
+                print(json.dumps({"ok": False, "error": error}))
+            else:
+                print(error)
+            return
+        summary_cache = SummaryCache(args[idx + 1])
+        args = args[:idx] + args[idx + 2 :]
+        project_mode = True
+
+    # Files are analyzed in supervised worker processes, each file with a
+    # wall-clock timeout (seconds, 0 for none) and a memory limit (MB);
+    # --in-process analyzes them in this process instead.
+    in_process = "--in-process" in args
+    if in_process:
+        args = [a for a in args if a != "--in-process"]
+    limits = {"--timeout": WORKER_TIMEOUT_S, "--memory-limit": WORKER_MEMORY_MB}
+    for flag in limits:
+        if flag in args:
+            idx = args.index(flag)
+            value = None
+            try:
+                if flag == "--timeout":
+                    value = float(args[idx + 1])
+                    if not math.isfinite(value) or value < 0:
+                        value = None
+                else:
+                    value = int(args[idx + 1])
+                    if value <= 0:
+                        value = None
+            except (IndexError, ValueError):
+                pass
+            if value is None:
+                if flag == "--timeout":
+                    error = "--timeout needs a number of seconds (0 for no limit)."
+                else:
+                    error = "--memory-limit needs a positive whole number of MB."
+                if json_mode:
+                    print(json.dumps({"ok": False, "error": error}))
+                else:
+                    print(error)
+                return
+            limits[flag] = value
+            args = args[:idx] + args[idx + 2 :]
+    # --jobs N analyzes up to N files at once (0 for one per CPU).
+    jobs_count = 1
+    if "--jobs" in args:
+        idx = args.index("--jobs")
+        try:
+            jobs_count = int(args[idx + 1])
+        except (IndexError, ValueError):
+            jobs_count = -1
+        error = None
+        if jobs_count < 0:
+            error = "Missing or invalid number after --jobs."
+        elif in_process:
+            error = "--jobs needs worker processes; it cannot be combined with --in-process."
+        if error is not None:
+            if json_mode:
+                print(json.dumps({"ok": False, "error": error}))
+            else:
+                print(error)
+            return
+        jobs_count = jobs_count or os.cpu_count() or 1
+        args = args[:idx] + args[idx + 2 :]
 
     enabled_groups = None
     if "--groups" in args:
@@ -420,155 +881,161 @@ def main():
             return
         files = entry.split()
 
-    overall_start = time.perf_counter()
-    if json_mode:
-        results = []
+    settings = {
+        "groups": selected_groups,
+        # Macro definition/instantiation cursors are only parsed if a rule reads them.
+        "detailed": needs_macro_info(selected_groups),
+        # Function bodies none of the selected rules can read are not walked.
+        "body_tokens": needed_body_tokens(selected_groups),
+        "call_graph": export_call_graph,
+        "project": project_mode,
+        "summary_cache": summary_cache,
+        # Everything besides the groups that changes a cached result.
+        "cache_options": {"call_graph": export_call_graph, "parser": parser_settings()},
+        "pch_cache": pch_cache,
+    }
 
+    overall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    # CPU time the workers spent on this run's files.
+    worker_cpu_ms = 0.0
+    results = []
+    # (result, symbol summary) for successfully analyzed files in project mode.
+    project_results = []
+    # Timings of the files analyzed in this run, for the PCH totals.
+    analyzed_timings = []
+
+    # Outcomes by input position, filled in as files finish and reported
+    # in input order.
+    outcomes = [None] * len(files)
+    jobs = []
     for idx, filename in enumerate(files):
-        display_name = _display_name(filename)
-        target_file = os.path.realpath(filename)
-        is_pasted = display_name == "pasted code:"
-
-        parse_start = time.perf_counter()
-        translation_unit = None
-        try:
-            translation_unit = parse_cpp_file(filename)
-        except Exception as exc:
-            parse_ms = (time.perf_counter() - parse_start) * 1000.0
-            timing = _timing_ms(parse_ms, 0.0, 0.0)
-
-            if len(files) > 1:
-                print(f"=== {display_name} ===")
-            print(f"Failed to parse {display_name}: {exc}")
-            if not json_mode:
-                print(
-                    f"[timing] parse: {timing['parse']} ms, traversal: 0.0 ms, "
-                    f"interpretation: 0.0 ms, total: {timing['total']} ms."
-                )
-            if idx < len(files) - 1:
-                print()
-
-            if json_mode:
-                parse_message = f"Failed to parse {display_name}: {exc}"
-                results.append(
-                    {
-                        "file": display_name,
-                        "path": None if is_pasted else target_file,
-                        "is_pasted": is_pasted,
-                        "ok": False,
-                        "error": parse_message,
-                        "explanations": [],
-                        "items": [
-                            {
-                                "severity": "error",
-                                "source": "runtime",
-                                "line": None,
-                                "message": parse_message,
-                                "topic": "runtime",
-                                "suggestion": (
-                                    "Check that the file exists, then run "
-                                    "clang++ -std=gnu++17 -fsyntax-only <file> for detailed syntax diagnostics."
-                                ),
-                                "confidence": 1.0,
-                            }
-                        ],
-                        "summary": {"error": 1, "warning": 0, "info": 0, "total": 1, "by_topic": {"runtime": 1}},
-                        "timing_ms": timing,
-                    }
-                )
-            continue
-
-        parse_ms = (time.perf_counter() - parse_start) * 1000.0
-
-        traversal_start = time.perf_counter()
-        nodes = []
-        walk_ast(translation_unit.cursor, nodes, target_file=target_file)
-        traversal_ms = (time.perf_counter() - traversal_start) * 1000.0
-
-        clang_items = _clang_items(translation_unit, target_file)
-        blocking_parse_errors = _has_blocking_parse_errors(clang_items)
-
-        interpretation_ms = 0.0
-        explanations = []
-        rule_items = []
-        if not blocking_parse_errors:
-            interpretation_start = time.perf_counter()
-            engine = build_engine(selected_groups)
-            explanations = engine.run(nodes)
-            interpretation_ms = (time.perf_counter() - interpretation_start) * 1000.0
-            rule_items = [_classify_rule_message(e) for e in explanations]
-
-        combined_items = list(clang_items) + list(rule_items)
-        if blocking_parse_errors:
-            error_lines = [item.get("line") for item in clang_items if item.get("severity") == "error"]
-            first_error_line = min((ln for ln in error_lines if isinstance(ln, int)), default=None)
-            combined_items.append(_limited_analysis_item(first_error_line))
-
-        items = _sort_items(combined_items)
-        timing = _timing_ms(parse_ms, traversal_ms, interpretation_ms)
-
-        if json_mode:
-            results.append(
-                {
-                    "file": display_name,
-                    "path": None if is_pasted else target_file,
-                    "is_pasted": is_pasted,
-                    "ok": True,
-                    "error": None,
-                    "explanations": explanations,
-                    "items": items,
-                    "summary": _summary(items),
-                    "timing_ms": timing,
-                    "rule_groups": selected_groups,
-                }
-            )
-            continue
-
-        if len(files) > 1:
-            print(f"=== {display_name} ===")
-
-        if explanations:
-            for explanation in explanations:
-                print(explanation)
-        elif blocking_parse_errors:
-            for item in items:
-                severity = item.get("severity")
-                if severity not in {"error", "warning"}:
-                    continue
-                if item.get("source") not in {"clang", "runtime"}:
-                    continue
-                prefix = "[ERROR]" if severity == "error" else "[WARN]"
-                line = item.get("line")
-                column = item.get("column")
-                location_parts = []
-                if isinstance(line, int):
-                    location_parts.append(f"line {line}")
-                if isinstance(column, int):
-                    location_parts.append(f"column {column}")
-                location = f" ({', '.join(location_parts)})" if location_parts else ""
-                print(f"{prefix} {item.get('message', '').strip()}{location}")
-
-        print(
-            f"[timing] parse: {timing['parse']} ms, traversal: {timing['traversal']} ms, "
-            f"interpretation: {timing['interpretation']} ms, total: {timing['total']} ms."
+        if summary_cache is not None:
+            cached = summary_cache.load(filename, selected_groups, settings["cache_options"])
+            if cached is not None:
+                result, symbol_summary = cached
+                result["cached"] = True
+                outcomes[idx] = {"status": "cached", "payload": {"result": result, "summary": symbol_summary}}
+                continue
+        jobs.append((idx, filename))
+
+    pool = None
+    if in_process:
+        finished = (
+            (idx, {"status": "done", "payload": _analyze_file(filename, settings=settings)})
+            for idx, filename in jobs
         )
+    else:
+        pool = WorkerPool(
+            functools.partial(_analyze_file, settings=settings),
+            size=min(jobs_count, len(jobs)),
+            timeout=limits["--timeout"],
+            memory_mb=limits["--memory-limit"],
+        )
+        finished = pool.run(jobs)
+
+    try:
+        for idx, filename in enumerate(files):
+            while outcomes[idx] is None:
+                done_idx, outcome = next(finished)
+                outcomes[done_idx] = outcome
+                worker_cpu_ms += outcome.get("cpu_ms", 0.0)
+            outcome = outcomes[idx]
+            outcomes[idx] = True
+            display_name = _display_name(filename)
+
+            if outcome["status"] in {"timed out", "crashed"}:
+                result = _supervision_failure(filename, outcome)
+                if json_mode:
+                    results.append(result)
+                else:
+                    _print_failure(result, len(files) > 1, idx == len(files) - 1)
+                continue
+
+            payload = outcome["payload"]
+            if "parse_error" in payload:
+                exc = payload["parse_error"]
+                timing = payload["timing"]
+
+                if len(files) > 1:
+                    print(f"=== {display_name} ===")
+                print(f"Failed to parse {display_name}: {exc}")
+                if not json_mode:
+                    print(
+                        f"[timing] parse: {timing['parse']} ms, traversal: 0.0 ms, "
+                        f"interpretation: 0.0 ms, total: {timing['total']} ms."
+                    )
+                if idx < len(files) - 1:
+                    print()
+
+                if json_mode:
+                    parse_message = f"Failed to parse {display_name}: {exc}"
+                    results.append(
+                        _failed_result(
+                            filename,
+                            parse_message,
+                            timing,
+                            "Check that the file exists, then run "
+                            "clang++ -std=gnu++17 -fsyntax-only <file> for detailed syntax diagnostics.",
+                        )
+                    )
+                continue
+
+            result = payload["result"]
+            if outcome["status"] != "cached":
+                analyzed_timings.append(result["timing_ms"])
+
+            if project_mode:
+                project_results.append((result, payload["summary"]))
+                if json_mode:
+                    results.append(result)
+                continue
 
-        if idx < len(files) - 1:
-            print()
-
+            if json_mode:
+                results.append(result)
+                continue
+
+            _print_text_result(result, len(files) > 1, idx == len(files) - 1)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if project_mode:
+        index = ProjectIndex([symbol_summary for _result, symbol_summary in project_results])
+        for result, symbol_summary in project_results:
+            if symbol_summary is not None:
+                _apply_project_revision(result, *index.revise(symbol_summary))
+        if not json_mode:
+            for i, (result, _symbol_summary) in enumerate(project_results):
+                _print_text_result(result, len(files) > 1, i == len(project_results) - 1)
+
+    # "total" is wall time; "cpu" adds this process's CPU time to the
+    # workers', so cpu / total shows how well --jobs parallelized.
+    timing = {
+        "total": _round_ms((time.perf_counter() - overall_start) * 1000.0),
+        "cpu": _round_ms((time.process_time() - cpu_start) * 1000.0 + worker_cpu_ms),
+        "jobs": 1 if pool is None else len(pool.workers),
+    }
     if json_mode:
-        total_ms = _round_ms((time.perf_counter() - overall_start) * 1000.0)
+        timing.update(_pch_totals(pch_cache, analyzed_timings))
         print(
             json.dumps(
                 {
                     "ok": True,
                     "results": results,
-                    "timing_ms": {"total": total_ms},
+                    "timing_ms": timing,
                     "rule_groups": selected_groups,
                 }
             )
         )
+    else:
+        _print_pch_totals(pch_cache, analyzed_timings)
+        if timing["jobs"] > 1:
+            print(f"[timing] wall: {timing['total']} ms, cpu: {timing['cpu']} ms, jobs: {timing['jobs']}.")
 
 
 if __name__ == "__main__":
+    # Frozen builds (PyInstaller) start workers by re-running this
+    # executable; let those runs become workers instead of a new batch.
+    multiprocessing.freeze_support()
     main()
@@ -12,7 +12,7 @@ VENV_PY = ROOT / ".venv" / "bin" / "python"
 PYTHON = VENV_PY if VENV_PY.exists() else Path("python3")
 
 
-def run_engine(code, filename="fixture.cpp", groups=None):
+def run_engine(code, filename="fixture.cpp", groups=None, extra_args=()):
     with tempfile.TemporaryDirectory() as td:
         src = Path(td) / filename
         src.write_text(textwrap.dedent(code), encoding="utf-8")
@@ -20,6 +20,7 @@ def run_engine(code, filename="fixture.cpp", groups=None):
         cmd = [str(PYTHON), str(ENGINE)]
         if groups is not None:
             cmd.extend(["--groups", ",".join(groups)])
+        cmd.extend(extra_args)
         cmd.append(str(src))
 
         proc = subprocess.run(
@@ -43,6 +44,27 @@ def run_engine(code, filename="fixture.cpp", groups=None):
         return payload, results[0]
 
 
+def run_project(sources, extra_args=()):
+    """
+    Run the engine once over several files with --project; `sources` maps
+    file names to code. Returns {file name: result}.
+    """
+    with tempfile.TemporaryDirectory() as td:
+        paths = []
+        for filename, code in sources.items():
+            src = Path(td) / filename
+            src.write_text(textwrap.dedent(code), encoding="utf-8")
+            paths.append(str(src))
+
+        cmd = [str(PYTHON), str(ENGINE), "--project", *extra_args, *paths]
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=False)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Engine failed:\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")
+
+        payload = json.loads(proc.stdout)
+        return {result["file"]: result for result in payload.get("results", [])}
+
+
 class RegressionRulesTest(unittest.TestCase):
     def test_void_function_does_not_trigger_missing_return(self):
         _payload, result = run_engine(
@@ -92,6 +114,482 @@ class RegressionRulesTest(unittest.TestCase):
             "Expected contradictory condition warning",
         )
 
+    def test_contradictory_condition_normalizes_mixed_chains(self):
+        _payload, result = run_engine(
+            """
+            int main(int argc, char **argv) {
+                int x = argc;
+                if (argc > 1 && 5 > x && !(x < 7)) {
+                    return 1;
+                }
+                if ((x == 1 || x == 2) && x > 2) {
+                    return 2;
+                }
+                if (x < 5 || x >= 5) {
+                    return 3;
+                }
+                if (x > 1 && x < 10) {
+                    return 4;
+                }
+                return 0;
+            }
+            """,
+            groups=["conditionals"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Contradictory condition on line 4 for 'x'" in msg for msg in messages))
+        self.assertTrue(any("Contradictory condition on line 7 for 'x'" in msg for msg in messages))
+        self.assertTrue(any("Tautological condition on line 10 for 'x'" in msg for msg in messages))
+        self.assertFalse(any("on line 13 for 'x'" in msg for msg in messages))
+
+    def test_constant_folding_is_shared_across_rules(self):
+        _payload, result = run_engine(
+            """
+            enum Mode { OFF, ON = 4 };
+            constexpr int STEP = 2;
+
+            int main(int argc, char **argv) {
+                int total = argc / (STEP - 2);
+                if (ON * STEP == 8 && sizeof(char) == 1) {
+                    total++;
+                } else if (argc > 3) {
+                    total--;
+                }
+                return total;
+            }
+            """,
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Possible division by zero on line 6" in msg for msg in messages))
+        self.assertTrue(any("Condition in if-statement on line 7 is always true" in msg for msg in messages))
+        self.assertTrue(any("Else-if branch on line 9 is unreachable" in msg for msg in messages))
+
+    def test_oversized_shifts_are_not_folded(self):
+        _payload, result = run_engine(
+            """
+            int main() {
+                if (1 << 3000000000u) {
+                    return 1;
+                }
+                if (1 << 3) {
+                    return 2;
+                }
+                return 0;
+            }
+            """,
+        )
+
+        always = [item["message"] for item in result["items"] if "is always" in item.get("message", "")]
+        self.assertEqual(always, ["Condition in if-statement on line 6 is always true."])
+
+    def test_narrowing_casts_wrap_to_the_target_width(self):
+        _payload, result = run_engine(
+            """
+            int main() {
+                if ((unsigned char)300 == 44) {
+                    return 1;
+                }
+                if ((signed char)200 == -56) {
+                    return 2;
+                }
+                if (static_cast<short>(70000) == 70000) {
+                    return 3;
+                }
+                return 0;
+            }
+            """,
+        )
+
+        always = [item["message"] for item in result["items"] if "is always" in item.get("message", "")]
+        self.assertEqual(
+            always,
+            [
+                "Condition in if-statement on line 3 is always true.",
+                "Condition in if-statement on line 6 is always true.",
+                "Condition in if-statement on line 9 is always false.",
+            ],
+        )
+
+    def test_macro_configured_conditions_are_not_constant_warnings(self):
+        _payload, result = run_engine(
+            """
+            #define DEBUG 1
+            #define ENABLED 0
+
+            int main() {
+                if (DEBUG) {
+                    return 1;
+                }
+                while (ENABLED) {
+                    return 2;
+                }
+                if (1) {
+                    return 3;
+                }
+                return 0;
+            }
+            """,
+        )
+
+        always = [item["message"] for item in result["items"] if "is always" in item.get("message", "")]
+        self.assertEqual(always, ["Condition in if-statement on line 12 is always true."])
+
+    def test_structural_hash_matches_mirrored_and_commuted_expressions(self):
+        _payload, result = run_engine(
+            """
+            int main(int argc, char **argv) {
+                int x = argc;
+                int y = 2;
+                int i = 0;
+                if (x > y) {
+                    return 1;
+                } else if ((y < x)) {
+                    return 2;
+                }
+                if ((x + y) <= (y + x)) {
+                    return 3;
+                }
+                if (i++ == i++) {
+                    return 4;
+                }
+                return 0;
+            }
+            """,
+            groups=["conditionals"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Else-if condition on line 8 duplicates an earlier condition from line 6" in msg for msg in messages))
+        self.assertTrue(any("Self-comparison on line 11" in msg for msg in messages))
+        self.assertFalse(any("Self-comparison on line 14" in msg for msg in messages))
+
+    def test_division_by_zero_follows_local_constants(self):
+        _payload, result = run_engine(
+            """
+            int main(int argc, char **argv) {
+                int d = 0;
+                int total = argc / d;
+                int step = 0;
+                for (int i = 0; i < argc; i++) {
+                    total += argc / step;
+                    step = i;
+                }
+                int rest = 3;
+                if (argc > 1) {
+                    rest = 0;
+                }
+                rest -= 3;
+                return total % rest;
+            }
+            """,
+            groups=["safety"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Possible division by zero on line 4" in msg for msg in messages))
+        self.assertFalse(any("Possible division by zero on line 7" in msg for msg in messages))
+        self.assertFalse(any("Possible division by zero on line 15" in msg for msg in messages))
+
+    def test_shadowing_uses_enclosing_scopes_within_the_function(self):
+        _payload, result = run_engine(
+            """
+            int total = 0;
+
+            int sum(int n) {
+                int acc = 0;
+                for (int i = 0; i < n; i++) {
+                    for (int i = 0; i < 2; i++) {
+                        int n = i;
+                        acc += n;
+                    }
+                    { int acc = i; total += acc; }
+                }
+                int total = acc;
+                return total;
+            }
+
+            int main() {
+                return sum(3);
+            }
+            """,
+            groups=["safety"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Variable 'i' on line 7 shadows an outer declaration from line 6" in msg for msg in messages))
+        self.assertTrue(any("Variable 'n' on line 8 shadows an outer declaration from line 4" in msg for msg in messages))
+        self.assertTrue(any("Variable 'acc' on line 11 shadows an outer declaration from line 5" in msg for msg in messages))
+        self.assertFalse(any("Variable 'total'" in msg for msg in messages))
+
+    def test_long_conditions_are_described_with_a_bounded_ellipsis(self):
+        terms = " && ".join(f"x != {j}" for j in range(2000))
+        _payload, result = run_engine(
+            f"""
+            int main(int argc, char **argv) {{
+                int x = argc;
+                if ({terms}) {{
+                    return 1;
+                }}
+                while (x > 0 && x != 7) {{
+                    x--;
+                }}
+                return 0;
+            }}
+            """,
+            groups=["conditionals", "loops"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        long_if = [msg for msg in messages if msg.startswith("This is an if-statement on line 4 checking whether")]
+        self.assertEqual(len(long_if), 1)
+        self.assertIn("x is not equal to 1960", long_if[0])
+        self.assertTrue(long_if[0].endswith("...."))
+        self.assertLess(len(long_if[0]), 400)
+        self.assertTrue(any("continues while x is greater than 0 and x is not equal to 7" in msg for msg in messages))
+
+    def test_assignment_in_condition_reads_resolved_operators(self):
+        _payload, result = run_engine(
+            """
+            struct Point {
+                int x;
+                bool operator==(const Point &other) const { return x == other.x; }
+            };
+
+            int main(int argc, char **argv) {
+                Point a{argc};
+                Point b{2};
+                int x = 0;
+                if (x = argc) {
+                    return 1;
+                }
+                if ((x = argc) != 0) {
+                    return 2;
+                }
+                if (a == b) {
+                    return 3;
+                }
+                return 0;
+            }
+            """,
+            groups=["conditionals"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Possible assignment used as condition on line 11" in msg for msg in messages))
+        self.assertFalse(any("Possible assignment used as condition on line 14" in msg for msg in messages))
+        self.assertFalse(any("Possible assignment used as condition on line 17" in msg for msg in messages))
+
+    def test_parentheses_and_implicit_casts_are_collapsed(self):
+        _payload, result = run_engine(
+            """
+            int main(int argc, char **argv) {
+                long x = argc;
+                if ((((x)) < 5) && (x > (10))) {
+                    return 1;
+                }
+                while (!((x >= 0)) && ((x)) > 2) {
+                    x--;
+                }
+                return 0;
+            }
+            """,
+            groups=["conditionals", "loops"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("checking whether x is less than 5 and x is greater than 10." in msg for msg in messages))
+        self.assertTrue(any("Contradictory condition on line 4 for 'x'" in msg for msg in messages))
+        self.assertTrue(any("Contradictory condition on line 7 for 'x'" in msg for msg in messages))
+
+    def test_long_else_if_chain_is_checked_once_per_chain(self):
+        branches = ["if (x == 0) {", "    return 0;"]
+        for i in range(1, 600):
+            branches += [f"}} else if (x == {i}) {{", f"    return {i};"]
+        branches += ["} else if (x == 7) {", "    return 7;", "} else {", "    return -1;", "}"]
+        body = "\n".join("                " + line for line in branches)
+        _payload, result = run_engine(
+            f"""
+            int pick(int x) {{
+{body}
+            }}
+
+            int main(int argc, char **argv) {{
+                return pick(argc);
+            }}
+            """,
+            groups=["conditionals", "functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        duplicates = [msg for msg in messages if "duplicates an earlier condition" in msg]
+        self.assertEqual(len(duplicates), 1)
+        self.assertIn("Else-if condition on line 1203 duplicates an earlier condition from line 17", duplicates[0])
+        self.assertFalse(any("may exit without returning" in msg for msg in messages))
+
+    def test_switch_on_enum_reports_missing_enumerators(self):
+        states = [f"S{i}" for i in range(1500)]
+        cases = []
+        for name in states[:-3]:
+            cases += [f"case {name}:", "    return 1;"]
+        body = "\n".join("                    " + line for line in cases)
+        _payload, result = run_engine(
+            f"""
+            enum State {{ {", ".join(states)} }};
+            enum class Light {{ Red, Amber, Green }};
+
+            int step(State s) {{
+                switch (s) {{
+{body}
+                }}
+                return 0;
+            }}
+
+            int show(Light light, int x) {{
+                switch (light) {{
+                    case Light::Red: x++;
+                    case Light::Amber: case Light::Green: return x ? 1 : 2;
+                }}
+                switch (x) {{
+                    case 1:
+                        switch (x + 1) {{ default: break; }}
+                        return 1;
+                }}
+                return x;
+            }}
+            """,
+            groups=["safety"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertIn(
+            "Switch statement on line 6 over s has no default case and does not handle "
+            "3 enumerators: S1497, S1498, S1499.",
+            messages,
+        )
+        self.assertFalse(any("over light" in msg for msg in messages))
+        self.assertIn("Switch case 'Light :: Red' on line 3007 may fall through to the next case.", messages)
+        # A nested switch's default does not count for the outer switch.
+        self.assertIn("Switch statement on line 3010 over x has no default case.", messages)
+
+    def test_class_fields_are_keyed_by_usr_and_constructor_cursors(self):
+        _payload, result = run_engine(
+            """
+            namespace geo {
+            struct Point {
+                int x;
+                int y;
+                Point();
+                int sum() const { return x + y; }
+            };
+            }
+
+            namespace ui {
+            struct Point {
+                int x;
+                int y = 0;
+                int z;
+                Point(const Point &) = delete;
+                Point(int v) : x(v) { this->z = v; }
+                int sum() const { return x + y + z; }
+            };
+            }
+
+            geo::Point::Point() : x(0) {
+                ++y;
+            }
+
+            int main() {
+                return geo::Point().sum() + ui::Point(1).sum();
+            }
+            """,
+            groups=["classes"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertFalse(any("may be uninitialized" in msg for msg in messages), messages)
+        self.assertFalse(any("is never used" in msg for msg in messages), messages)
+
+    def test_macro_expanded_code_is_summarized(self):
+        _payload, result = run_engine(
+            """
+            #define LIMIT 10
+            #define CHECK(c) if (!(c)) return -1
+            #define SWAP(a, b) do { int t_ = (a); (a) = (b); (b) = t_; } while (0)
+
+            int main(int argc, char **argv) {
+                int x = argc;
+                int y = 2;
+                CHECK(x > LIMIT);
+                SWAP(x, y);
+                if (y > LIMIT) {
+                    return 1;
+                }
+                return x;
+            }
+            """,
+            groups=["conditionals", "loops"],
+        )
+
+        explanations = result.get("explanations", [])
+        self.assertIn("This is an if-statement on line 9 expanded from CHECK(x > LIMIT).", explanations)
+        self.assertIn("This is a do-while loop on line 10 expanded from SWAP(x, y).", explanations)
+        self.assertIn("This is an if-statement on line 11 checking whether y is greater than LIMIT.", explanations)
+        self.assertFalse(any("always false" in text for text in explanations), explanations)
+
+    def test_macro_left_operand_keeps_written_operator(self):
+        _payload, result = run_engine(
+            """
+            #define LIMIT 10
+            #define N 100
+
+            int check(int x) {
+                int z = 0;
+                if (LIMIT < x && LIMIT > x) {
+                    return 1;
+                }
+                if (x > 3) {
+                    return N / z;
+                }
+                return N / 0;
+            }
+            """,
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertIn("Contradictory condition on line 7 for 'x' is always false.", messages)
+        self.assertIn("Possible division by zero on line 11.", messages)
+        self.assertIn("Possible division by zero on line 13.", messages)
+        self.assertIn(
+            "This is an if-statement on line 7 checking whether LIMIT is less than x and LIMIT is greater than x.",
+            result["explanations"],
+        )
+
+    def test_large_literal_tables_are_collapsed(self):
+        values = ", ".join(str(i * 37 % 1000 - 500) for i in range(5000))
+        _payload, result = run_engine(
+            f"""
+            #include <iostream>
+            using namespace std;
+
+            static const int table[] = {{ {values} }};
+            static const char *names[] = {{"a", "b"}};
+
+            int main(int argc, char **argv) {{
+                int unused = 0;
+                cout << names[argc % 2] << table[argc] << endl;
+                return 0;
+            }}
+            """,
+            groups=["functions", "io"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertIn("Variable 'table' is declared on line 5.", messages)
+        self.assertIn("Variable 'unused' declared at line 9 is never used.", messages)
+        self.assertIn("This outputs names to standard output on line 10.", messages)
+
     def test_iostream_is_reported_once(self):
         _payload, result = run_engine(
             """
@@ -149,6 +647,32 @@ class RegressionRulesTest(unittest.TestCase):
         self.assertIsInstance(top_timing["total"], (int, float))
         self.assertGreaterEqual(top_timing["total"], 0)
 
+    def test_iostream_context_is_reported_per_branch(self):
+        _payload, result = run_engine(
+            """
+            #include <iostream>
+            using namespace std;
+
+            int main(int argc, char **argv) {
+                if (argc > 1) {
+                    cout << "first";
+                    cout << "second";
+                } else {
+                    cout << "third";
+                }
+                return 0;
+            }
+            """,
+            groups=["io"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        inside_then = [msg for msg in messages if msg.startswith("Inside an if-statement that checks whether argc")]
+        inside_else = [msg for msg in messages if msg.startswith("Inside the else-branch")]
+        self.assertEqual(len(inside_then), 2, messages)
+        self.assertEqual(len(inside_else), 1, messages)
+        self.assertIn('"third"', inside_else[0])
+
     def test_function_declared_and_called_but_not_defined(self):
         _payload, result = run_engine(
             """
@@ -200,6 +724,211 @@ class RegressionRulesTest(unittest.TestCase):
             "Expected uninitialized local variable warning",
         )
 
+    def test_uninitialized_local_follows_branches_and_loops(self):
+        _payload, result = run_engine(
+            """
+            int main(int argc, char **argv) {
+                int partial;
+                int both;
+                int looped;
+                if (argc > 1) {
+                    partial = 1;
+                    both = 1;
+                } else {
+                    both = 2;
+                }
+                for (int i = 0; i < argc; i++) {
+                    looped = i;
+                }
+                looped = 0;
+                return partial + both + looped;
+            }
+            """,
+            groups=["functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(
+            any("'partial' is used on line 16" in msg and "before it is initialized" in msg for msg in messages),
+            "Expected a warning for a local assigned on only one branch",
+        )
+        self.assertFalse(any("Local variable 'both'" in msg for msg in messages))
+        self.assertFalse(any("Local variable 'looped'" in msg for msg in messages))
+
+    def test_lambda_capture_by_reference_initializes_local(self):
+        _payload, result = run_engine(
+            """
+            int main() {
+                int captured;
+                auto set = [&] { captured = 1; };
+                set();
+                int plain;
+                return captured + plain;
+            }
+            """,
+            groups=["functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertFalse(any("'captured'" in msg and "before it is initialized" in msg for msg in messages), messages)
+        self.assertTrue(any("'plain' is used on line 7" in msg and "before it is initialized" in msg for msg in messages))
+
+    def test_unused_checks_key_on_declaration_not_name(self):
+        _payload, result = run_engine(
+            """
+            int helper(int x);
+
+            int helper(int value) {
+                return value;
+            }
+
+            int main() {
+                int count = helper(1);
+                {
+                    int count = 2;
+                }
+                return count;
+            }
+            """,
+            groups=["functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(
+            any("Variable 'count' declared at line 11 is never used" in msg for msg in messages),
+            "Inner 'count' should be reported even though an outer 'count' is used",
+        )
+        self.assertFalse(any("Variable 'count' declared at line 9" in msg for msg in messages))
+        self.assertFalse(
+            any("Parameter 'x'" in msg for msg in messages),
+            "Prototype parameters should not be reported as unused",
+        )
+
+    def test_unused_function_ignores_its_own_declaration(self):
+        _payload, result = run_engine(
+            """
+            #define RUN_STEP() step()
+
+            int step() { return 1; }
+            int orphan(int x) { return x; }
+
+            int main() {
+                return RUN_STEP();
+            }
+            """,
+            groups=["functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("Function 'orphan' declared on line 5 is never called" in msg for msg in messages))
+        self.assertFalse(
+            any("Function 'step'" in msg for msg in messages),
+            "Calls written inside a macro body should still count",
+        )
+
+    def test_unused_function_follows_call_graph_from_main(self):
+        _payload, result = run_engine(
+            """
+            int leaf(int x) { return x * 2; }
+            int dead(int x) { return leaf(x) + 1; }
+            int pick(int x) { return x; }
+            int pick(double x) { return (int)x; }
+            int by_pointer(int x) { return x; }
+            int from_lambda(int x) { return x - 1; }
+
+            int main(int argc, char **argv) {
+                int (*fp)(int) = &by_pointer;
+                auto f = [](int v) { return from_lambda(v); };
+                return pick(argc) + fp(argc) + f(argc);
+            }
+            """,
+            groups=["functions"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertIn(
+            "Function 'leaf' declared on line 2 is only called from functions that are never called.", messages
+        )
+        leaf = next(item for item in result["items"] if "Function 'leaf'" in item.get("message", ""))
+        self.assertEqual(leaf["topic"], "functions")
+        self.assertTrue(any("Function 'dead' declared on line 3 is never called." in msg for msg in messages))
+        self.assertTrue(any("Function 'pick' declared on line 5 is never called." in msg for msg in messages))
+        self.assertFalse(any("line 4 is never called" in msg for msg in messages))
+        self.assertFalse(any("by_pointer' declared" in msg or "from_lambda' declared" in msg for msg in messages))
+
+    def test_project_mode_merges_symbols_across_files(self):
+        results = run_project(
+            {
+                "util.cpp": """
+                int square(int x) { return x * x; }
+                int cube(int x) { return x * square(x); }
+                """,
+                "main.cpp": """
+                int square(int x);
+
+                int main(int argc, char **argv) {
+                    return square(argc);
+                }
+                """,
+            },
+            extra_args=["--groups", "functions"],
+        )
+
+        util = [item.get("message", "") for item in results["util.cpp"].get("items", [])]
+        main = [item.get("message", "") for item in results["main.cpp"].get("items", [])]
+        self.assertTrue(any("Function 'cube' declared on line 3 is never called" in msg for msg in util))
+        self.assertFalse(any("Function 'square'" in msg and "never called" in msg for msg in util))
+        self.assertFalse(any("not defined in this file" in msg for msg in main))
+
+    def test_summary_cache_keys_on_output_options(self):
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "main.cpp"
+            src.write_text("int helper() { return 1; }\nint main() { return helper(); }\n", encoding="utf-8")
+            cache_dir = str(Path(td) / "cache")
+
+            def run(*extra):
+                cmd = [str(PYTHON), str(ENGINE), "--summary-cache", cache_dir, *extra, str(src)]
+                proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True)
+                return json.loads(proc.stdout)["results"][0]
+
+            plain = run()
+            cached = run()
+            with_graph = run("--call-graph")
+
+        self.assertNotIn("call_graph", plain)
+        self.assertTrue(cached.get("cached"))
+        self.assertFalse(with_graph.get("cached"))
+        self.assertIn("call_graph", with_graph)
+
+    def test_loop_update_uses_write_summaries(self):
+        _payload, result = run_engine(
+            """
+            void fill(int &x) { x = 1; }
+
+            int main() {
+                int n = 5;
+                int i = 0;
+                while (i < n) {
+                    i++;
+                }
+                int j = 0;
+                while (j < 3) {
+                    fill(j);
+                }
+                int k = 0;
+                while (k < n) {
+                }
+                return 0;
+            }
+            """,
+            groups=["loops"],
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        updates = [msg for msg in messages if "may not update" in msg]
+        self.assertEqual(len(updates), 1, updates)
+        self.assertIn("Loop on line 15 may not update condition variable 'k'", updates[0])
+
     def test_unreachable_else_if_after_true_branch(self):
         _payload, result = run_engine(
             """
@@ -245,6 +974,57 @@ class RegressionRulesTest(unittest.TestCase):
             "Side-effecting conditions should not be flagged as duplicate branches",
         )
 
+    def test_duplicate_condition_with_macro_constant_is_flagged(self):
+        _payload, result = run_engine(
+            """
+            #define LIMIT 10
+
+            int classify(int x) {
+                if (x > LIMIT) {
+                    return 1;
+                } else if (x > LIMIT) {
+                    return 2;
+                } else if (x > 11) {
+                    return 3;
+                }
+                return 0;
+            }
+            """
+        )
+
+        duplicates = [
+            item.get("message", "")
+            for item in result.get("items", [])
+            if "duplicates an earlier condition" in item.get("message", "")
+        ]
+        self.assertEqual(duplicates, ["Else-if condition on line 7 duplicates an earlier condition from line 5."])
+
+    def test_different_macro_operators_are_not_duplicates(self):
+        _payload, result = run_engine(
+            """
+            #define LIMIT 10
+            #define ADD(a, b) ((a) + (b))
+            #define SUB(a, b) ((a) - (b))
+
+            int classify(int x, int y) {
+                if (ADD(x, y) == 3) {
+                    return 1;
+                } else if (SUB(x, y) == 3) {
+                    return 2;
+                }
+                if (LIMIT < x) {
+                    return 3;
+                } else if (LIMIT > x) {
+                    return 4;
+                }
+                return 0;
+            }
+            """
+        )
+
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertFalse(any("duplicates an earlier condition" in msg for msg in messages), messages)
+
     def test_parse_errors_have_actionable_hints_and_limit_rule_checks(self):
         _payload, result = run_engine(
             """
@@ -304,6 +1084,195 @@ class RegressionRulesTest(unittest.TestCase):
         self.assertTrue(any("while-loop" in msg for msg in messages))
         self.assertFalse(any("if-statement" in msg for msg in messages))
 
+    def test_group_pruning_keeps_loops_and_member_uses(self):
+        code = """
+            #define REPEAT(n) for (int r = 0; r < (n); ++r)
+
+            struct Counter {
+                int hits;
+                int misses;
+                Counter() : hits(0), misses(0) {}
+                void bump() { hits++; }
+            };
+
+            int scale(int a, int b) {
+                return a * b + 3;
+            }
+
+            int main(int argc, char **argv) {
+                Counter c;
+                REPEAT(argc) { c.bump(); }
+                return scale(argc, 2);
+            }
+            """
+
+        _payload, result = run_engine(code, groups=["loops"])
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertTrue(any("for-loop on line 17 expanded from REPEAT(argc)" in msg for msg in messages), messages)
+
+        _payload, result = run_engine(code, groups=["classes"])
+        messages = [item.get("message", "") for item in result.get("items", [])]
+        self.assertIn("Field 'misses' in class 'Counter' declared at line 6 is never used.", messages)
+        self.assertFalse(any("'hits'" in msg for msg in messages), messages)
+
+    def test_outline_lists_declarations_without_bodies(self):
+        _payload, result = run_engine(
+            """
+            int helper(int value);
+            extern int shared(int value);
+
+            class Account {
+            public:
+                int balance = 0;
+                int owner;
+                Account() : owner(1) {}
+                void deposit(int amount);
+            };
+
+            void Account::deposit(int amount) {
+                balance += helper(amount);
+            }
+
+            int main() {
+                Account account;
+                account.deposit(shared(5));
+                return 0;
+            }
+            """,
+            extra_args=["--outline"],
+        )
+
+        symbols = {(s["kind"], s.get("class"), s["name"]): s for s in result["symbols"]}
+        self.assertEqual(symbols[("function", None, "helper")]["definition"], None)
+        self.assertEqual(symbols[("method", "Account", "deposit")]["line"], 10)
+        self.assertEqual(symbols[("method", "Account", "deposit")]["definition"], 13)
+        self.assertEqual(symbols[("constructor", "Account", "Account")]["definition"], 9)
+        self.assertTrue(symbols[("field", "Account", "balance")]["initializer"])
+        self.assertFalse(symbols[("field", "Account", "owner")]["initializer"])
+        self.assertEqual(result["undefined"], [{"name": "helper", "line": 2}])
+
+    def test_pch_cache_keeps_results(self):
+        code = """
+            #include <iostream>
+            #include <vector>
+
+            int main() {
+                std::vector<int> values{1, 2, 3};
+                for (int i = 0; i < 3; i++) {
+                    std::cout << values[i];
+                }
+                return 0;
+            }
+            """
+        _payload, expected = run_engine(code)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first_payload, first = run_engine(code, extra_args=["--pch-cache", cache_dir])
+            second_payload, second = run_engine(code, extra_args=["--pch-cache", cache_dir])
+
+        for result in (first, second):
+            self.assertEqual(result["explanations"], expected["explanations"])
+            self.assertEqual(result["items"], expected["items"])
+        self.assertEqual(first["timing_ms"]["pch"], "miss")
+        self.assertEqual(first_payload["timing_ms"]["pch_misses"], 1)
+        # Headers that do not precompile cleanly here are never reused.
+        second_timing = second_payload["timing_ms"]
+        self.assertEqual(second_timing["pch_hits"] + second_timing["pch_misses"], 1)
+        self.assertIn(second["timing_ms"]["pch"], {"hit", "miss"})
+
+    def test_timed_out_file_gets_structured_result(self):
+        code = """
+            #include <iostream>
+
+            int main() {
+                std::cout << "hi";
+                return 0;
+            }
+            """
+        _payload, result = run_engine(code, extra_args=["--timeout", "0.001"])
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["status"], "timed out")
+        self.assertEqual(result["stage"], "parse")
+        self.assertEqual(result["items"][0]["source"], "runtime")
+        self.assertIn("timed out during parse", result["error"])
+        self.assertGreater(result["timing_ms"]["parse"], 0.0)
+        self.assertEqual(result["timing_ms"]["interpretation"], 0.0)
+
+        _payload, in_process = run_engine(code, extra_args=["--in-process", "--timeout", "0.001"])
+        self.assertTrue(in_process["ok"])
+
+    def test_worker_limits_reject_invalid_values(self):
+        for flag, value in [("--timeout", "nan"), ("--timeout", "-1"), ("--memory-limit", "0.5")]:
+            with self.assertRaisesRegex(RuntimeError, flag):
+                run_engine("int main() { return 0; }\n", extra_args=[flag, value])
+
+    def test_workers_start_with_spawn_method(self):
+        # macOS/Windows (and the frozen app) start workers by spawning a
+        # fresh interpreter that re-imports test_engine.
+        driver = (
+            "import multiprocessing, runpy, sys\n"
+            f"sys.path.insert(0, {str(ROOT)!r})\n"
+            "multiprocessing.set_start_method('spawn')\n"
+            "sys.argv = sys.argv[1:]\n"
+            f"runpy.run_path({str(ENGINE)!r}, run_name='__main__')\n"
+        )
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "fixture.cpp"
+            src.write_text("int main() {\n    int unused = 0;\n    return 0;\n}\n", encoding="utf-8")
+            proc = subprocess.run(
+                [str(PYTHON), "-c", driver, str(ENGINE), str(src), str(src)],
+                cwd=td,
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=120,
+            )
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        payload = json.loads(proc.stdout)
+        self.assertEqual(len(payload["results"]), 2)
+        for result in payload["results"]:
+            self.assertTrue(result["ok"])
+            self.assertIn("Variable 'unused' is declared on line 2.", result["explanations"])
+
+    def test_jobs_keep_input_order_and_results(self):
+        sources = {
+            "slow.cpp": """
+                #include <iostream>
+                #include <vector>
+
+                int main() {
+                    std::vector<int> values;
+                    for (int i = 0; i < 3; i++) {
+                        values.push_back(i);
+                    }
+                    std::cout << values.size();
+                    return 0;
+                }
+                """,
+            "fast.cpp": """
+                int twice(int x) { return x * 2; }
+                """,
+            "last.cpp": """
+                int main() {
+                    int unused = 0;
+                    return 0;
+                }
+                """,
+        }
+        serial = run_project(sources)
+        parallel = run_project(sources, extra_args=["--jobs", "3"])
+
+        self.assertEqual(list(parallel), ["slow.cpp", "fast.cpp", "last.cpp"])
+        for name, result in serial.items():
+            self.assertEqual(parallel[name]["explanations"], result["explanations"])
+            self.assertEqual(parallel[name]["items"], result["items"])
+            self.assertIn("parse", parallel[name]["timing_ms"])
+
+        payload, _result = run_engine(sources["fast.cpp"], extra_args=["--jobs", "2"])
+        self.assertEqual(payload["timing_ms"]["jobs"], 1)
+        self.assertGreater(payload["timing_ms"]["cpu"], 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
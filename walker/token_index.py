@@ -0,0 +1,120 @@
+from bisect import bisect_left
+
+from clang.cindex import CursorKind, SourceLocation, SourceRange, TokenKind
+
+from symbol_index import FUNCTION_KINDS
+
+
+def file_tokens(nodes):
+    """
+    The main file's tokens as (spelling, is_identifier, line, column, offset)
+    tuples, read once from the translation unit. The insides of collapsed
+    literal tables (see ast_walker.LITERAL_TABLE_THRESHOLD) hold only
+    literals and punctuation and are skipped.
+    """
+    root = next((n for n in nodes if n.get("kind") == CursorKind.TRANSLATION_UNIT), None)
+    cursor = root.get("cursor") if root is not None else None
+    if cursor is None:
+        return []
+
+    skipped = sorted(
+        node["literals"]["extent"]
+        for node in nodes
+        if node.get("literals") is not None and node.get("file") == cursor.spelling
+    )
+    if not skipped:
+        return _tokens_in(cursor.get_tokens())
+
+    tu = cursor.translation_unit
+    main_file = tu.get_file(cursor.spelling)
+    out = []
+    start = 0
+    for table_start, table_end in skipped + [(None, None)]:
+        end = table_start if table_start is not None else cursor.extent.end.offset
+        if start < end:
+            extent = SourceRange.from_locations(
+                SourceLocation.from_offset(tu, main_file, start),
+                SourceLocation.from_offset(tu, main_file, end),
+            )
+            out.extend(token for token in _tokens_in(tu.get_tokens(extent=extent)) if start <= token[4] < end)
+        if table_end is not None:
+            # The table's braces are kept so bracket matching still works.
+            out.append(("{", False) + _position(tu, main_file, table_start))
+            out.append(("}", False) + _position(tu, main_file, table_end - 1))
+            start = table_end
+    return out
+
+
+def _tokens_in(tokens):
+    out = []
+    for token in tokens:
+        location = token.location
+        out.append((
+            token.spelling,
+            token.kind == TokenKind.IDENTIFIER,
+            location.line,
+            location.column,
+            location.offset,
+        ))
+    return out
+
+
+def _position(tu, main_file, offset):
+    location = SourceLocation.from_offset(tu, main_file, offset)
+    return location.line, location.column, offset
+
+
+def node_offsets(node):
+    """
+    (start, end) file offsets of a node's extent, or None.
+    """
+    cursor = node.get("cursor")
+    if cursor is None:
+        return None
+    try:
+        extent = cursor.extent
+        return extent.start.offset, extent.end.offset
+    except Exception:
+        return None
+
+
+def has_offset_between(offsets, start, end):
+    """
+    True if the sorted list `offsets` has a value in [start, end).
+    """
+    i = bisect_left(offsets, start)
+    return i < len(offsets) and offsets[i] < end
+
+
+class CallTokenIndex:
+    """
+    Inverted index of identifiers that are immediately followed by "(".
+
+    Built from one pass over the file's token stream, so a textual call
+    lookup is a dict hit. Function declaration names are skipped: a
+    declaration `int foo(...)` is not a call to `foo`.
+    """
+
+    def __init__(self, nodes, tokens):
+        self.positions = {}
+        self._build(nodes, tokens)
+
+    def _build(self, nodes, tokens):
+        declared = set()
+        for node in nodes:
+            if node.get("kind") not in FUNCTION_KINDS:
+                continue
+            location = node["cursor"].location
+            declared.add((location.line, location.column))
+
+        prev = None
+        for token in tokens:
+            spelling, is_identifier, line, column, _offset = token
+            if spelling == "(" and prev is not None:
+                position = (prev[2], prev[3])
+                if position not in declared:
+                    self.positions.setdefault(prev[0], []).append(position)
+            prev = token if is_identifier else None
+
+    def is_called(self, name):
+        return name in self.positions
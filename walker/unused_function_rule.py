@@ -3,21 +3,25 @@ from clang.cindex import CursorKind
 from base_rule import BaseRule
 
 
+def unused_function_message(name, line, only_dead_callers=False):
+    verdict = "is only called from functions that are never called" if only_dead_callers else "is never called"
+    if line:
+        return f"[WARN] Function '{name}' declared on line {line} {verdict}."
+    return f"[WARN] Function '{name}' {verdict}."
+
+
 class UnusedFunctionRule(BaseRule):
     """
-    Warns when a user-defined free function is never called.
+    Warns when a user-defined free function is never called, either
+    directly or because every caller is itself unreachable from `main`.
     """
 
     def __init__(self):
         self.functions = {}
-        self.called = set()
-        self.non_decl_tokens = []
-
-    def _tokens(self, node):
-        cursor = node.get("cursor")
-        if cursor is None:
-            return []
-        return [t.spelling for t in cursor.get_tokens()]
+        # usr -> True when the name also appears in calls libclang could not resolve.
+        self.textual_calls = {}
+        # (usr, message) for every warning, so a batch run can revise them.
+        self.reported = []
 
     def _has_body(self, node):
         for child in node.get("children", []):
@@ -26,45 +30,38 @@ class UnusedFunctionRule(BaseRule):
         return False
 
     def matches(self, node):
-        kind = node.get("kind")
-
-        if kind == CursorKind.FUNCTION_DECL:
-            name = node.get("name")
-            if not name or name == "main":
-                return False
-            if self._has_body(node):
-                self.functions[name] = node.get("line")
+        if node.get("kind") != CursorKind.FUNCTION_DECL:
             return False
 
-        tokens = self._tokens(node)
-        if tokens:
-            self.non_decl_tokens.append(tokens)
-
-        if kind == CursorKind.CALL_EXPR:
-            name = node.get("name")
-            if name:
-                self.called.add(name)
-
+        name = node.get("name")
+        if not name or name == "main":
+            return False
+        usr = node.get("usr")
+        if usr and self._has_body(node):
+            self.functions[usr] = (name, node.get("line"))
         return False
 
     def apply(self, node):
         return None
 
+    def _has_textual_call(self, name):
+        if name in self.context.symbols.unresolved_names:
+            return True
+        # Dependent template calls only show up as text; once any overload
+        # of the name resolves, the text proves nothing.
+        return name not in self.context.call_graph.called_names and self.context.call_tokens.is_called(name)
+
     def finalize(self):
         messages = []
-
-        def referenced_textually(name):
-            for tokens in self.non_decl_tokens:
-                for i in range(len(tokens) - 1):
-                    if tokens[i] == name and tokens[i + 1] == "(":
-                        return True
-            return False
-
-        for name, line in sorted(self.functions.items(), key=lambda x: (x[1] or 10**9, x[0])):
-            if name in self.called or referenced_textually(name):
+        graph = self.context.call_graph
+        for usr, (name, line) in sorted(self.functions.items(), key=lambda x: (x[1][1] or 10**9, x[1][0])):
+            textual = self._has_textual_call(name)
+            self.textual_calls[usr] = textual
+            # Without `main` every referenced function may be an entry point.
+            used = graph.is_reachable(usr) if graph.has_main else graph.has_callers(usr)
+            if used or textual:
                 continue
-            if line:
-                messages.append(f"[WARN] Function '{name}' declared on line {line} is never called.")
-            else:
-                messages.append(f"[WARN] Function '{name}' is never called.")
+            message = unused_function_message(name, line, graph.has_callers(usr))
+            self.reported.append((usr, message))
+            messages.append(message)
         return messages
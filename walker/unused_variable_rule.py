@@ -3,17 +3,7 @@ from base_rule import BaseRule
 
 
 class UnusedVariableRule(BaseRule):
-    def __init__(self):
-        self.declared = set()
-        self.used = set()
-
     def matches(self, node):
-        if node["kind"] == CursorKind.VAR_DECL:
-            self.declared.add((node["name"], node["line"]))
-
-        if node["kind"] == CursorKind.DECL_REF_EXPR:
-            self.used.add(node["name"])
-
         return False  # diagnostics trigger at end
 
     def apply(self, node):
@@ -21,9 +11,10 @@ class UnusedVariableRule(BaseRule):
 
     def finalize(self):
         messages = []
-        for name, line in self.declared:
-            if name not in self.used:
-                messages.append(
-                    f"⚠️ Variable '{name}' declared at line {line} is never used."
-                )
+        for symbol in self.context.symbols.of_kind({CursorKind.VAR_DECL}):
+            if symbol.is_referenced():
+                continue
+            messages.append(
+                f"⚠️ Variable '{symbol.name}' declared at line {symbol.line} is never used."
+            )
         return messages